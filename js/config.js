@@ -3,6 +3,10 @@ let forexData = null;
 let processedTableData = [];
 let refreshTimer;
 let currentDataSource = '28pair'; // Track current data source
+// Live update stream of the local feed server (mt5/feed_server.py); the
+// static Netlify site has none, so there the timers below keep polling
+const LIVE_UPDATES_URL = ['localhost', '127.0.0.1'].includes(window.location.hostname) ? '/events' : null;
+let liveUpdatesConnected = false;
 
 // Page switching functionality
 function showPage(pageId) {
@@ -40,8 +44,12 @@ async function loadForexData() {
         showLoading(true);
         
         // Determine which JSON file to load based on current view
-        const fileName = `fx_signals_${currentDataSource}.json`;
-        const response = await fetch(`../data/${fileName}?` + new Date().getTime());
+        const source = currentDataSource;
+        const fileName = `fx_signals_${source}.json`;
+        // Version read before the data: a publish in between shows up on the next poll
+        const version = await fetchDataVersion(source);
+        // no-cache revalidates with If-None-Match: unchanged files cost a 304, not a download
+        const response = await fetch(`../data/${fileName}`, { cache: 'no-cache' });
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
@@ -49,6 +57,9 @@ async function loadForexData() {
         
         const data = await response.json();
         forexData = data.forexData;
+        if (version !== null) {
+            loadedVersions[source] = version;
+        }
         
         // Process and display the data
         processedTableData = processForexData(forexData);
@@ -303,7 +314,8 @@ function startAutoRefreshAt05(runNow = false) {
         const delay = next - now;
 
         refreshTimer = setTimeout(() => {
-            refreshData();
+            // Pushed updates already arrive within seconds of publishing
+            if (!liveUpdatesConnected) refreshData();
             scheduleNext();
         }, delay);
     }
@@ -312,11 +324,39 @@ function startAutoRefreshAt05(runNow = false) {
     console.log('Auto-refresh scheduled at every HH:05');
 }
 
+// Last loaded version per data source (from fx_signals_<source>.version.json)
+const loadedVersions = {};
+
+// Current version of a data source, or null if no version manifest is published
+async function fetchDataVersion(source) {
+    try {
+        const response = await fetch(`../data/fx_signals_${source}.version.json`, { cache: 'no-cache' });
+        return response.ok ? (await response.json()).version : null;
+    } catch (error) {
+        return null;
+    }
+}
+
 // File update checker
 async function checkForUpdates() {
+    if (liveUpdatesConnected) return;
     try {
-        const fileName = `fx_signals_${currentDataSource}.json`;
-        const response = await fetch(`../data/${fileName}?` + new Date().getTime());
+        // Poll the small version manifest first and only reload when it changes
+        // (loadForexData records the version it loaded; none recorded means reload to be safe)
+        const source = currentDataSource;
+        const version = await fetchDataVersion(source);
+        if (version !== null) {
+            if (version !== loadedVersions[source]) {
+                console.log(`fx_signals_${source}.json updated (version ${version}), refreshing data...`);
+                loadedVersions[source] = version;
+                loadForexData();
+            }
+            return;
+        }
+        
+        // Fallback when no manifest is published: compare the full file
+        const fileName = `fx_signals_${source}.json`;
+        const response = await fetch(`../data/${fileName}`, { cache: 'no-cache' });
         if (response.ok) {
             const data = await response.json();
             const newDataString = JSON.stringify(data);
@@ -332,6 +372,28 @@ async function checkForUpdates() {
     }
 }
 
+// Reload as soon as the feed server announces a new version of the current source
+function startLiveUpdates() {
+    if (!LIVE_UPDATES_URL || !window.EventSource) return;
+    const events = new EventSource(LIVE_UPDATES_URL);
+    events.onopen = () => {
+        liveUpdatesConnected = true;
+        console.log('Live updates connected');
+    };
+    // EventSource reconnects by itself; poll in the meantime
+    events.onerror = () => {
+        liveUpdatesConnected = false;
+    };
+    events.addEventListener('version', (event) => {
+        const update = JSON.parse(event.data);
+        if (update.source !== currentDataSource) return;
+        if (update.version && update.version === loadedVersions[update.source]) return;
+        console.log(`fx_signals_${update.source}.json updated (version ${update.version}), refreshing data...`);
+        loadedVersions[update.source] = update.version;
+        loadForexData();
+    });
+}
+
 function startUpdateChecker() {
     setInterval(checkForUpdates, 300000); // 5 minutes
     console.log('Update checker started (every 5 minutes)');
@@ -577,8 +639,9 @@ function applyWinLoseFrames() {
     });
 }
 
-// Date array for verification results table - edit this array directly
-const verificationDates = [
+// Date array for verification results table - used when images/manifest.json
+// is not available; otherwise the latest dates in the manifest are shown
+let verificationDates = [
     '2025_08_28',
     '2025_08_29', 
     '2025_09_01',
@@ -599,6 +662,28 @@ const timeSlots = [
     '18:00', '19:00', '20:00', '21:00', '22:00', '23:00'
 ];
 
+// Chart index written by mt5/image_manifest.py: "[date][time]" -> entry with thumb/webp variants
+let imageManifest = null;
+const MAX_VERIFICATION_DATES = 10;
+
+async function loadImageManifest() {
+    try {
+        const response = await fetch('../images/manifest.json', { cache: 'no-cache' });
+        if (!response.ok) return;
+        const manifest = await response.json();
+        imageManifest = {};
+        manifest.images.forEach(entry => {
+            imageManifest[`${entry.date}][${entry.time}`] = entry;
+        });
+        if (manifest.dates.length) {
+            verificationDates = manifest.dates.slice(-MAX_VERIFICATION_DATES);
+        }
+    } catch (error) {
+        console.log('Image manifest not available, using full-size chart images:', error);
+        imageManifest = null;
+    }
+}
+
 // Function to format date for display (convert 2025_08_28 to 8月28日)
 function formatDateForDisplay(dateString) {
     const [year, month, day] = dateString.split('_');
@@ -633,11 +718,23 @@ function generateTableBody() {
         
         verificationDates.forEach(date => {
             const timeFormatted = formatTimeForFilename(time);
-            const imagePath = `../images/[${date}][${timeFormatted}].png`;
+            let imagePath = `../images/[${date}][${timeFormatted}].png`;
+            let thumbPath = imagePath;
+            
+            if (imageManifest) {
+                const entry = imageManifest[`${date}][${timeFormatted}`];
+                if (!entry) {
+                    bodyHTML += '<td></td>';
+                    return;
+                }
+                // Small thumbnail in the table, WebP in the modal, PNG if no variants yet
+                imagePath = `../images/${entry.webp || entry.file}`;
+                thumbPath = `../images/${entry.thumb || entry.file}`;
+            }
             
             bodyHTML += `
                 <td onclick="showModal('${imagePath}')">
-                    <img src="${imagePath}" alt="チャート画像" class="chart-thumbnail">
+                    <img src="${thumbPath}" alt="チャート画像" class="chart-thumbnail" loading="lazy">
                 </td>
             `;
         });
@@ -679,14 +776,15 @@ document.addEventListener('DOMContentLoaded', () => {
     loadForexData();
     startAutoRefreshAt05();
     startUpdateChecker();
+    startLiveUpdates();
     
     // Apply frames after page loads
     setTimeout(applyWinLoseFrames, 100);
     
     // Initialize the verification table
-    setTimeout(() => {
+    loadImageManifest().then(() => {
         generateVerificationTable();
-    }, 500);
+    });
 });
 
 // Export functions for external use
@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import queue
+import smtplib
+import threading
+import urllib.request
+from datetime import datetime
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+# Identical alerts within this window are sent once, then summarised when it ends
+DEDUP_WINDOW_SECONDS = 3600
+
+class SmtpSink:
+    """Email sink that keeps one SMTP connection open between alerts"""
+
+    def __init__(self, smtp_server, smtp_port, sender_email, recipient_email,
+                 app_password=None, starttls=True, timeout=30):
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.sender_email = sender_email
+        self.recipient_email = recipient_email
+        self.app_password = app_password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.server = None
+
+    def _connect(self):
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        if self.starttls:
+            server.starttls()
+        if self.app_password:
+            server.login(self.sender_email, self.app_password)
+        self.server = server
+
+    def send(self, subject, body):
+        msg = MIMEMultipart()
+        msg['From'] = self.sender_email
+        msg['To'] = self.recipient_email
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'plain'))
+
+        # The server drops idle connections, so reconnect once before giving up
+        for attempt in (1, 2):
+            if self.server is None:
+                self._connect()
+            try:
+                self.server.sendmail(self.sender_email, self.recipient_email, msg.as_string())
+                return
+            except (smtplib.SMTPServerDisconnected, OSError):
+                self.close()
+                if attempt == 2:
+                    raise
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+    def __str__(self):
+        return f"email to {self.recipient_email}"
+
+class FileSink:
+    """Append alerts to a local text file"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, subject, body):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(f"=== {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} {subject}\n{body.strip()}\n\n")
+
+    def close(self):
+        pass
+
+    def __str__(self):
+        return f"file {self.path}"
+
+class WebhookSink:
+    """POST alerts as JSON ({"subject", "text"}) to a webhook URL, e.g. Slack/Discord"""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, subject, body):
+        payload = json.dumps({"subject": subject, "text": f"{subject}\n{body.strip()}"}).encode('utf-8')
+        request = urllib.request.Request(self.url, data=payload, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def close(self):
+        pass
+
+    def __str__(self):
+        return f"webhook {self.url}"
+
+class AlertDispatcher:
+    """Queue alerts and deliver them from a background thread
+
+    Callers never wait on the network. Repeats of the same alert inside the
+    dedup window are counted instead of sent, and one summary goes out when
+    the window closes. Each sink delivers from its own thread, so a sink that
+    fails or hangs (SMTP timeout, dead webhook) does not hold up the others.
+    """
+
+    def __init__(self, sinks, dedup_window=DEDUP_WINDOW_SECONDS):
+        self.sinks = sinks
+        self.dedup_window = dedup_window
+        self.queue = queue.Queue()
+        self.recent = {}  # key -> {"first": time, "subject", "body", "repeats"}
+        self.thread = None
+        self.sink_queues = [queue.Queue() for _ in sinks]
+        self.sink_threads = [None] * len(sinks)
+
+    def send(self, subject, body, key=None):
+        """Queue an alert; returns immediately"""
+        self.queue.put((subject, body, key or subject))
+        self.start()
+        return True
+
+    def _deliver(self, subject, body):
+        for sink_queue in self.sink_queues:
+            sink_queue.put((subject, body))
+
+    def _run_sink(self, sink, sink_queue):
+        while True:
+            item = sink_queue.get()
+            if item is None:
+                break
+            try:
+                sink.send(*item)
+                print(f"✅ Alert sent via {sink}")
+            except Exception as e:
+                print(f"❌ Failed to send alert via {sink}: {e}")
+
+    def _handle(self, subject, body, key):
+        now = time.monotonic()
+        entry = self.recent.get(key)
+        if entry and now - entry["first"] < self.dedup_window:
+            entry["repeats"] += 1
+            print(f"🔁 Duplicate alert suppressed ({entry['repeats']} repeats): {subject}")
+            return
+        self.recent[key] = {"first": now, "subject": subject, "body": body, "repeats": 0}
+        self._deliver(subject, body)
+
+    def _flush_expired(self, force=False):
+        now = time.monotonic()
+        for key, entry in list(self.recent.items()):
+            if not force and now - entry["first"] < self.dedup_window:
+                continue
+            del self.recent[key]
+            if entry["repeats"]:
+                minutes = round((now - entry["first"]) / 60)
+                self._deliver(f"[x{entry['repeats']} repeats] {entry['subject']}",
+                              f"The alert below repeated {entry['repeats']} more time(s) "
+                              f"in the last {minutes} minute(s).\n\n{entry['body']}")
+
+    def _next_timeout(self):
+        if not self.recent:
+            return None
+        oldest = min(entry["first"] for entry in self.recent.values())
+        return max(0.0, oldest + self.dedup_window - time.monotonic())
+
+    def run(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=self._next_timeout())
+            except queue.Empty:
+                self._flush_expired()
+                continue
+            if item is None:
+                self._flush_expired(force=True)
+                break
+            self._handle(*item)
+            self._flush_expired()
+
+    def start(self):
+        """Start the delivery thread and the per-sink threads if they are not running"""
+        if self.thread and self.thread.is_alive():
+            return
+        for index, (sink, sink_queue) in enumerate(zip(self.sinks, self.sink_queues)):
+            if self.sink_threads[index] is None or not self.sink_threads[index].is_alive():
+                self.sink_threads[index] = threading.Thread(target=self._run_sink, args=(sink, sink_queue),
+                                                            name=f"alert-sink-{index}", daemon=True)
+                self.sink_threads[index].start()
+        self.thread = threading.Thread(target=self.run, name="alert-dispatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        """Deliver what is queued (plus pending summaries) and close the sinks
+
+        timeout bounds the wait for each thread; a sink still stuck after it
+        is left to its daemon thread.
+        """
+        if self.thread and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout)
+        for sink, sink_queue, thread in zip(self.sinks, self.sink_queues, self.sink_threads):
+            if thread is not None and thread.is_alive():
+                sink_queue.put(None)
+                thread.join(timeout)
+                if thread.is_alive():
+                    continue
+            sink.close()
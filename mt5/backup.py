@@ -1,14 +1,28 @@
 import os
+import sys
 import time
 import subprocess
 import json
+import threading
 from datetime import datetime
+from encoding_utils import iter_decodings
+from safe_io import atomic_write_json, read_stable_bytes
+from terminal_config import ConfigReloader, expand_files, watch_with_reload, CONFIG_FILE
 
 # Configuration
+# Built-in defaults; terminals.toml (see terminal_config.py) replaces them when present
 SOURCE_BASE_PATH = r"C:\Users\MT4ver2-e18-AZIzrF0D\AppData\Roaming\MetaQuotes\Terminal\7E59B46FD773C6FE7B889FC92951284D\MQL5\Files"
 DESTINATION_BASE_PATH = r"C:\Users\MT4ver2-e18-AZIzrF0D\CounterTrader\counter_trader\data"
 GIT_REPO_PATH = r"C:\Users\MT4ver2-e18-AZIzrF0D\CounterTrader\counter_trader"
 
+# Trigger mode: "watch" (copy when the EA finishes writing) or "schedule" (minute 5 of each hour).
+# file_updater.py publishes the same EA files - run only one of the two in watch mode,
+# or both would copy and commit every file at the same time.
+TRIGGER_MODE = "schedule"
+SCHEDULE_MINUTE = 5
+# Held by git runs, so the watcher's commit and the 23:00 commit never overlap
+GIT_LOCK = threading.Lock()
+
 # File configurations
 FILES_CONFIG = [
     {
@@ -22,6 +36,7 @@ FILES_CONFIG = [
         "name": "28pair"
     }
 ]
+CONFIG_RELOADER = ConfigReloader(CONFIG_FILE)
 
 def clean_json_content(content):
     """Clean and normalize JSON content"""
@@ -38,14 +53,20 @@ def clean_json_content(content):
     return content
 
 def read_with_multiple_encodings(file_path):
-    """Try multiple encoding methods to read the file"""
+    """Read the file once, decode with the sniffed encoding and fall back to other encodings"""
     encodings = ['utf-16-le', 'utf-16-be', 'utf-16', 'utf-8-sig', 'utf-8', 'cp1252', 'latin-1']
     
-    for encoding in encodings:
+    try:
+        raw = read_stable_bytes(file_path)
+    except OSError:
+        return None
+    if raw is None:
+        print(f"Source file is still being written, skipping this cycle: {file_path}")
+        return None
+    
+    # Detected encoding is tried first; the rest only run on the in-memory buffer
+    for encoding, content in iter_decodings(raw, encodings):
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                content = f.read()
-            
             # Clean the content
             content = clean_json_content(content)
             
@@ -54,7 +75,7 @@ def read_with_multiple_encodings(file_path):
                 data = json.loads(content)
                 return data
                 
-        except (UnicodeDecodeError, json.JSONDecodeError):
+        except json.JSONDecodeError:
             continue
         except Exception:
             continue
@@ -84,8 +105,8 @@ def copy_file_safely(source_path, destination_path, file_name):
             return False
         
         # Write as clean UTF-8 to destination
-        with open(destination_path, 'w', encoding='utf-8') as dest:
-            json.dump(data, dest, ensure_ascii=False, indent=2)
+        # (temp file + fsync + rename, so readers never see a partial file)
+        atomic_write_json(destination_path, data, ensure_ascii=False, indent=2)
         
         print(f"{file_name} file copied and converted at {datetime.now().strftime('%H:%M')}")
         return True
@@ -96,12 +117,16 @@ def copy_file_safely(source_path, destination_path, file_name):
 
 def run_git_commands():
     """Execute git commands for both files"""
+    with GIT_LOCK:
+        return _run_git_commands()
+
+def _run_git_commands():
     try:
         os.chdir(GIT_REPO_PATH)
         
-        # Add both files
-        subprocess.run(["git", "add", "data/fx_signals_10pair.json"], check=True)
-        subprocess.run(["git", "add", "data/fx_signals_28pair.json"], check=True)
+        # Add every published file
+        destinations = [config["destination"] for config in FILES_CONFIG if os.path.exists(config["destination"])]
+        subprocess.run(["git", "add", "--"] + destinations, check=True)
         
         # Commit with timestamp
         commit_message = f"Update forex signals - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
@@ -122,6 +147,10 @@ def run_git_commands():
 
 def run_git_commands_all():
     """Execute git commands for all files at 23:00"""
+    with GIT_LOCK:
+        return _run_git_commands_all()
+
+def _run_git_commands_all():
     try:
         os.chdir(GIT_REPO_PATH)
         
@@ -168,13 +197,62 @@ def check_file_existence():
         status = "EXISTS" if exists else "MISSING"
         print(f"{config['name']} file: {status}")
 
-def main():
+def apply_config(config):
+    """Switch to the terminals, paths and schedule from a loaded config"""
+    global GIT_REPO_PATH, DESTINATION_BASE_PATH, FILES_CONFIG, TRIGGER_MODE, SCHEDULE_MINUTE
+    GIT_REPO_PATH = config["repo_path"]
+    DESTINATION_BASE_PATH = config["destination"]
+    FILES_CONFIG = expand_files(config)
+    TRIGGER_MODE = config["backup"].get("trigger_mode", TRIGGER_MODE)
+    SCHEDULE_MINUTE = config["backup"].get("schedule_minute", SCHEDULE_MINUTE)
+
+def reload_config(force=False):
+    """Apply the config file if it changed"""
+    config = CONFIG_RELOADER.check(force)
+    if config is not None:
+        apply_config(config)
+
+def on_source_files_changed(changed_paths):
+    """Watcher callback - copy as soon as the EA finishes writing"""
+    print(f"\nFile change detected at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    move_files()
+    print("-" * 50)
+
+def run_daily_git_loop():
+    """Watch mode has no polling loop, so the 23:00 commit runs on this thread"""
+    last_date = None
+    while True:
+        try:
+            now = datetime.now()
+            if now.hour == 23 and now.minute == 0 and now.date() != last_date:
+                print(f"\nGit commands triggered at {now.strftime('%Y-%m-%d %H:%M:%S')}")
+                run_git_commands_all()
+                last_date = now.date()
+                print("-" * 50)
+            time.sleep(1)
+        except Exception as e:
+            print(f"Unexpected error in daily git loop: {e}")
+            time.sleep(10)
+
+def main(mode=None):
     """Main monitoring loop"""
     print("Forex JSON File Monitor Started")
-    print("Monitoring for fx_signals_10pair.json and fx_signals_28pair.json")
+    reload_config(force=True)
+    mode = mode or TRIGGER_MODE
+    print(f"Monitoring {', '.join(os.path.basename(config['source']) for config in FILES_CONFIG)}")
     print("Checking file sources...")
     check_file_existence()
-    print("Will copy files at minute 4 of each hour")
+    if mode == "watch":
+        print("Will copy files as soon as the EA finishes writing them")
+        print("Will execute git commands at 23:00 daily")
+        threading.Thread(target=run_daily_git_loop, name="daily-git", daemon=True).start()
+        try:
+            watch_with_reload(CONFIG_RELOADER, apply_config,
+                              lambda: [config["source"] for config in FILES_CONFIG], on_source_files_changed)
+        except KeyboardInterrupt:
+            print("\nStopping monitor...")
+        return
+    print(f"Will copy files at minute {SCHEDULE_MINUTE} of each hour")
     print("Will execute git commands at 23:00 daily")
     print("-" * 50)
     
@@ -183,11 +261,12 @@ def main():
     
     while True:
         try:
+            reload_config()
             now = datetime.now()
             current_date = now.date()
             
             # Trigger file copying at minute 4 of each hour
-            if now.minute == 5 and now.hour != last_hour:
+            if now.minute == SCHEDULE_MINUTE and now.hour != last_hour:
                 print(f"\nFile copy triggered at {now.strftime('%Y-%m-%d %H:%M:%S')}")
                 move_files()
                 last_hour = now.hour
@@ -217,4 +296,4 @@ def main():
             time.sleep(10)  # Wait 10 seconds before retrying
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
@@ -0,0 +1,301 @@
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from benchmark_signal_parser import make_payload, to_log_lines
+import file_updater
+import history_store
+import signal_validator
+from change_detector import compute_digests
+from log_tailer import LogTailer
+
+# signal_new needs openpyxl; without it the CSV/Excel export stages are skipped
+try:
+    import signal_new
+    EXPORT_AVAILABLE = True
+except ImportError:
+    EXPORT_AVAILABLE = False
+
+# Analytics needs numpy
+try:
+    import signal_analytics
+    ANALYTICS_AVAILABLE = True
+except ImportError:
+    ANALYTICS_AVAILABLE = False
+
+# === CONFIGURATION ===
+PAIR_COUNTS = (10, 28, 500)
+ENCODINGS = ("utf-16", "utf-8")
+REPEATS = 15
+LOG_LINES = 200_000
+WORKBOOK_ROWS = 50_000
+HISTORY_SNAPSHOTS = 24 * 7
+SEED = 1902
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+# Median slower than the baseline by more than this fraction is flagged
+REGRESSION_THRESHOLD = 0.10
+
+# === FUNCTION: Timing ===
+def measure(func, repeats=REPEATS, setup=None, size=None):
+    """Run func `repeats` times (after an optional per-run setup) with pipeline prints silenced"""
+    samples = []
+    for _ in range(repeats):
+        if setup:
+            with redirect_stdout(io.StringIO()):
+                setup()
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    result = {
+        "runs": len(samples),
+        "min": samples[0],
+        "median": statistics.median(samples),
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+    if size:
+        result["mb_per_s"] = size / result["median"] / 1024 / 1024
+    return result
+
+# === FUNCTION: Synthetic inputs ===
+def write_ea_file(path, payload, encoding):
+    """EA-style output: UTF-16 LE with BOM (FILE_UNICODE) or plain UTF-8, backdated so it counts as settled"""
+    text = json.dumps(payload, indent=2)
+    raw = text.encode('utf-16') if encoding == "utf-16" else text.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(raw)
+    past = time.time() - 60
+    os.utime(path, (past, past))
+    return len(raw)
+
+def write_log_file(path, line_count, seed=SEED):
+    """Large UTF-16 EA log made of repeated signal dumps"""
+    pairs = max(1, line_count // 9)
+    lines = to_log_lines(make_payload(pairs, seed))[:line_count]
+    raw = ("\n".join(lines) + "\n").encode('utf-16')
+    with open(path, 'wb') as f:
+        f.write(raw)
+    return len(raw), lines
+
+def init_repo(root):
+    """Temp repo with a bare local remote, so commit and push cost no network"""
+    # Commits must not depend on the machine's git identity
+    for key in ("GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME"):
+        os.environ.setdefault(key, "bench")
+    for key in ("GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"):
+        os.environ.setdefault(key, "bench@localhost")
+    remote, repo = os.path.join(root, "remote.git"), os.path.join(root, "repo")
+    subprocess.run(["git", "init", "-q", "--bare", "-b", "main", remote], check=True)
+    subprocess.run(["git", "init", "-q", "-b", "main", repo], check=True)
+    subprocess.run(["git", "-C", repo, "remote", "add", "origin", remote], check=True)
+    os.makedirs(os.path.join(repo, "data"))
+    with open(os.path.join(repo, "README"), 'w') as f:
+        f.write("benchmark\n")
+    subprocess.run(["git", "-C", repo, "add", "README"], check=True)
+    subprocess.run(["git", "-C", repo, "commit", "-q", "-m", "init"], check=True)
+    subprocess.run(["git", "-C", repo, "push", "-q", "-u", "origin", "main"], check=True)
+    return repo
+
+def point_updater_at(repo, files_config):
+    """Run file_updater against the temp repo, inline pushes, no alerts or side outputs"""
+    file_updater.GIT_REPO_PATH = repo
+    file_updater.FILES_CONFIG = files_config
+    file_updater.ASYNC_PUSH = False
+    file_updater.HISTORY_ENABLED = False
+    file_updater.GMAIL_CONFIG["enabled"] = False
+    file_updater.is_weekend_block_time = lambda: False
+    signal_validator.QUARANTINE_DIR = os.path.join(os.path.dirname(repo), "quarantine")
+
+# === FUNCTION: Stages ===
+def bench_updater(root, repeats):
+    results = {}
+    repo = init_repo(root)
+    source_dir = os.path.join(root, "src")
+    os.makedirs(source_dir)
+    files_config = []
+    point_updater_at(repo, files_config)
+
+    for pair_count in PAIR_COUNTS:
+        payload = make_payload(pair_count)
+        # Schema check plus change detection: every pair new, then every pair already validated
+        def validate_and_digest(known_good=None):
+            cleaned, _, pair_digests, _ = signal_validator.validate_payload(payload, known_good)
+            compute_digests(cleaned, pair_digests)
+        results[f"validate_full[{pair_count}pair]"] = measure(validate_and_digest, repeats)
+        known_good = compute_digests(payload)["pairs"]
+        results[f"validate_known[{pair_count}pair]"] = measure(lambda: validate_and_digest(known_good), repeats)
+        for encoding in ENCODINGS:
+            name = f"{pair_count}pair_{encoding.replace('-', '')}"
+            source = os.path.join(source_dir, f"fx_signals_{name}.json")
+            destination = os.path.join(repo, "data", f"fx_signals_{name}.json")
+            size = write_ea_file(source, payload, encoding)
+            files_config.append({"source": source, "destination": destination, "name": name})
+
+            results[f"read_decode[{name}]"] = measure(
+                lambda: file_updater.read_with_multiple_encodings(source), repeats, size=size)
+            # Fresh state every run: full write plus compact feed artifacts
+            results[f"copy_changed[{name}]"] = measure(
+                lambda: file_updater.copy_file_safely(source, destination, name, {"files": {}}), repeats, size=size)
+            state = {"files": {}}
+            with redirect_stdout(io.StringIO()):
+                file_updater.copy_file_safely(source, destination, name, state)
+            results[f"copy_unchanged[{name}]"] = measure(
+                lambda: file_updater.copy_file_safely(source, destination, name, state), repeats, size=size)
+
+    rng = random.Random(SEED)
+
+    def touch_outputs():
+        # A real change in every published file so each run commits and pushes
+        for config in files_config:
+            with open(config["destination"], 'a', encoding='utf-8') as f:
+                f.write(f"\n{rng.random()}")
+    results["git_commit_push[all files]"] = measure(
+        lambda: file_updater.run_git_commands({config["name"]: ["X"] for config in files_config}),
+        max(3, repeats // 3), setup=touch_outputs)
+    return results
+
+def bench_history(root, repeats):
+    results = {}
+    history_dir = os.path.join(root, "history")
+    for pair_count in PAIR_COUNTS:
+        payload = make_payload(pair_count)
+        start = datetime.now().replace(microsecond=0) - timedelta(hours=HISTORY_SNAPSHOTS)
+        stamps = iter(start + timedelta(hours=i) for i in range(HISTORY_SNAPSHOTS + repeats * 2))
+        results[f"history_append[{pair_count}pair]"] = measure(
+            lambda: history_store.append_snapshot(payload, f"{pair_count}pair", next(stamps), history_dir=history_dir),
+            repeats)
+        for timestamp in stamps:
+            history_store.append_snapshot(payload, f"{pair_count}pair", timestamp, history_dir=history_dir)
+        results[f"history_latest[{pair_count}pair]"] = measure(
+            lambda: history_store.query_latest(n=pair_count, source=f"{pair_count}pair", history_dir=history_dir),
+            repeats)
+        if ANALYTICS_AVAILABLE:
+            results[f"analytics[{pair_count}pair x {HISTORY_SNAPSHOTS}h]"] = measure(
+                lambda: signal_analytics.summarise(source=f"{pair_count}pair", history_dir=history_dir),
+                max(3, repeats // 3))
+    return results
+
+def bench_log_export(root, repeats, log_lines, workbook_rows):
+    results = {}
+    log_dir = os.path.join(root, "logs")
+    os.makedirs(log_dir)
+    log_path = os.path.join(log_dir, "20260101.log")
+    size, lines = write_log_file(log_path, log_lines)
+
+    results[f"log_tail_full[{log_lines} lines]"] = measure(
+        lambda: LogTailer(log_dir, "*.log").poll(), max(3, repeats // 3), size=size)
+    tailer = LogTailer(log_dir, "*.log")
+    tailer.poll()
+    appended = ("\n".join(lines[:100]) + "\n").encode('utf-16-le')
+
+    def append_lines():
+        with open(log_path, 'ab') as f:
+            f.write(appended)
+    results["log_tail_append[100 lines]"] = measure(tailer.poll, repeats, setup=append_lines)
+
+    if not EXPORT_AVAILABLE:
+        print("⚠️ openpyxl not installed - CSV/Excel export stages skipped")
+        return results
+    from openpyxl import Workbook
+    excel_file = os.path.join(root, "Hourly_Signal.xlsx")
+    workbook = Workbook()
+    # Like the real workbook: other sheets carry the data, parameters holds only the log in column A
+    summary = workbook.active
+    summary.title = "Summary"
+    sheet = workbook.create_sheet(signal_new.SHEET_NAME)
+    for row in range(1, workbook_rows + 1):
+        sheet.cell(row=row, column=1, value=f"old line {row}")
+        summary.cell(row=row, column=1, value=f"value {row}")
+        summary.cell(row=row, column=2, value=row)
+    workbook.save(excel_file)
+    target = {"name": "bench", "excel_file": excel_file,
+              "csv_file": os.path.join(root, "parameters.csv"), "tailer": tailer}
+    export_lines = lines[:workbook_rows]
+    results[f"export_csv[{len(export_lines)} lines]"] = measure(
+        lambda: signal_new.write_lines_to_csv(export_lines, target["csv_file"]), repeats)
+    results[f"export_excel[{len(export_lines)} lines, {workbook_rows} row workbook]"] = measure(
+        lambda: signal_new.write_lines_to_excel(export_lines, excel_file), max(3, repeats // 5))
+    return results
+
+# === FUNCTION: Report and baseline ===
+def report(results, baseline=None):
+    print(f"{'stage':<52}{'median ms':>11}{'p95 ms':>10}{'MB/s':>9}{'vs base':>10}")
+    regressions = []
+    for stage, result in results.items():
+        throughput = f"{result['mb_per_s']:.1f}" if "mb_per_s" in result else "-"
+        change = "-"
+        base = (baseline or {}).get("results", {}).get(stage)
+        if base:
+            delta = result["median"] / base["median"] - 1
+            change = f"{delta:+.0%}"
+            if delta > REGRESSION_THRESHOLD:
+                change += " ⚠️"
+                regressions.append(stage)
+        print(f"{stage:<52}{result['median'] * 1000:>11.2f}{result['p95'] * 1000:>10.2f}{throughput:>9}{change:>10}")
+    return regressions
+
+def load_baseline(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the updater, history and log-export pipelines")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--log-lines", type=int, default=LOG_LINES)
+    parser.add_argument("--workbook-rows", type=int, default=WORKBOOK_ROWS)
+    parser.add_argument("--only", choices=("updater", "history", "export"), action="append",
+                        help="run only these groups (repeatable)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON to compare against")
+    parser.add_argument("--save", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args(argv)
+    groups = args.only or ["updater", "history", "export"]
+
+    print(f"📊 Pipeline benchmark: pairs {PAIR_COUNTS}, {', '.join(ENCODINGS)}, {args.repeats} runs per stage "
+          f"(Python {platform.python_version()}, {platform.system()})")
+    root = tempfile.mkdtemp(prefix="counter_trader_bench_")
+    results = {}
+    try:
+        if "updater" in groups:
+            results.update(bench_updater(root, args.repeats))
+        if "history" in groups:
+            results.update(bench_history(root, args.repeats))
+        if "export" in groups:
+            results.update(bench_log_export(root, args.repeats, args.log_lines, args.workbook_rows))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    baseline = load_baseline(args.baseline)
+    if baseline:
+        print(f"Comparing with baseline from {baseline['meta']['date']} ({args.baseline})")
+    regressions = report(results, baseline)
+    if regressions:
+        print(f"⚠️ {len(regressions)} stage(s) more than {REGRESSION_THRESHOLD:.0%} slower than the baseline")
+
+    if args.save:
+        if baseline:
+            # Keep stages that were not run this time
+            baseline["results"].update(results)
+            results = baseline["results"]
+        meta = {"date": datetime.now().strftime('%Y-%m-%d %H:%M'), "python": platform.python_version(),
+                "platform": platform.platform(), "repeats": args.repeats}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
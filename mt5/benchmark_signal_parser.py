@@ -0,0 +1,102 @@
+import sys
+import json
+import time
+import random
+import tracemalloc
+from signal_parser import parse_forex_data, parse_log_lines, RANK_FIELDS
+
+# === CONFIGURATION ===
+PAIR_COUNT = 500
+REPEATS = 20
+SEED = 1902
+
+# === FUNCTION: Synthetic EA output ===
+def make_payload(pair_count, seed=SEED):
+    rng = random.Random(seed)
+    forex_data = {}
+    for i in range(pair_count):
+        # Two different currencies never share a rank
+        rank = lambda: "/".join(str(r) for r in rng.sample(range(1, 9), 2))
+        forex_data[f"PAIR{i:04d}"] = {
+            "Currency_Strength_Rank_all_pair": rank(),
+            "CCI_Currency_Strength_Rank_all_pair": rank(),
+            "BB_percent_ranking": rank(),
+            "RSI_breakout": rng.randint(0, 100),
+            "Overall_Ranking": rank(),
+            "Confidence": rng.randint(0, 100),
+            "Signal": rng.choice(["Buy", "Sell", "Stay"]),
+            "TRIGGER": rng.choice(["ON", "OFF"]),
+            "TRIGGER_REASON": rng.choice(["T_1", "T_2", "T_3", "NONE"]),
+        }
+    return {"forexData": forex_data}
+
+def to_log_lines(payload):
+    return [f"[{pair}][{field}]={value}"
+            for pair, values in payload["forexData"].items()
+            for field, value in values.items()]
+
+# === FUNCTION: Typical downstream work on each representation ===
+def dict_path(data):
+    # What the dashboard/Excel steps do today: split "a/b" strings on every access
+    result = 0
+    for values in data["forexData"].values():
+        for field in RANK_FIELDS:
+            left, right = values[field].split("/")
+            result += int(left) - int(right)
+        result += values["Confidence"]
+    return result
+
+def table_path(table):
+    result = 0
+    for field in RANK_FIELDS:
+        left, right = table.column(field)
+        result += sum(left) - sum(right)
+    result += sum(table.column("Confidence"))
+    return result
+
+# === FUNCTION: Timing helpers ===
+def best_of(func, repeats=REPEATS):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best, value
+
+def peak_memory(func):
+    tracemalloc.start()
+    value = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, value
+
+def main(pair_count=PAIR_COUNT):
+    payload = make_payload(pair_count)
+    text = json.dumps(payload, indent=2)
+    lines = to_log_lines(payload)
+    print(f"📊 Signal parser benchmark: {pair_count} pairs, JSON {len(text) / 1024:.1f} KB, "
+          f"{len(lines)} log lines, best of {REPEATS}")
+
+    load_time, data = best_of(lambda: json.loads(text))
+    table_time, table = best_of(lambda: parse_forex_data(json.loads(text)))
+    log_time, log_table = best_of(lambda: parse_log_lines(lines))
+    dict_query, dict_result = best_of(lambda: dict_path(data))
+    table_query, table_result = best_of(lambda: table_path(table))
+    assert dict_result == table_result == table_path(log_table), "paths disagree"
+    assert table.to_forex_data() == payload["forexData"], "round trip changed the data"
+
+    dict_memory, _ = peak_memory(lambda: json.loads(text))
+    table_memory, _ = peak_memory(lambda: parse_forex_data(json.loads(text)))
+
+    print(f"{'step':<32}{'dict path':>12}{'table path':>12}")
+    print(f"{'parse JSON (ms)':<32}{load_time * 1000:>12.2f}{table_time * 1000:>12.2f}")
+    print(f"{'parse log lines (ms)':<32}{'-':>12}{log_time * 1000:>12.2f}")
+    print(f"{'rank/confidence pass (ms)':<32}{dict_query * 1000:>12.3f}{table_query * 1000:>12.3f}")
+    print(f"{'peak memory while parsing (KB)':<32}{dict_memory / 1024:>12.0f}{table_memory / 1024:>12.0f}")
+    print(f"Per downstream pass the table is {dict_query / table_query:.1f}x faster; "
+          f"parsing once costs {(table_time - load_time) * 1000:.2f} ms extra, "
+          f"recovered after {max(1, round((table_time - load_time) / max(dict_query - table_query, 1e-9)))} passes")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else PAIR_COUNT)
@@ -0,0 +1,60 @@
+import json
+import hashlib
+from safe_io import atomic_write_json
+
+def hash_payload(payload):
+    """SHA-256 of a JSON-compatible value, independent of key order and formatting"""
+    normalised = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(normalised.encode('utf-8')).hexdigest()
+
+def compute_digests(data, pair_digests=None):
+    """Digest of the whole payload plus one digest per pair in forexData
+
+    pair_digests may carry digests already computed for some pairs (by the validator).
+    """
+    pairs = data.get('forexData') or {}
+    known = pair_digests or {}
+    return {
+        "file": hash_payload(data),
+        "pairs": {pair: known.get(pair) or hash_payload(values) for pair, values in pairs.items()}
+    }
+
+def diff_pairs(old_digests, new_digests):
+    """Pairs that were added, removed or changed between two digest sets"""
+    old_pairs = (old_digests or {}).get("pairs", {})
+    new_pairs = new_digests.get("pairs", {})
+    changed = [pair for pair, digest in new_pairs.items() if old_pairs.get(pair) != digest]
+    removed = [pair for pair in old_pairs if pair not in new_pairs]
+    return changed + removed
+
+def load_state(state_path):
+    """Load the last published digests, or an empty state if missing/corrupt"""
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if isinstance(state, dict):
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"files": {}}
+
+def save_state(state, state_path):
+    """Persist the digest state next to the updater"""
+    atomic_write_json(state_path, state, indent=2)
+
+def detect_changes(name, data, state, pair_digests=None):
+    """Return (digests, changed_pairs) for a parsed payload against the stored state
+
+    changed_pairs is empty when the payload is identical to the last published one.
+    """
+    digests = compute_digests(data, pair_digests)
+    previous = state.setdefault("files", {}).get(name)
+    if previous and previous.get("file") == digests["file"]:
+        return digests, []
+    changed = diff_pairs(previous, digests)
+    # Same pairs but different top-level fields still counts as a change
+    return digests, changed or ["(metadata)"]
+
+def record_published(name, digests, state):
+    """Remember digests as the last published version of a file"""
+    state.setdefault("files", {})[name] = digests
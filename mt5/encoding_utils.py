@@ -0,0 +1,62 @@
+import codecs
+
+# Byte-order marks, longest first so UTF-32 LE is not mistaken for UTF-16 LE
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# How many leading bytes to inspect for UTF-16 null-byte patterns
+SNIFF_BYTES = 4096
+
+def detect_encoding(raw):
+    """Guess the encoding of raw bytes from BOMs and null-byte patterns, or None"""
+    for bom, encoding in BOMS:
+        if raw.startswith(bom):
+            return encoding
+
+    sample = raw[:SNIFF_BYTES]
+    if len(sample) >= 2:
+        # ASCII text in UTF-16 has a null in every other byte:
+        # odd positions for little-endian (MT5 FILE_UNICODE), even for big-endian
+        even_nulls = sample[0::2].count(0)
+        odd_nulls = sample[1::2].count(0)
+        half = len(sample) // 2
+        if odd_nulls > half * 0.3 and odd_nulls > even_nulls * 2:
+            return 'utf-16-le'
+        if even_nulls > half * 0.3 and even_nulls > odd_nulls * 2:
+            return 'utf-16-be'
+
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the sample boundary is still UTF-8
+        if e.start >= len(sample) - 3 and len(raw) > len(sample):
+            return 'utf-8'
+
+    return None
+
+def iter_decodings(raw, fallback_encodings):
+    """Yield (encoding, text) for the detected encoding first, then each fallback that decodes"""
+    detected = detect_encoding(raw)
+    candidates = [detected] if detected else []
+    candidates += [enc for enc in fallback_encodings if enc != detected]
+    if b'\x00' not in raw[:SNIFF_BYTES]:
+        # Without a BOM or any null bytes, a UTF-16/32 decode "succeeds" on
+        # almost any even-length input and only produces garbage
+        candidates = [enc for enc in candidates if enc == detected or not enc.startswith(('utf-16', 'utf-32'))]
+
+    for encoding in candidates:
+        try:
+            yield encoding, raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+
+def read_bytes(path):
+    """Read a whole file into memory in one go"""
+    with open(path, 'rb') as f:
+        return f.read()
@@ -0,0 +1,283 @@
+import os
+import sys
+import gzip
+import json
+import time
+import argparse
+import threading
+import mimetypes
+from collections import deque
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+from feed_writer import feed_artifact_paths
+from pipeline_metrics import inc, set_gauge
+
+# Site files served next to data/, so the dashboard itself can be opened from the
+# server. Everything else in the repository (mt5/ holds credentials) is never served.
+SITE_ENTRIES = ("index.html", "login.html", "admin.html", "js", "css", "images", "data")
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+GZIP_TYPES = ("application/json", "text/", "application/javascript")
+# Seconds between SSE keep-alive comments, and the longest a long-poll waits
+HEARTBEAT_SECONDS = 15
+LONG_POLL_SECONDS = 25
+# Events kept for clients that reconnect with Last-Event-ID or poll with ?since=
+EVENT_BACKLOG = 100
+
+class FeedEvents:
+    """Numbered "new version" events that SSE and long-poll clients wait on"""
+
+    def __init__(self, backlog=EVENT_BACKLOG):
+        self.condition = threading.Condition()
+        self.events = deque(maxlen=backlog)
+        self.last_id = 0
+
+    def publish(self, event):
+        with self.condition:
+            self.last_id += 1
+            self.events.append((self.last_id, event))
+            self.condition.notify_all()
+        return self.last_id
+
+    def wait(self, event_id, timeout):
+        """Block until there is an event after event_id or timeout passes"""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while self.last_id <= event_id:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            return [(i, event) for i, event in self.events if i > event_id]
+
+EVENTS = FeedEvents()
+SERVER = None
+# path -> (etag, gzipped body), so many tabs revalidating the same version compress it once
+GZIP_CACHE = {}
+GZIP_CACHE_LOCK = threading.Lock()
+
+def read_version(destination_path):
+    """The version manifest written by feed_writer, or None"""
+    try:
+        with open(feed_artifact_paths(destination_path)["version"], 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def notify_published(name, destination_path, changed_pairs):
+    """Tell connected clients that data/<file> has a new version (no-op without a server)"""
+    if SERVER is None:
+        return None
+    manifest = read_version(destination_path) or {}
+    return EVENTS.publish({
+        "source": name,
+        "file": os.path.basename(destination_path),
+        "version": manifest.get("version"),
+        "updated": manifest.get("updated"),
+        "changed": [pair for pair in changed_pairs if not pair.startswith("(")]
+    })
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Static files with conditional GET and gzip, plus /events (SSE) and /poll (long-poll)"""
+
+    root = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/events":
+            self.send_events()
+        elif url.path == "/poll":
+            self.send_poll(parse_qs(url.query))
+        else:
+            self.send_file(url.path, head_only=False)
+
+    def do_HEAD(self):
+        self.send_file(urlsplit(self.path).path, head_only=True)
+
+    def resolve(self, url_path):
+        """Filesystem path for a URL path, or None if it is outside SITE_ENTRIES"""
+        parts = [part for part in unquote(url_path).split("/") if part]
+        if not parts:
+            parts = ["index.html"]
+        if parts[0] not in SITE_ENTRIES or any(part in ("..", ".") or part.startswith(".") for part in parts):
+            return None
+        path = os.path.join(self.root, *parts)
+        return path if os.path.isfile(path) else None
+
+    def send_file(self, url_path, head_only):
+        path = self.resolve(url_path)
+        if path is None:
+            self.send_error(404)
+            return
+        stat = os.stat(path)
+        # Size and mtime change on every atomic replace, and cost no read to compute
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        if self.not_modified(etag, stat.st_mtime):
+            inc("feed_requests_total", help_text="Feed server responses by status", status="304")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+
+        with open(path, 'rb') as f:
+            body = f.read()
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/json":
+            content_type += "; charset=utf-8"
+        encoding = None
+        if (len(body) >= GZIP_MIN_BYTES and content_type.startswith(GZIP_TYPES)
+                and "gzip" in self.headers.get("Accept-Encoding", "")):
+            body = self.compressed(path, etag, body)
+            encoding = "gzip"
+
+        inc("feed_requests_total", status="200")
+        inc("feed_bytes_sent_total", len(body), help_text="Response bytes sent by the feed server")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        # Always revalidate: the browser keeps the body and asks with If-None-Match
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    @staticmethod
+    def compressed(path, etag, body):
+        with GZIP_CACHE_LOCK:
+            cached = GZIP_CACHE.get(path)
+        if cached and cached[0] == etag:
+            return cached[1]
+        body = gzip.compress(body, compresslevel=6)
+        with GZIP_CACHE_LOCK:
+            GZIP_CACHE[path] = (etag, body)
+        return body
+
+    def not_modified(self, etag, mtime):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def send_events(self):
+        """Server-sent events: one "version" event per published file, comments as keep-alive"""
+        try:
+            last_id = int(self.headers.get("Last-Event-ID") or EVENTS.last_id)
+        except ValueError:
+            last_id = EVENTS.last_id
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "keep-alive")
+        self.end_headers()
+        self.close_connection = True
+        inc("feed_sse_connections_total", help_text="SSE connections accepted")
+        try:
+            self.wfile.write(b"retry: 5000\n\n")
+            self.wfile.flush()
+            while not self.server.stopping:
+                events = EVENTS.wait(last_id, HEARTBEAT_SECONDS)
+                if not events:
+                    self.wfile.write(b": keep-alive\n\n")
+                for event_id, event in events:
+                    data = json.dumps(event, ensure_ascii=False, separators=(',', ':'))
+                    self.wfile.write(f"id: {event_id}\nevent: version\ndata: {data}\n\n".encode('utf-8'))
+                    last_id = event_id
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass  # browser tab closed
+
+    def send_poll(self, query):
+        """Long-poll: wait for events after ?since=<id>; 204 when none arrived in time"""
+        try:
+            since = int(query.get("since", [EVENTS.last_id])[0])
+            timeout = min(float(query.get("timeout", [LONG_POLL_SECONDS])[0]), LONG_POLL_SECONDS)
+        except ValueError:
+            self.send_error(400, "since and timeout must be numbers")
+            return
+        events = EVENTS.wait(since, timeout)
+        if not events:
+            self.send_response(204)
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            return
+        body = json.dumps({"last_id": events[-1][0], "events": [event for _, event in events]},
+                          ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # the dashboard revalidates every few minutes per tab
+
+class FeedServer(ThreadingHTTPServer):
+    daemon_threads = True
+    stopping = False
+
+def start_feed_server(root, port, host="127.0.0.1"):
+    """Serve the dashboard and data/ from root on a daemon thread; returns the server"""
+    global SERVER
+    handler = type("BoundFeedHandler", (FeedHandler,), {"root": os.path.abspath(root)})
+    server = FeedServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="feed-server", daemon=True).start()
+    SERVER = server
+    set_gauge("feed_server_up", 1, help_text="1 while the feed server is running")
+    print(f"📡 Feed server at http://{host}:{server.server_address[1]}/ (live updates at /events)")
+    return server
+
+def stop_feed_server():
+    global SERVER
+    if SERVER is not None:
+        SERVER.stopping = True
+        SERVER.shutdown()
+        SERVER.server_close()
+        SERVER = None
+        set_gauge("feed_server_up", 0)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the dashboard and data/ with conditional GET and live updates")
+    parser.add_argument("--root", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--host", default="127.0.0.1")
+    args = parser.parse_args(argv)
+
+    # Standalone there is no updater to notify, so watch the version manifests instead
+    start_feed_server(args.root, args.port, args.host)
+    data_dir = os.path.join(args.root, "data")
+    seen = {}
+    try:
+        while True:
+            for name in sorted(os.listdir(data_dir)) if os.path.isdir(data_dir) else []:
+                if not name.endswith(".version.json"):
+                    continue
+                destination = os.path.join(data_dir, name[:-len(".version.json")] + ".json")
+                manifest = read_version(destination)
+                version = manifest and manifest.get("version")
+                if name in seen and version and seen[name] != version:
+                    notify_published(name[len("fx_signals_"):-len(".version.json")], destination, [])
+                seen[name] = version
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stop_feed_server()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import os
+from datetime import datetime
+from safe_io import atomic_write_json
+
+# Compact JSON: no indentation or spaces after separators
+COMPACT_SEPARATORS = (',', ':')
+
+def feed_artifact_paths(destination_path):
+    """Paths of the compact, version and delta files that sit next to a published JSON file"""
+    stem = os.path.splitext(destination_path)[0]
+    return {
+        "compact": f"{stem}.compact.json",
+        "version": f"{stem}.version.json",
+        "delta": f"{stem}.delta.json"
+    }
+
+def collect_fields(pairs):
+    """Field names across all pairs, in order of first appearance"""
+    fields = []
+    seen = set()
+    for values in pairs.values():
+        for field in values:
+            if field not in seen:
+                seen.add(field)
+                fields.append(field)
+    return fields
+
+def to_columnar(data):
+    """Turn {"forexData": {pair: {field: value}}} into a field list plus one row per pair"""
+    pairs = data.get('forexData') or {}
+    fields = collect_fields(pairs)
+    feed = {key: value for key, value in data.items() if key != 'forexData'}
+    feed["fields"] = fields
+    feed["pairs"] = list(pairs)
+    feed["rows"] = [[values.get(field) for field in fields] for values in pairs.values()]
+    return feed
+
+def build_delta(data, changed_pairs, previous_hash, current_hash):
+    """Rows for the pairs that changed since the previous version, plus removed pairs"""
+    pairs = data.get('forexData') or {}
+    fields = collect_fields(pairs)
+    changed = [pair for pair in changed_pairs if pair in pairs]
+    return {
+        "from": previous_hash,
+        "to": current_hash,
+        "fields": fields,
+        "pairs": changed,
+        "rows": [[pairs[pair].get(field) for field in fields] for pair in changed],
+        "removed": [pair for pair in changed_pairs if pair not in pairs and not pair.startswith('(')]
+    }
+
+def write_feed_artifacts(destination_path, data, digests, changed_pairs, previous_hash=None):
+    """Write the compact feed, the per-cycle delta and the version manifest (manifest last)"""
+    paths = feed_artifact_paths(destination_path)
+    current_hash = digests["file"]
+
+    atomic_write_json(paths["compact"], to_columnar(data),
+                      ensure_ascii=False, separators=COMPACT_SEPARATORS)
+    atomic_write_json(paths["delta"], build_delta(data, changed_pairs, previous_hash, current_hash),
+                      ensure_ascii=False, separators=COMPACT_SEPARATORS)
+
+    # Clients poll this small file and only fetch a payload when "version" changes,
+    # so it is written after the files it points at
+    atomic_write_json(paths["version"], {
+        "version": current_hash[:16],
+        "hash": current_hash,
+        "previous": previous_hash,
+        "updated": datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+        "pairs": len(data.get('forexData') or {}),
+        "full": os.path.basename(destination_path),
+        "compact": os.path.basename(paths["compact"]),
+        "delta": os.path.basename(paths["delta"])
+    }, separators=COMPACT_SEPARATORS)
+    return list(paths.values())
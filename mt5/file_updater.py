@@ -1,17 +1,120 @@
 import os
+import sys
 import time
 import subprocess
+import threading
 import json
-import smtplib
+import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, BrokenExecutor, wait
 from datetime import datetime
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from alert_dispatcher import AlertDispatcher, SmtpSink, FileSink, WebhookSink
+from change_detector import load_state, save_state, detect_changes, record_published
+from encoding_utils import iter_decodings
+from git_publisher import commit_paths, push, to_repo_paths, existing_or_tracked
+from git_compactor import compact_history
+from feed_server import start_feed_server, notify_published
+from push_queue import PushQueue
+from safe_io import atomic_write_json, read_stable_bytes
+from feed_writer import write_feed_artifacts, feed_artifact_paths
+from history_store import append_snapshot
+from image_manifest import update_images, PIL_AVAILABLE
+from signal_validator import validate_payload, write_quarantine
+from file_watcher import WATCHDOG_AVAILABLE, DEBOUNCE_SECONDS
+from pipeline_metrics import (stage, inc, observe, set_gauge, log_event, configure_event_log,
+                              write_metrics_file, start_metrics_server, METRICS_FILE, EVENT_LOG_FILE)
+from terminal_config import ConfigReloader, expand_files, watch_with_reload, CONFIG_FILE
+try:
+    from signal_analytics import write_analytics_summary, ANALYTICS_DAYS
+    ANALYTICS_AVAILABLE = True
+except ImportError:  # numpy not installed
+    ANALYTICS_AVAILABLE = False
 
 # Configuration
+# Built-in single-terminal defaults; terminals.toml (see terminal_config.py)
+# replaces them at startup and whenever it changes
 SOURCE_BASE_PATH = r"C:\Users\MT4ver2-e18-AZIzrF0D\AppData\Roaming\MetaQuotes\Terminal\7E59B46FD773C6FE7B889FC92951284D\MQL5\Files"
 DESTINATION_BASE_PATH = r"C:\Users\MT4ver2-e18-AZIzrF0D\CounterTrader\counter_trader\data"
 GIT_REPO_PATH = r"C:\Users\MT4ver2-e18-AZIzrF0D\CounterTrader\counter_trader"
 
+# Trigger mode: "watch" copies as soon as the EA finishes writing a file,
+# "schedule" keeps the old behaviour of copying at minute 4 of each hour.
+# Can be overridden on the command line: python file_updater.py schedule
+TRIGGER_MODE = "watch"
+SCHEDULE_MINUTE = 4
+
+# Digests of the last published payloads - identical EA output skips write and git
+PUBLISH_STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "publish_state.json")
+
+# Pushes run on a background worker with retries and backoff so a slow remote
+# never blocks file copying. Set to False to push inline as before.
+ASYNC_PUSH = True
+
+# Also publish a compact columnar feed, a per-cycle delta and a small version
+# manifest next to each JSON file, so the dashboard can poll a few bytes
+WRITE_COMPACT_FEED = True
+
+# Check every pair against the signal schema (signal_validator.py) and publish only
+# the good ones; the rest are listed with reasons in mt5/quarantine/<name>.json.
+# Pairs unchanged since the last publish skip the field checks.
+VALIDATE_SIGNALS = True
+
+# Append every published snapshot to the local history store (mt5/history/, one SQLite file per day)
+HISTORY_ENABLED = True
+# Refresh and commit data/signal_analytics_<name>.json from the history once a day at
+# ANALYTICS_HOUR (needs numpy). It reads ANALYTICS_DAYS of snapshots, so it is kept
+# out of the per-publish path.
+ANALYTICS_ENABLED = True
+ANALYTICS_HOUR = 23
+LAST_ANALYTICS_DATE = None
+
+# FILES_CONFIG entries are processed concurrently so one slow or broken file
+# does not hold up the rest. "thread" is enough for the EA's JSON files;
+# "process" spreads decode/parse/write over CPU cores for many large sets
+# (on Windows the workers re-import this file, so configure it here, not at runtime).
+WORKER_POOL = "thread"
+MAX_WORKERS = 4
+FILE_TIMEOUT_SECONDS = 60
+WORKER_EXECUTOR = None
+# name -> future of a worker that outlived FILE_TIMEOUT_SECONDS. A running future
+# cannot be cancelled, so that file is skipped until its worker has finished,
+# rather than a second worker writing the same destination at the same time.
+IN_FLIGHT = {}
+
+PUSH_QUEUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "push_queue.json")
+PUSH_QUEUE = None
+# Alert when queued commits have not reached the remote for this long
+PUSH_BACKLOG_ALERT_MINUTES = 60
+# Squash hourly signal-only commits older than COMPACT_KEEP_DAYS into one commit per
+# day (scheduler.py, nightly), so clone, fetch and push stay fast over the years.
+# This rewrites and force-pushes the branch - other clones must reset to the remote.
+# The old commits are bundled in mt5/git_archive/ first.
+COMPACT_HISTORY = False
+COMPACT_KEEP_DAYS = 7
+# Keep images/manifest.json and the chart thumbnails/WebP (needs Pillow) up to date
+# and commit new charts on their own, after each publish and every hour at minute 10.
+# Only the WebP variants are committed for charts that have them (image_manifest.COMMIT_ORIGINALS).
+# Charts older than IMAGES_KEEP_DAYS move to mt5/image_archive/ (None keeps all).
+IMAGES_ENABLED = True
+IMAGES_KEEP_DAYS = None
+# Extra catch-all commit of every updater output at 23:00 (scheduler.py). Off, as in the
+# original loop: each publish already commits its own files. Needs a restart to change.
+DAILY_GIT_COMMIT = False
+# Held while files are copied and committed, so the watcher and scheduled jobs never overlap
+PUBLISH_LOCK = threading.Lock()
+
+# Stage timings and counters: written to METRICS_FILE after every cycle and, if
+# METRICS_PORT is set, served at http://127.0.0.1:<port>/metrics. Events go to
+# EVENT_LOG_FILE as JSON lines. Set either path to None to turn it off.
+# (With WORKER_POOL = "process" the per-stage numbers of the workers are not collected.)
+METRICS_PORT = None
+
+# Serve the dashboard and data/ on http://127.0.0.1:<port>/ with ETag/Last-Modified
+# and gzip, and push a "version" event to /events (SSE) and /poll (long-poll) as
+# soon as a file is published. None keeps the server off.
+FEED_SERVER_PORT = None
+METRICS_FILE_PATH = METRICS_FILE
+EVENT_LOG_PATH = EVENT_LOG_FILE
+
 # Gmail Alert Configuration for Git Commands
 GMAIL_CONFIG = {
     "enabled": True,
@@ -22,6 +125,12 @@ GMAIL_CONFIG = {
     "smtp_port": 587
 }
 
+# Additional alert sinks (None to disable) and duplicate suppression window
+ALERT_LOG_FILE = None
+ALERT_WEBHOOK_URL = None
+ALERT_DEDUP_WINDOW_SECONDS = 3600
+ALERT_DISPATCHER = None
+
 # File configurations
 FILES_CONFIG = [
     {
@@ -35,6 +144,7 @@ FILES_CONFIG = [
         "name": "28pair"
     }
 ]
+CONFIG_RELOADER = ConfigReloader(CONFIG_FILE)
 
 def is_weekend_block_time():
     """Check if current time is within the weekend block period (Saturday 6 AM to Monday 6 AM)"""
@@ -56,18 +166,31 @@ def is_weekend_block_time():
     
     return False
 
+def get_alert_dispatcher():
+    """Create the background alert dispatcher and its sinks on first use"""
+    global ALERT_DISPATCHER
+    if ALERT_DISPATCHER is None:
+        sinks = []
+        if GMAIL_CONFIG["enabled"]:
+            sinks.append(SmtpSink(GMAIL_CONFIG["smtp_server"], GMAIL_CONFIG["smtp_port"],
+                                  GMAIL_CONFIG["sender_email"], GMAIL_CONFIG["recipient_email"],
+                                  GMAIL_CONFIG["app_password"]))
+        if ALERT_LOG_FILE:
+            sinks.append(FileSink(ALERT_LOG_FILE))
+        if ALERT_WEBHOOK_URL:
+            sinks.append(WebhookSink(ALERT_WEBHOOK_URL))
+        ALERT_DISPATCHER = AlertDispatcher(sinks, dedup_window=ALERT_DEDUP_WINDOW_SECONDS)
+    return ALERT_DISPATCHER
+
 def send_git_failure_alert(error_message, operation_type="Git Command"):
-    """Send immediate email alert for git command failures"""
-    if not GMAIL_CONFIG["enabled"]:
+    """Queue an alert for git command failures (delivered in the background, repeats aggregated)"""
+    dispatcher = get_alert_dispatcher()
+    if not dispatcher.sinks:
         return False
     
-    try:
-        msg = MIMEMultipart()
-        msg['From'] = GMAIL_CONFIG["sender_email"]
-        msg['To'] = GMAIL_CONFIG["recipient_email"]
-        msg['Subject'] = f"🚨 URGENT: Git Command Failed - File Updater [{datetime.now().strftime('%H:%M:%S')}]"
-        
-        body = f"""
+    subject = f"🚨 URGENT: Git Command Failed - File Updater [{datetime.now().strftime('%H:%M:%S')}]"
+    
+    body = f"""
 🚨 GIT COMMAND FAILURE ALERT 🚨
 
 TIME: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -90,28 +213,149 @@ REPOSITORY: {GIT_REPO_PATH}
 SYSTEM INFO:
 - Source Path: {SOURCE_BASE_PATH}
 - Destination Path: {DESTINATION_BASE_PATH}
-- Trigger: File copy at minute 4 of each hour
+- Trigger: {TRIGGER_MODE} mode
 
 This alert is for GIT COMMANDS ONLY from the File Updater system.
 
 ---
 File Updater Automated Monitor
-        """
-        
-        msg.attach(MIMEText(body, 'plain'))
-        
-        server = smtplib.SMTP(GMAIL_CONFIG["smtp_server"], GMAIL_CONFIG["smtp_port"])
-        server.starttls()
-        server.login(GMAIL_CONFIG["sender_email"], GMAIL_CONFIG["app_password"])
-        server.sendmail(GMAIL_CONFIG["sender_email"], GMAIL_CONFIG["recipient_email"], msg.as_string())
-        server.quit()
-        
-        print("✅ Git failure email alert sent!")
+    """
+    
+    # Identical failures share a key so a flapping network sends one email per window
+    dispatcher.send(subject, body, key=(operation_type, error_message))
+    print("📨 Git failure alert queued")
+    return True
+
+def get_push_queue():
+    """Create the durable push queue on first use"""
+    global PUSH_QUEUE
+    if PUSH_QUEUE is None:
+        PUSH_QUEUE = PushQueue(GIT_REPO_PATH, PUSH_QUEUE_FILE,
+                               on_failure=lambda error_msg: send_git_failure_alert(error_msg, "Git Push Retry"))
+    return PUSH_QUEUE
+
+def push_or_enqueue(commit_message):
+    """Hand the new commit to the push worker, or push inline when ASYNC_PUSH is off"""
+    if ASYNC_PUSH:
+        get_push_queue().enqueue(commit_message)
+        print("📤 Commit queued for push")
+        return
+    push(GIT_REPO_PATH)
+
+def check_push_backlog():
+    """Alert if commits have been waiting for a push longer than PUSH_BACKLOG_ALERT_MINUTES"""
+    if not ASYNC_PUSH:
+        return
+    status = get_push_queue().status()
+    if not status["oldest"]:
+        return
+    waiting = datetime.now() - datetime.strptime(status["oldest"], '%Y-%m-%d %H:%M:%S')
+    if waiting.total_seconds() < PUSH_BACKLOG_ALERT_MINUTES * 60:
+        return
+    error_msg = (f"{status['pending']} commit(s) waiting to be pushed since {status['oldest']} "
+                 f"after {status['attempts']} failed attempt(s)\nLast error: {status['last_error']}")
+    print(f"⚠️ {error_msg}")
+    send_git_failure_alert(error_msg, "Git Push Backlog")
+
+def compact_git_history():
+    """Squash old hourly commits into daily ones (skipped while a push is pending)"""
+    if not COMPACT_HISTORY:
+        return None
+    if ASYNC_PUSH and get_push_queue().status()["pending"]:
+        print("ℹ️ Push backlog pending - history compaction postponed")
+        return None
+    data_dir = to_repo_paths(GIT_REPO_PATH, [DESTINATION_BASE_PATH])[0]
+    with stage("git_compact"):
+        result = compact_history(GIT_REPO_PATH, data_dir, COMPACT_KEEP_DAYS)
+    if result.get("missing_history_days"):
+        print(f"⚠️ No history store data for {', '.join(result['missing_history_days'])} "
+              f"- their hourly versions are only in the git archive bundle")
+    if result["compacted"]:
+        print(f"🗜️ Squashed {result['squashed']} signal commit(s) into {result['days']} daily commit(s) "
+              f"(archive: {os.path.basename(result['archive'])})")
+    else:
+        print(f"ℹ️ History not compacted: {result['reason']}")
+    return result
+
+def sync_images():
+    """Update the image manifest and variants; returns the changed paths git can stage"""
+    if not IMAGES_ENABLED:
+        return []
+    images_dir = os.path.join(GIT_REPO_PATH, "images")
+    if not os.path.isdir(images_dir):
+        return []
+    with stage("images"):
+        result = update_images(images_dir, IMAGES_KEEP_DAYS)
+    if result["added"] or result["changed"] or result["archived"]:
+        print(f"🖼️ Charts: {result['added']} new, {result['changed']} changed, {result['encoded']} encoded, "
+              f"{result['archived']} archived ({result['images']} in manifest)")
+        inc("images_encoded_total", result["encoded"], help_text="Chart images given thumbnail/WebP variants")
+    return existing_or_tracked(GIT_REPO_PATH, result["paths"])
+
+def publish_images():
+    """Commit new or changed chart images, their variants and the manifest on their own"""
+    if not IMAGES_ENABLED or is_weekend_block_time():
+        return False
+    try:
+        paths = sync_images()
+        commit_message = f"Update chart images - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        if not paths or not commit_paths(GIT_REPO_PATH, paths, commit_message):
+            return True
+        log_event("git_committed", files=len(paths), message=commit_message)
+        push_or_enqueue(commit_message)
         return True
-        
+    except subprocess.TimeoutExpired:
+        error_msg = "Chart image push timed out after 30 seconds - check internet connection"
+    except subprocess.CalledProcessError as e:
+        error_msg = f"Chart image git command failed: '{' '.join(e.cmd)}' (exit code: {e.returncode})"
+        if e.stderr:
+            error_msg += f"\nError output: {e.stderr}"
     except Exception as e:
-        print(f"❌ Failed to send git failure email: {e}")
+        error_msg = f"Chart image update error: {e}"
+    print(f"❌ {error_msg}")
+    send_git_failure_alert(error_msg, "Chart Image Commit")
+    return False
+
+def publish_analytics():
+    """Rebuild the signal analytics of every FILES_CONFIG entry from the history and commit them"""
+    global LAST_ANALYTICS_DATE
+    if not (ANALYTICS_ENABLED and ANALYTICS_AVAILABLE and HISTORY_ENABLED):
         return False
+    paths = []
+    for config in FILES_CONFIG:
+        try:
+            with stage("analytics", file=config["name"]):
+                paths.append(write_analytics_summary(config["name"], os.path.dirname(config["destination"]),
+                                                     ANALYTICS_DAYS))
+        except Exception as e:
+            print(f"⚠️ Failed to update {config['name']} analytics: {e}")
+    LAST_ANALYTICS_DATE = datetime.now().date()
+    if not paths or is_weekend_block_time():
+        return bool(paths)
+    try:
+        commit_message = f"Update signal analytics - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        if commit_paths(GIT_REPO_PATH, paths, commit_message):
+            log_event("git_committed", files=len(paths), message=commit_message)
+            push_or_enqueue(commit_message)
+        return True
+    except subprocess.TimeoutExpired:
+        error_msg = "Analytics push timed out after 30 seconds - check internet connection"
+    except subprocess.CalledProcessError as e:
+        error_msg = f"Analytics git command failed: '{' '.join(e.cmd)}' (exit code: {e.returncode})"
+        if e.stderr:
+            error_msg += f"\nError output: {e.stderr}"
+    except Exception as e:
+        error_msg = f"Analytics commit error: {e}"
+    print(f"❌ {error_msg}")
+    send_git_failure_alert(error_msg, "Signal Analytics Commit")
+    return False
+
+def publish_analytics_if_due(now=None):
+    """Run publish_analytics once a day from ANALYTICS_HOUR (the standalone watch/schedule loops)"""
+    now = now or datetime.now()
+    if now.hour >= ANALYTICS_HOUR and LAST_ANALYTICS_DATE != now.date():
+        return publish_analytics()
+    return None
 
 def clean_json_content(content):
     """Clean and normalize JSON content"""
@@ -127,90 +371,261 @@ def clean_json_content(content):
     
     return content
 
-def read_with_multiple_encodings(file_path):
-    """Try multiple encoding methods to read the file"""
+def decode_json_bytes(raw):
+    """Parse EA output bytes: the sniffed encoding first, then the other encodings"""
     encodings = ['utf-16-le', 'utf-16-be', 'utf-16', 'utf-8-sig', 'utf-8', 'cp1252', 'latin-1']
     
-    for encoding in encodings:
+    # Detected encoding is tried first; the rest only run on the in-memory buffer
+    for encoding, content in iter_decodings(raw, encodings):
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                content = f.read()
-            
             # Clean the content
             content = clean_json_content(content)
             
             if content:
                 # Try to parse as JSON
                 data = json.loads(content)
+                inc("decode_attempts_total", help_text="Decode + JSON parse attempts by encoding",
+                    encoding=encoding, result="parsed")
                 return data
                 
-        except (UnicodeDecodeError, json.JSONDecodeError):
+        except json.JSONDecodeError:
+            inc("decode_attempts_total", encoding=encoding, result="invalid_json")
             continue
         except Exception:
             continue
     
     return None
 
-def copy_file_safely(source_path, destination_path, file_name):
-    """Copy file with robust encoding handling"""
+def read_with_multiple_encodings(file_path):
+    """Read the file once, decode with the sniffed encoding and fall back to other encodings"""
+    try:
+        raw = read_stable_bytes(file_path)
+    except OSError:
+        return None
+    if raw is None:
+        print(f"Source file is still being written, skipping this cycle: {file_path}")
+        inc("source_unsettled_total", help_text="Reads skipped because the EA was still writing")
+        return None
+    inc("source_bytes_read_total", len(raw), help_text="Bytes read from EA output files")
+    return decode_json_bytes(raw)
+
+def copy_file_safely(source_path, destination_path, file_name, state=None):
+    """Copy file with robust encoding handling
+    
+    Returns the list of changed pairs ([] if unchanged and skipped), or None on failure.
+    """
     try:
         if not os.path.exists(source_path):
             print(f"{file_name} source file not found: {source_path}")
-            return False
+            inc("files_total", help_text="Files processed by outcome", file=file_name, result="missing")
+            return None
+        # When the EA last wrote the file, for the write-to-publish lag
+        source_mtime = os.path.getmtime(source_path)
         
         # Create destination folder if needed
         os.makedirs(os.path.dirname(destination_path), exist_ok=True)
         
         # Read with multiple encoding attempts
-        data = read_with_multiple_encodings(source_path)
+        with stage("read_decode", file=file_name):
+            data = read_with_multiple_encodings(source_path)
         
         if data is None:
             print(f"Failed to read {file_name} source file with any encoding")
-            return False
+            inc("files_total", file=file_name, result="unreadable")
+            log_event("file_unreadable", logging.WARNING, file=file_name, source=source_path)
+            return None
         
         # Validate JSON structure
-        if 'forexData' not in data:
+        if not isinstance(data, dict) or not isinstance(data.get('forexData'), dict):
             print(f"Invalid JSON structure in {file_name} - missing 'forexData'")
-            return False
+            inc("files_total", file=file_name, result="invalid")
+            log_event("file_invalid", logging.WARNING, file=file_name, reason="missing forexData")
+            return None
+        
+        pair_digests = None
+        if VALIDATE_SIGNALS:
+            data, pair_digests = validate_signals(data, file_name, source_path, state)
+            if data is None:
+                return None
+        
+        # Skip the write entirely if the payload matches the last published one
+        changed_pairs = list(data['forexData'])
+        if state is not None:
+            with stage("change_detect", file=file_name):
+                digests, changed_pairs = detect_changes(file_name, data, state, pair_digests)
+            if not changed_pairs and os.path.exists(destination_path):
+                print(f"{file_name} unchanged since last publish - skipping write")
+                inc("files_total", file=file_name, result="unchanged")
+                return []
         
         # Write as clean UTF-8 to destination
-        with open(destination_path, 'w', encoding='utf-8') as dest:
-            json.dump(data, dest, ensure_ascii=False, indent=2)
+        # (temp file + fsync + rename, so readers never see a partial file)
+        with stage("write", file=file_name):
+            atomic_write_json(destination_path, data, ensure_ascii=False, indent=2)
         
-        print(f"{file_name} file copied and converted at {datetime.now().strftime('%H:%M')}")
-        return True
+        if state is not None:
+            if WRITE_COMPACT_FEED:
+                previous_hash = (state.get("files", {}).get(file_name) or {}).get("file")
+                with stage("feed", file=file_name):
+                    write_feed_artifacts(destination_path, data, digests, changed_pairs, previous_hash)
+            record_published(file_name, digests, state)
+        
+        if HISTORY_ENABLED:
+            try:
+                with stage("history", file=file_name):
+                    append_snapshot(data, file_name, content_hash=digests["file"] if state is not None else None)
+            except Exception as e:
+                # History is a side channel - never block publishing on it
+                print(f"⚠️ Failed to append {file_name} to history store: {e}")
+        
+        lag = time.time() - source_mtime
+        inc("files_total", file=file_name, result="published")
+        observe("write_to_publish_lag_seconds", lag,
+                help_text="Seconds from the EA writing a file to its published copy", file=file_name)
+        set_gauge("last_publish_timestamp_seconds", time.time(), help_text="Unix time of the last publish", file=file_name)
+        log_event("file_published", file=file_name, changed_pairs=len(changed_pairs), lag_seconds=round(lag, 3))
+        print(f"{file_name} file copied and converted at {datetime.now().strftime('%H:%M')} "
+              f"({len(changed_pairs)} pairs changed)")
+        return changed_pairs
         
     except Exception as e:
         print(f"Copy error for {file_name}: {e}")
-        return False
+        inc("files_total", file=file_name, result="error")
+        log_event("file_error", logging.ERROR, file=file_name, error=str(e))
+        return None
 
-def run_git_commands():
+def validate_signals(data, file_name, source_path, state=None):
+    """Drop pairs that fail the signal schema and record why
+    
+    Returns (cleaned data, reusable pair digests); data is None if no pair is left.
+    """
+    known_good = (state.get("files", {}).get(file_name) or {}).get("pairs") if state is not None else None
+    with stage("validate", file=file_name):
+        cleaned, quarantined, pair_digests, checked = validate_payload(data, known_good)
+    inc("pairs_validated_total", checked, help_text="Pairs that went through the full schema check", file=file_name)
+    try:
+        write_quarantine(file_name, source_path, quarantined)
+    except OSError as e:
+        print(f"⚠️ Failed to write {file_name} quarantine list: {e}")
+    
+    if quarantined:
+        inc("pairs_quarantined_total", len(quarantined), help_text="Pairs held back by the schema check",
+            file=file_name)
+        print(f"⚠️ {file_name}: {len(quarantined)} pair(s) quarantined - "
+              + "; ".join(f"{pair}: {entry['reasons'][0]}" for pair, entry in list(quarantined.items())[:3]))
+        log_event("pairs_quarantined", logging.WARNING, file=file_name,
+                  pairs={pair: entry["reasons"] for pair, entry in quarantined.items()})
+    
+    if not cleaned['forexData']:
+        print(f"Invalid signal data in {file_name} - every pair failed validation")
+        inc("files_total", file=file_name, result="invalid")
+        log_event("file_invalid", logging.WARNING, file=file_name, reason="no valid pairs")
+        return None, None
+    return cleaned, pair_digests
+
+def get_worker_pool():
+    """Create the FILES_CONFIG worker pool on first use"""
+    global WORKER_EXECUTOR
+    if WORKER_EXECUTOR is None:
+        executor = ProcessPoolExecutor if WORKER_POOL == "process" else ThreadPoolExecutor
+        WORKER_EXECUTOR = executor(max_workers=MAX_WORKERS)
+    return WORKER_EXECUTOR
+
+def process_file(config, file_state):
+    """Worker: copy one FILES_CONFIG entry against its own slice of the publish state
+    
+    Returns (changed_pairs, file_state, seconds). The updated slice is handed back
+    rather than shared, so the same code runs on a thread or a process pool.
+    """
+    started = time.perf_counter()
+    changed_pairs = copy_file_safely(config["source"], config["destination"], config["name"], file_state)
+    return changed_pairs, file_state, time.perf_counter() - started
+
+def process_files(configs, state):
+    """Copy every config on the worker pool and merge the new digests into state
+    
+    Returns {name: changed_pairs}, with None for files that failed, timed out or
+    are still being processed by a worker that timed out in an earlier cycle.
+    """
+    global WORKER_EXECUTOR
+    pool = get_worker_pool()
+    published = state.setdefault("files", {})
+    results = {}
+    futures = {}
+    for config in configs:
+        late = IN_FLIGHT.get(config["name"])
+        if late is not None:
+            if not late.done():
+                print(f"⏱️ {config['name']} worker from an earlier cycle still running - skipped")
+                results[config["name"]] = None
+                continue
+            # Its result is dropped: the state was not updated, so this cycle sees
+            # the file as changed and publishes and commits it as usual
+            del IN_FLIGHT[config["name"]]
+        file_state = {"files": {name: digests for name, digests in published.items() if name == config["name"]}}
+        futures[pool.submit(process_file, config, file_state)] = config["name"]
+    
+    done, not_done = wait(futures, timeout=FILE_TIMEOUT_SECONDS)
+    for future, name in futures.items():
+        results[name] = None
+        if future in not_done:
+            print(f"⏱️ {name} still running after {FILE_TIMEOUT_SECONDS}s - left out of this batch")
+            IN_FLIGHT[name] = future
+            continue
+        try:
+            changed_pairs, file_state, seconds = future.result()
+        except Exception as e:
+            print(f"❌ {name} worker failed: {e}")
+            if isinstance(e, BrokenExecutor):
+                WORKER_EXECUTOR = None
+            continue
+        print(f"⏱️ {name} processed in {seconds:.2f}s")
+        observe("file_processing_seconds", seconds, help_text="Read to publish time per file", file=name)
+        if changed_pairs is not None:
+            published.update(file_state["files"])
+        results[name] = changed_pairs
+    return results
+
+def format_changed_pairs(changed_files):
+    """Describe changed pairs per file, e.g. '28pair: USDJPY, EURJPY'"""
+    return "\n".join(f"{name}: {', '.join(pairs)}" for name, pairs in changed_files.items())
+
+def get_output_paths(names=None):
+    """Every file the updater publishes for the given FILES_CONFIG names (all if None)"""
+    paths = []
+    for config in FILES_CONFIG:
+        if names and config["name"] not in names:
+            continue
+        paths.append(config["destination"])
+        if WRITE_COMPACT_FEED:
+            paths.extend(feed_artifact_paths(config["destination"]).values())
+    return [path for path in paths if os.path.exists(path)]
+
+def run_git_commands(changed_files=None):
     """Execute git commands for both files - WITH EMAIL ALERTS ON FAILURE"""
     # Check if we're in weekend block time
     if is_weekend_block_time():
         print("Weekend block time - skipping git commit (Saturday 6 AM to Monday 6 AM)")
         return False
     
+    # Only stage what the updater produced - changed files, or all outputs if unknown
+    destinations = get_output_paths(changed_files)
+    
     try:
-        os.chdir(GIT_REPO_PATH)
-        
-        # Check if there are changes to commit
-        result = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True, check=True)
-        if not result.stdout.strip():
+        # Stage and commit in one add + one commit (no status, no per-file add)
+        commit_message = f"Update forex signals - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        body = "Changed pairs:\n" + format_changed_pairs(changed_files) if changed_files else None
+        with stage("git_commit"):
+            committed = commit_paths(GIT_REPO_PATH, destinations, commit_message, body)
+        if not committed:
             print("No changes to commit")
             return True
+        log_event("git_committed", files=len(destinations), message=commit_message)
         
-        # Add both files
-        subprocess.run(["git", "add", "data/fx_signals_10pair.json"], check=True)
-        subprocess.run(["git", "add", "data/fx_signals_28pair.json"], check=True)
-        
-        # Commit with timestamp
-        commit_message = f"Update forex signals - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        subprocess.run(["git", "commit", "-m", commit_message], check=True)
-        
-        # Push to remote with timeout
+        # Push to remote with timeout (or queue it for the background worker)
         try:
-            subprocess.run(["git", "push", "-u", "origin", "main"], check=True, timeout=30)
+            with stage("git_push" if not ASYNC_PUSH else "git_enqueue"):
+                push_or_enqueue(commit_message)
         except subprocess.TimeoutExpired:
             error_msg = "Git push timed out after 30 seconds - check internet connection"
             print(f"❌ {error_msg}")
@@ -238,31 +653,24 @@ def run_git_commands():
         return False
 
 def run_git_commands_all():
-    """Execute git commands for all files at 23:00 - WITH EMAIL ALERTS ON FAILURE"""
+    """Execute git commands for all updater outputs at 23:00 - WITH EMAIL ALERTS ON FAILURE"""
     # Check if we're in weekend block time
     if is_weekend_block_time():
         print("Weekend block time - skipping scheduled git commit (Saturday 6 AM to Monday 6 AM)")
         return False
     
     try:
-        os.chdir(GIT_REPO_PATH)
-        
-        # Check if there are changes to commit
-        result = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True, check=True)
-        if not result.stdout.strip():
+        # Stage every file the updater writes - never `git add .` over images/;
+        # the image manifest lists exactly which charts and variants changed
+        destinations = get_output_paths() + sync_images()
+        commit_message = f"Scheduled commit - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        if not commit_paths(GIT_REPO_PATH, destinations, commit_message):
             print("No changes to commit")
             return True
         
-        # Add all changes
-        subprocess.run(["git", "add", "."], check=True)
-        
-        # Commit with timestamp
-        commit_message = f"Scheduled commit - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        subprocess.run(["git", "commit", "-m", commit_message], check=True)
-        
-        # Push to remote with timeout
+        # Push to remote with timeout (or queue it for the background worker)
         try:
-            subprocess.run(["git", "push", "-u", "origin", "main"], check=True, timeout=30)
+            push_or_enqueue(commit_message)
         except subprocess.TimeoutExpired:
             error_msg = "Scheduled git push timed out after 30 seconds - check internet connection"
             print(f"❌ {error_msg}")
@@ -289,19 +697,47 @@ def run_git_commands_all():
         send_git_failure_alert(error_msg, "Scheduled Git Commands (23:00)")
         return False
 
-def move_files():
-    """Process both JSON files"""
-    success_count = 0
+def move_files(changed_sources=None):
+    """Process all JSON files in parallel (or only the ones in changed_sources), then publish in one commit"""
+    configs = FILES_CONFIG
+    if changed_sources is not None:
+        configs = [config for config in FILES_CONFIG if config["source"] in changed_sources]
     
-    for config in FILES_CONFIG:
-        if copy_file_safely(config["source"], config["destination"], config["name"]):
-            success_count += 1
+    state = load_state(PUBLISH_STATE_FILE)
+    started = time.perf_counter()
+    results = process_files(configs, state)
+    success_count = sum(1 for changed_pairs in results.values() if changed_pairs is not None)
+    changed_files = {name: changed_pairs for name, changed_pairs in results.items() if changed_pairs}
+    batch_seconds = time.perf_counter() - started
+    print(f"⏱️ {len(configs)} file(s) processed in {batch_seconds:.2f}s "
+          f"({MAX_WORKERS} {WORKER_POOL} workers)")
+    observe("batch_seconds", batch_seconds, help_text="Time to process one batch of files")
+    # Live clients reload now rather than waiting for git and the next deploy
+    for config in configs:
+        if results.get(config["name"]):
+            notify_published(config["name"], config["destination"], results[config["name"]])
+    
+    # Remember that a commit is owed until git succeeds, so a failed push is retried
+    # on the next cycle even if the EA output has not changed again. Digests only
+    # move when a file changed, so an unchanged cycle leaves the state file alone
+    if changed_files:
+        state["pending_commit"] = True
+        save_state(state, PUBLISH_STATE_FILE)
     
     if success_count > 0:
-        print(f"Successfully copied {success_count}/{len(FILES_CONFIG)} files")
+        print(f"Successfully copied {success_count}/{len(configs)} files")
+        
+        if not changed_files and not state.get("pending_commit"):
+            print("No signal changes since last publish - skipping git")
+            return
+        
+        if changed_files:
+            print("Changed pairs:\n" + format_changed_pairs(changed_files))
         
         # Only run git commands if at least one file was copied successfully
-        run_git_commands()  # This now has email alerts and weekend blocking
+        if run_git_commands(changed_files):  # This now has email alerts and weekend blocking
+            state["pending_commit"] = False
+            save_state(state, PUBLISH_STATE_FILE)
     else:
         print("No files were copied successfully")
 
@@ -312,6 +748,16 @@ def check_file_existence():
         status = "EXISTS" if exists else "MISSING"
         print(f"{config['name']} file: {status}")
 
+def get_push_status():
+    """Get current push queue status for display"""
+    if not ASYNC_PUSH:
+        return "DISABLED (pushing inline)"
+    status = get_push_queue().status()
+    if not status["pending"]:
+        return f"IDLE (last push: {status['last_success'] or 'never'})"
+    return (f"{status['pending']} commit(s) pending since {status['oldest']}, "
+            f"{status['attempts']} failed attempt(s), next try in {status['next_attempt_in']}s")
+
 def get_weekend_status():
     """Get current weekend block status for display"""
     if is_weekend_block_time():
@@ -319,34 +765,82 @@ def get_weekend_status():
     else:
         return "INACTIVE (Commits allowed)"
 
-def main():
-    """Main monitoring loop"""
-    print("Forex JSON File Monitor Started")
-    print("📧 Gmail alerts ENABLED for GIT COMMANDS ONLY")
-    print(f"📧 Alert email: {GMAIL_CONFIG['recipient_email']}")
-    print("🚫 Weekend commit block: Saturday 6 AM to Monday 6 AM")
-    print(f"🚫 Weekend block status: {get_weekend_status()}")
-    print("Monitoring for fx_signals_10pair.json and fx_signals_28pair.json")
-    print("Checking file sources...")
-    check_file_existence()
-    print("Will copy files at minute 4 of each hour")
-    print("Will execute git commands at 23:00 daily (except during weekend block)")
-    print("Email alerts will be sent ONLY for git command failures")
+def publish_metrics():
+    """Refresh the metrics file at the end of a cycle"""
+    if ASYNC_PUSH and PUSH_QUEUE is not None:
+        set_gauge("push_queue_pending", PUSH_QUEUE.status()["pending"], help_text="Commits waiting to be pushed")
+    try:
+        write_metrics_file(METRICS_FILE_PATH)
+    except OSError as e:
+        print(f"⚠️ Failed to write metrics file: {e}")
+
+def apply_config(config):
+    """Switch to the terminals, paths and schedule from a loaded config"""
+    global GIT_REPO_PATH, DESTINATION_BASE_PATH, FILES_CONFIG, TRIGGER_MODE, SCHEDULE_MINUTE
+    global COMPACT_HISTORY, COMPACT_KEEP_DAYS, IMAGES_KEEP_DAYS, DAILY_GIT_COMMIT, ANALYTICS_HOUR
+    if PUSH_QUEUE is not None and config["repo_path"] != GIT_REPO_PATH:
+        print("⚠️ repo_path changed - restart the updater to move the push queue to the new repository")
+    else:
+        GIT_REPO_PATH = config["repo_path"]
+    DESTINATION_BASE_PATH = config["destination"]
+    FILES_CONFIG = expand_files(config)
+    TRIGGER_MODE = config["updater"].get("trigger_mode", TRIGGER_MODE)
+    SCHEDULE_MINUTE = config["updater"].get("schedule_minute", SCHEDULE_MINUTE)
+    COMPACT_HISTORY = config["updater"].get("compact_history", COMPACT_HISTORY)
+    COMPACT_KEEP_DAYS = config["updater"].get("compact_keep_days", COMPACT_KEEP_DAYS)
+    IMAGES_KEEP_DAYS = config["updater"].get("images_keep_days", IMAGES_KEEP_DAYS)
+    DAILY_GIT_COMMIT = config["updater"].get("daily_git_commit", DAILY_GIT_COMMIT)
+    ANALYTICS_HOUR = config["updater"].get("analytics_hour", ANALYTICS_HOUR)
+    names = ", ".join(f"{entry['name']} ({entry['terminal']})" for entry in FILES_CONFIG) or "none"
+    print(f"🔧 Publishing {len(FILES_CONFIG)} file(s): {names}")
+
+def reload_config(force=False):
+    """Apply the config file if it changed; True if settings were replaced"""
+    config = CONFIG_RELOADER.check(force)
+    if config is None:
+        return False
+    apply_config(config)
+    return True
+
+def on_source_files_changed(changed_paths):
+    """Watcher callback - copy the files the EA just finished writing"""
+    now = datetime.now()
+    names = ", ".join(os.path.basename(path) for path in changed_paths)
+    print(f"\nFile change detected at {now.strftime('%Y-%m-%d %H:%M:%S')}: {names}")
+    print(f"Weekend block status: {get_weekend_status()}")
+    with PUBLISH_LOCK:
+        move_files(changed_sources=changed_paths)
+        publish_images()
+        publish_analytics_if_due(now)
+    print(f"Push queue: {get_push_status()}")
+    publish_metrics()
     print("-" * 50)
-    
+
+def run_watch_loop():
+    """Copy files as soon as the EA finishes writing them (the watcher follows config changes)"""
+    watch_with_reload(CONFIG_RELOADER, apply_config,
+                      lambda: [config["source"] for config in FILES_CONFIG], on_source_files_changed)
+
+def run_schedule_loop():
+    """Copy files at SCHEDULE_MINUTE of each hour"""
     last_hour = None
     last_date = None
     
     while True:
         try:
+            reload_config()
             now = datetime.now()
             current_date = now.date()
             
             # Trigger file copying at minute 4 of each hour
-            if now.minute == 4 and now.hour != last_hour:
+            if now.minute == SCHEDULE_MINUTE and now.hour != last_hour:
                 print(f"\nFile copy triggered at {now.strftime('%Y-%m-%d %H:%M:%S')}")
                 print(f"Weekend block status: {get_weekend_status()}")
                 move_files()  # This calls git commands, which have email alerts and weekend blocking
+                publish_images()
+                publish_analytics_if_due(now)
+                print(f"Push queue: {get_push_status()}")
+                publish_metrics()
                 last_hour = now.hour
                 print("-" * 50)
                 
@@ -368,11 +862,60 @@ def main():
             time.sleep(1)
             
         except KeyboardInterrupt:
-            print("\nStopping monitor...")
-            break
+            raise
         except Exception as e:
             print(f"Unexpected error in main loop: {e}")
             time.sleep(10)  # Wait 10 seconds before retrying
 
+def main(mode=None):
+    """Main monitoring loop"""
+    print("Forex JSON File Monitor Started")
+    configure_event_log(EVENT_LOG_PATH)
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+    reload_config(force=True)
+    if FEED_SERVER_PORT:
+        start_feed_server(GIT_REPO_PATH, FEED_SERVER_PORT)
+    mode = mode or TRIGGER_MODE
+    
+    print("📧 Gmail alerts ENABLED for GIT COMMANDS ONLY")
+    print(f"📧 Alert email: {GMAIL_CONFIG['recipient_email']}")
+    print("🚫 Weekend commit block: Saturday 6 AM to Monday 6 AM")
+    print(f"🚫 Weekend block status: {get_weekend_status()}")
+    print(f"Monitoring {', '.join(os.path.basename(config['source']) for config in FILES_CONFIG)}")
+    print("Checking file sources...")
+    check_file_existence()
+    if mode == "watch":
+        watcher = "native file events" if WATCHDOG_AVAILABLE else "polling fallback (pip install watchdog for native events)"
+        print(f"Will copy files {DEBOUNCE_SECONDS}s after the EA finishes writing them ({watcher})")
+    else:
+        print(f"Will copy files at minute {SCHEDULE_MINUTE} of each hour")
+    print("Will commit each publish as it happens (except during weekend block)")
+    print("Email alerts will be sent ONLY for git command failures")
+    sinks = ", ".join(str(sink) for sink in get_alert_dispatcher().sinks) or "none"
+    print(f"📨 Alert sinks: {sinks} (repeats within {ALERT_DEDUP_WINDOW_SECONDS // 60} min are aggregated)")
+    if ASYNC_PUSH:
+        get_push_queue().start()
+        print(f"📤 Background push worker started - {get_push_status()}")
+    if IMAGES_ENABLED and not PIL_AVAILABLE:
+        print("⚠️ Pillow not installed - images/manifest.json is kept without thumbnails/WebP (pip install pillow)")
+    print("-" * 50)
+    
+    try:
+        if mode == "watch":
+            run_watch_loop()
+        elif mode == "schedule":
+            run_schedule_loop()
+        else:
+            print(f"Unknown trigger mode: {mode} (expected 'watch' or 'schedule')")
+    except KeyboardInterrupt:
+        print("\nStopping monitor...")
+    finally:
+        if WORKER_EXECUTOR is not None:
+            WORKER_EXECUTOR.shutdown(wait=False)
+        # Deliver queued alerts before exiting
+        if ALERT_DISPATCHER is not None:
+            ALERT_DISPATCHER.stop(timeout=30)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,121 @@
+import os
+import time
+import threading
+
+# watchdog gives us native change notifications (ReadDirectoryChangesW / inotify).
+# Without it we fall back to cheap stat() polling of the watched files.
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+# Seconds a file must stay unchanged (same size and mtime) before it counts as written
+DEBOUNCE_SECONDS = 3
+# Seconds between stat() checks when watchdog is not installed
+POLL_INTERVAL_SECONDS = 2
+
+def get_file_signature(path):
+    """Return (mtime_ns, size) for a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+if WATCHDOG_AVAILABLE:
+    class _SignalFileHandler(FileSystemEventHandler):
+        """Forward events for the watched files to the watcher"""
+
+        def __init__(self, watched, on_event):
+            super().__init__()
+            self.watched = watched
+            self.on_event = on_event
+
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            for path in (event.src_path, getattr(event, "dest_path", None)):
+                if path and os.path.normcase(os.path.abspath(path)) in self.watched:
+                    self.on_event(self.watched[os.path.normcase(os.path.abspath(path))])
+
+def watch_files(paths, callback, debounce=DEBOUNCE_SECONDS, poll_interval=POLL_INTERVAL_SECONDS,
+                stop_event=None, use_watchdog=True):
+    """Call callback(changed_paths) each time a burst of writes to any of paths has settled
+
+    Blocks until stop_event is set (or KeyboardInterrupt). A file is reported once its
+    size and mtime have been stable for `debounce` seconds, so the EA has finished writing.
+    """
+    stop_event = stop_event or threading.Event()
+    wake = threading.Event()
+    lock = threading.Lock()
+    watched = {os.path.normcase(os.path.abspath(p)): p for p in paths}
+    last_seen = {p: get_file_signature(p) for p in paths}
+    pending = {}  # path -> (time of last change, signature at that time)
+
+    def mark_changed(path):
+        with lock:
+            pending[path] = (time.monotonic(), get_file_signature(path))
+        wake.set()
+
+    observer = None
+    if use_watchdog and WATCHDOG_AVAILABLE:
+        observer = Observer()
+        handler = _SignalFileHandler(watched, mark_changed)
+        for folder in {os.path.dirname(p) for p in watched}:
+            observer.schedule(handler, folder, recursive=False)
+        observer.start()
+        print(f"👀 Watching {len(paths)} files for changes (native events, {debounce}s debounce)")
+    else:
+        print(f"👀 Watching {len(paths)} files for changes (polling every {poll_interval}s, {debounce}s debounce)")
+
+    try:
+        while not stop_event.is_set():
+            # Polling fallback: compare signatures ourselves
+            if observer is None:
+                for path in paths:
+                    signature = get_file_signature(path)
+                    if signature != last_seen[path]:
+                        last_seen[path] = signature
+                        with lock:
+                            if pending.get(path, (None, None))[1] != signature:
+                                pending[path] = (time.monotonic(), signature)
+
+            # Work out which pending files have settled
+            ready = []
+            now = time.monotonic()
+            with lock:
+                for path, (changed_at, signature) in list(pending.items()):
+                    if now - changed_at < debounce:
+                        continue
+                    current = get_file_signature(path)
+                    if current != signature:
+                        # Still being written - restart the debounce window
+                        pending[path] = (now, current)
+                        continue
+                    del pending[path]
+                    if current is not None:
+                        ready.append(path)
+                next_due = min((changed_at + debounce for changed_at, _ in pending.values()), default=None)
+
+            if ready:
+                try:
+                    callback(ready)
+                except Exception as e:
+                    print(f"Unexpected error handling file change: {e}")
+
+            # Sleep until the next debounce deadline, the next poll, or a new event
+            timeout = None if observer is not None else poll_interval
+            if next_due is not None:
+                remaining = max(0.0, next_due - time.monotonic())
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            if timeout is None:
+                # Nothing pending - block on the next event, checking stop_event every second
+                timeout = 1
+            wake.wait(timeout)
+            wake.clear()
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
@@ -0,0 +1,189 @@
+import os
+import sys
+import fnmatch
+import argparse
+import subprocess
+from datetime import datetime, timedelta
+from git_publisher import run_git, GIT_REMOTE, GIT_BRANCH, PUSH_TIMEOUT_SECONDS
+from history_store import list_days, HISTORY_DIR
+from pipeline_metrics import inc, log_event
+
+# Hourly signal commits older than this many days are squashed into one commit per day
+KEEP_DAYS = 7
+# Files only the updater writes; a commit touching nothing else is a "signal-only" commit
+SIGNAL_FILE_PATTERNS = ("fx_signals_*", "signal_analytics_*")
+# Every rewritten range is saved here as a git bundle first, so no commit is ever lost
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "git_archive")
+
+# One record per first-parent commit: fields split by \x1f, records by \x1e, then the changed files
+LOG_FORMAT = "%x1e" + "%x1f".join(["%H", "%T", "%P", "%an", "%ae", "%ad", "%cn", "%ce", "%cd", "%ct", "%B"]) + "%x1f"
+FIELDS = ("commit", "tree", "parents", "author_name", "author_email", "author_date",
+          "committer_name", "committer_email", "committer_date", "timestamp", "message")
+
+def read_first_parent_log(repo_path, branch):
+    """Commits of branch, oldest first, with their metadata and changed paths"""
+    output = run_git(repo_path, ["log", "--first-parent", "--reverse", "--date=raw", "--name-only",
+                                 "--no-renames", f"--format={LOG_FORMAT}", branch]).stdout
+    commits = []
+    for record in output.split("\x1e")[1:]:
+        values = record.split("\x1f")
+        commit = dict(zip(FIELDS, values))
+        commit["parents"] = commit["parents"].split()
+        commit["timestamp"] = int(commit["timestamp"])
+        commit["files"] = [line for line in values[len(FIELDS)].splitlines() if line]
+        commits.append(commit)
+    return commits
+
+def is_signal_only(commit, data_dir):
+    """True for an ordinary commit that changed nothing but updater output files"""
+    if len(commit["parents"]) != 1 or not commit["files"]:
+        return False
+    patterns = [f"{data_dir}/{pattern}" if data_dir else pattern for pattern in SIGNAL_FILE_PATTERNS]
+    return all(any(fnmatch.fnmatchcase(path, pattern) for pattern in patterns) for path in commit["files"])
+
+def plan_compaction(commits, data_dir, cutoff):
+    """Group commits into [commit] (kept) and [c1, c2, ...] (squashed into one) entries
+
+    Only consecutive signal-only commits of the same day before cutoff are grouped,
+    so code commits and everything recent stay exactly as they were.
+    """
+    plan = []
+    for commit in commits:
+        moment = datetime.fromtimestamp(commit["timestamp"])
+        squashable = moment < cutoff and is_signal_only(commit, data_dir)
+        commit["day"] = moment.date() if squashable else None
+        previous = plan[-1] if plan else None
+        if squashable and previous and previous[-1]["day"] == commit["day"]:
+            previous.append(commit)
+        else:
+            plan.append([commit])
+    return plan
+
+def squashed_message(group):
+    first, last = group[0], group[-1]
+    return (f"Update forex signals - {last['day']} (daily, {len(group)} commits squashed)\n\n"
+            f"Squashed {first['commit'][:12]}..{last['commit'][:12]}; the hourly versions are in "
+            f"the history store and the mt5/git_archive/ bundles.\n")
+
+def create_commit(repo_path, commit, parents, message):
+    """git commit-tree with the original tree, author and dates"""
+    env = dict(os.environ,
+               GIT_AUTHOR_NAME=commit["author_name"], GIT_AUTHOR_EMAIL=commit["author_email"],
+               GIT_AUTHOR_DATE=commit["author_date"], GIT_COMMITTER_NAME=commit["committer_name"],
+               GIT_COMMITTER_EMAIL=commit["committer_email"], GIT_COMMITTER_DATE=commit["committer_date"])
+    command = ["git", "commit-tree", commit["tree"]]
+    for parent in parents:
+        command += ["-p", parent]
+    completed = subprocess.run(command, cwd=repo_path, input=message, capture_output=True, text=True,
+                               env=env, check=True)
+    return completed.stdout.strip()
+
+def rewrite(repo_path, plan):
+    """Recreate the branch from the first squashed group on; returns (new head, base, squashed count)
+
+    Trees are reused as they are, so the new head has exactly the old head's content.
+    Commits before the first group keep their ids and are not touched.
+    """
+    start = next((i for i, group in enumerate(plan) if len(group) > 1), None)
+    if start is None:
+        return None, None, 0
+    base = plan[start][0]["parents"][0]
+    parent = base
+    squashed = 0
+    for group in plan[start:]:
+        last = group[-1]
+        message = squashed_message(group) if len(group) > 1 else last["message"]
+        parent = create_commit(repo_path, last, [parent] + last["parents"][1:], message)
+        squashed += len(group) - 1
+    return parent, base, squashed
+
+def missing_history_days(plan, history_dir=HISTORY_DIR):
+    """Squashed days with no history store partition (their hourly data lives only in the archive)"""
+    stored = set(list_days(history_dir))
+    days = {group[0]["day"] for group in plan if len(group) > 1}
+    return sorted(day for day in days if day not in stored)
+
+def archive_range(repo_path, branch, base, archive_dir=ARCHIVE_DIR):
+    """Bundle the branch's commits after base before they are rewritten (base is kept, so it is the prerequisite)"""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"history-{datetime.now().strftime('%Y%m%d-%H%M%S')}.bundle")
+    run_git(repo_path, ["bundle", "create", path, f"refs/heads/{branch}", f"^{base}"])
+    return path
+
+def compact_history(repo_path, data_dir, keep_days=KEEP_DAYS, remote=GIT_REMOTE, branch=GIT_BRANCH,
+                    push=True, dry_run=False, history_dir=HISTORY_DIR, archive_dir=ARCHIVE_DIR):
+    """Squash old hourly signal commits into daily ones and force-push the result
+
+    Fails fast (returns a reason, changes nothing) unless the branch is checked out
+    and identical to the remote one - run it while no push is pending. Returns a dict
+    with "compacted" and "reason" or the old/new heads and counts.
+    """
+    head_ref = run_git(repo_path, ["symbolic-ref", "-q", "HEAD"], check=False).stdout.strip()
+    if head_ref != f"refs/heads/{branch}":
+        return {"compacted": False, "reason": f"{branch} is not checked out"}
+    old_head = run_git(repo_path, ["rev-parse", branch]).stdout.strip()
+    remote_head = None
+    if push:
+        run_git(repo_path, ["fetch", "-q", remote, branch], timeout=PUSH_TIMEOUT_SECONDS)
+        remote_head = run_git(repo_path, ["rev-parse", f"{remote}/{branch}"]).stdout.strip()
+        if remote_head != old_head:
+            return {"compacted": False, "reason": f"{branch} and {remote}/{branch} differ - push or pull first"}
+
+    cutoff = datetime.combine(datetime.now().date() - timedelta(days=keep_days), datetime.min.time())
+    plan = plan_compaction(read_first_parent_log(repo_path, branch), data_dir, cutoff)
+    groups = [group for group in plan if len(group) > 1]
+    if not groups:
+        return {"compacted": False, "reason": "nothing to squash"}
+    # A code commit can split one day into several groups, so count distinct days
+    result = {"compacted": False, "days": len({group[0]["day"] for group in groups}),
+              "squashed": sum(len(group) - 1 for group in groups),
+              "missing_history_days": [str(day) for day in missing_history_days(plan, history_dir)]}
+    if dry_run:
+        result["reason"] = "dry run"
+        return result
+
+    new_head, base, _ = rewrite(repo_path, plan)
+    if run_git(repo_path, ["rev-parse", f"{new_head}^{{tree}}"]).stdout != \
+            run_git(repo_path, ["rev-parse", f"{old_head}^{{tree}}"]).stdout:
+        raise RuntimeError("compacted history does not end in the same tree - nothing was changed")
+    result["archive"] = archive_range(repo_path, branch, base, archive_dir)
+
+    # Compare-and-swap: fails if a commit landed on the branch meanwhile
+    run_git(repo_path, ["update-ref", f"refs/heads/{branch}", new_head, old_head])
+    if push:
+        try:
+            run_git(repo_path, ["push", f"--force-with-lease={branch}:{remote_head}", remote, branch],
+                    timeout=PUSH_TIMEOUT_SECONDS)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            # Put the old history back so normal pushes keep fast-forwarding
+            run_git(repo_path, ["update-ref", f"refs/heads/{branch}", old_head, new_head])
+            raise
+    result.update(compacted=True, old_head=old_head, new_head=new_head)
+    inc("git_commits_squashed_total", result["squashed"], help_text="Hourly commits folded into daily ones")
+    log_event("git_history_compacted", **result)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Squash old hourly signal commits into daily ones")
+    parser.add_argument("--repo", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--data-dir", default="data", help="folder of the published files inside the repo")
+    parser.add_argument("--keep-days", type=int, default=KEEP_DAYS)
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be squashed")
+    parser.add_argument("--no-push", action="store_true", help="rewrite the local branch only")
+    args = parser.parse_args(argv)
+
+    result = compact_history(args.repo, args.data_dir, args.keep_days, push=not args.no_push, dry_run=args.dry_run)
+    if result.get("missing_history_days"):
+        print(f"⚠️ No history store data for {', '.join(result['missing_history_days'])} "
+              f"- those hourly versions stay only in the git archive bundle")
+    if result["compacted"]:
+        print(f"🗜️ Squashed {result['squashed']} commit(s) over {result['days']} day(s): "
+              f"{result['old_head'][:12]} -> {result['new_head'][:12]} (archive: {result['archive']})")
+    elif "squashed" in result:
+        print(f"🗜️ Would squash {result['squashed']} commit(s) over {result['days']} day(s) ({result['reason']})")
+    else:
+        print(f"ℹ️ History not compacted: {result['reason']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import os
+import time
+import subprocess
+from pipeline_metrics import inc, observe
+
+GIT_REMOTE = "origin"
+GIT_BRANCH = "main"
+PUSH_TIMEOUT_SECONDS = 30
+
+def run_git(repo_path, args, timeout=None, check=True):
+    """Run one git command in repo_path and capture its output"""
+    started = time.perf_counter()
+    result = "error"
+    try:
+        completed = subprocess.run(["git", *args], cwd=repo_path, capture_output=True, text=True,
+                                   check=check, timeout=timeout)
+        result = "ok" if completed.returncode == 0 else "nonzero"
+        return completed
+    except subprocess.TimeoutExpired:
+        result = "timeout"
+        raise
+    finally:
+        observe("git_command_seconds", time.perf_counter() - started,
+                help_text="Wall time of each git subprocess", command=args[0])
+        inc("git_commands_total", help_text="git subprocesses by outcome", command=args[0], result=result)
+
+def to_repo_paths(repo_path, paths):
+    """Turn absolute paths into repo-relative, forward-slash pathspecs"""
+    return [os.path.relpath(path, repo_path).replace(os.sep, "/") for path in paths]
+
+def existing_or_tracked(repo_path, paths):
+    """Drop paths that are gone and were never committed (git add would reject them)"""
+    missing = [path for path in paths if not os.path.exists(path)]
+    if not missing:
+        return list(paths)
+    tracked = set(run_git(repo_path, ["ls-files", "--", *to_repo_paths(repo_path, missing)]).stdout.splitlines())
+    return [path for path in paths if os.path.exists(path) or to_repo_paths(repo_path, [path])[0] in tracked]
+
+def commit_paths(repo_path, paths, subject, body=None):
+    """Stage exactly `paths` and commit only them
+
+    Two git processes in the normal case (one add, one commit) instead of a
+    status call plus one add per file. Returns False if there was nothing to commit.
+    """
+    pathspecs = to_repo_paths(repo_path, paths)
+    if not pathspecs:
+        return False
+
+    run_git(repo_path, ["add", "--", *pathspecs])
+
+    command = ["commit", "-q", "-m", subject]
+    if body:
+        command += ["-m", body]
+    result = run_git(repo_path, command + ["--", *pathspecs], check=False)
+    if result.returncode == 0:
+        return True
+
+    # Only pay for a diff when the commit failed: was it simply a no-op?
+    unchanged = run_git(repo_path, ["diff", "--cached", "--quiet", "--", *pathspecs], check=False)
+    if unchanged.returncode == 0:
+        return False
+    raise subprocess.CalledProcessError(result.returncode, result.args, result.stdout, result.stderr)
+
+def push(repo_path, remote=GIT_REMOTE, branch=GIT_BRANCH, timeout=PUSH_TIMEOUT_SECONDS):
+    """Push branch to remote; raises TimeoutExpired/CalledProcessError on failure"""
+    run_git(repo_path, ["push", "-u", remote, branch], timeout=timeout)
@@ -0,0 +1,163 @@
+import os
+import re
+import sys
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from change_detector import hash_payload
+from file_updater import decode_json_bytes
+from history_store import snapshot_rows, append_snapshots, list_snapshots, HISTORY_DIR, TIMESTAMP_FORMAT
+
+# Commits per round: their blobs are read, parsed and stored before the next round,
+# so an interrupted backfill only redoes the round it was in
+BATCH_COMMITS = 200
+# Blobs handed to a worker process at a time
+BLOBS_PER_TASK = 16
+MAX_WORKERS = os.cpu_count() or 4
+# A version committed this close to an identical live snapshot is that snapshot
+LIVE_MATCH_SECONDS = 600
+
+# data/fx_signals_<name>.json, but not the .compact/.version/.delta feed files next to it
+SIGNAL_PATH = re.compile(r"(?:^|/)fx_signals_([^./]+)\.json$")
+
+def list_versions(repo_path, data_dir="data", revisions=("HEAD",)):
+    """[(commit time, source, blob id)] for every version of every signal file, oldest first"""
+    output = subprocess.run(["git", "log", "--reverse", "--format=%x1e%ct", "--raw", "--no-abbrev", "--no-renames",
+                             *revisions, "--", f"{data_dir}/fx_signals_*.json"],
+                            cwd=repo_path, capture_output=True, text=True, check=True).stdout
+    versions = []
+    for record in output.split("\x1e")[1:]:
+        lines = record.splitlines()
+        timestamp = datetime.fromtimestamp(int(lines[0]))
+        for line in lines[1:]:
+            # :100644 100644 <old blob> <new blob> M\t<path>
+            if not line.startswith(":"):
+                continue
+            meta, path = line.split("\t", 1)
+            blob = meta.split()[3]
+            match = SIGNAL_PATH.search(path)
+            if match and blob.strip("0"):
+                versions.append((timestamp, match.group(1), blob))
+    return versions
+
+class BlobReader:
+    """One long-running `git cat-file --batch` for all blob reads"""
+
+    def __init__(self, repo_path):
+        self.process = subprocess.Popen(["git", "cat-file", "--batch"], cwd=repo_path,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def read_many(self, blob_ids):
+        """Yield (blob id, bytes) in order; ids are written from a thread so neither pipe fills up"""
+        def feed():
+            for blob_id in blob_ids:
+                self.process.stdin.write(f"{blob_id}\n".encode('ascii'))
+            self.process.stdin.flush()
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        for blob_id in blob_ids:
+            header = self.process.stdout.readline().split()
+            if len(header) < 3 or header[1] != b"blob":
+                yield blob_id, None  # "<id> missing"
+                continue
+            content = self.process.stdout.read(int(header[2]))
+            self.process.stdout.read(1)  # trailing newline
+            yield blob_id, content
+        writer.join()
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+def parse_blobs(blobs):
+    """Worker: decode and parse blobs into (blob id, content hash, rows without ts/source)"""
+    parsed = []
+    for blob_id, raw in blobs:
+        data = decode_json_bytes(raw) if raw is not None else None
+        if not isinstance(data, dict) or not isinstance(data.get('forexData'), dict):
+            parsed.append((blob_id, None, None))
+            continue
+        rows = [row[2:] for row in snapshot_rows(data, "", datetime.min)]
+        parsed.append((blob_id, hash_payload(data), rows))
+    return parsed
+
+def backfill(repo_path, data_dir="data", revisions=("HEAD",), history_dir=HISTORY_DIR,
+             workers=MAX_WORKERS, batch_commits=BATCH_COMMITS, dry_run=False):
+    """Load every historical version of the signal files into the history store
+
+    Idempotent and resumable: versions whose (source, commit time) is already stored
+    are skipped, and so are versions identical to a snapshot the updater stored live
+    within LIVE_MATCH_SECONDS of the commit. Returns counts of what was found,
+    skipped and loaded.
+    """
+    stored = list_snapshots(history_dir)
+    live = {}
+    for (source, ts), content_hash in stored.items():
+        if content_hash:
+            live.setdefault((source, content_hash), []).append(datetime.strptime(ts, TIMESTAMP_FORMAT))
+    versions = list_versions(repo_path, data_dir, revisions)
+    todo = [(timestamp, source, blob) for timestamp, source, blob in versions
+            if (source, timestamp.strftime(TIMESTAMP_FORMAT)) not in stored]
+    counts = {"versions": len(versions), "already_stored": len(versions) - len(todo),
+              "duplicates": 0, "unreadable": 0, "snapshots": 0, "rows": 0}
+    if dry_run or not todo:
+        return counts
+
+    reader = BlobReader(repo_path)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for start in range(0, len(todo), batch_commits):
+                batch = todo[start:start + batch_commits]
+                # Hourly commits often repeat a blob; read and parse each one once
+                blob_ids = list(dict.fromkeys(blob for _, _, blob in batch))
+                blobs = list(reader.read_many(blob_ids))
+                tasks = [blobs[i:i + BLOBS_PER_TASK] for i in range(0, len(blobs), BLOBS_PER_TASK)]
+                parsed = {blob_id: (content_hash, rows)
+                          for chunk in pool.map(parse_blobs, tasks) for blob_id, content_hash, rows in chunk}
+
+                snapshots = []
+                for timestamp, source, blob in batch:
+                    content_hash, rows = parsed[blob]
+                    if rows is None:
+                        counts["unreadable"] += 1
+                        continue
+                    if any(abs((timestamp - moment).total_seconds()) <= LIVE_MATCH_SECONDS
+                           for moment in live.get((source, content_hash), ())):
+                        counts["duplicates"] += 1
+                        continue
+                    ts = timestamp.strftime(TIMESTAMP_FORMAT)
+                    snapshots.append((timestamp, source, content_hash, [(ts, source) + row for row in rows]))
+                counts["rows"] += append_snapshots(snapshots, history_dir)
+                counts["snapshots"] += len(snapshots)
+                print(f"📥 {min(start + batch_commits, len(todo))}/{len(todo)} versions "
+                      f"({counts['snapshots']} snapshots stored)")
+    finally:
+        reader.close()
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the signal history store from git commits")
+    parser.add_argument("--repo", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--data-dir", default="data", help="folder of the published files inside the repo")
+    parser.add_argument("--dir", default=HISTORY_DIR, help="history folder")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be loaded")
+    parser.add_argument("--all", action="store_true", help="read every branch and ref, not just HEAD")
+    parser.add_argument("revisions", nargs="*", default=["HEAD"],
+                        help="commits to read, e.g. a ref fetched from an mt5/git_archive bundle")
+    args = parser.parse_args(argv)
+    if args.all:
+        args.revisions = ["--all"]
+
+    started = datetime.now()
+    counts = backfill(args.repo, args.data_dir, args.revisions, args.dir, args.workers, dry_run=args.dry_run)
+    seconds = (datetime.now() - started).total_seconds()
+    print(f"✅ {counts['versions']} versions in git: {counts['already_stored']} already stored, "
+          f"{counts['duplicates']} identical to live snapshots, {counts['unreadable']} unreadable, "
+          f"{counts['snapshots']} snapshots ({counts['rows']} rows) loaded in {seconds:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+import os
+import sys
+import json
+import sqlite3
+import argparse
+from datetime import datetime
+from signal_parser import parse_forex_data, RANK_FIELDS, MISSING
+
+# One SQLite file per day keeps each write small and lets old days be archived or deleted
+HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history")
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+# Column per rank field: left and right side of "a/b"
+RANK_COLUMNS = {
+    "Currency_Strength_Rank_all_pair": "currency_rank",
+    "CCI_Currency_Strength_Rank_all_pair": "cci_rank",
+    "BB_percent_ranking": "bb_rank",
+    "Overall_Ranking": "overall_rank",
+}
+VALUE_COLUMNS = {
+    "RSI_breakout": "rsi_breakout",
+    "Confidence": "confidence",
+    "Signal": "signal",
+    "TRIGGER": "trigger",
+    "TRIGGER_REASON": "trigger_reason",
+}
+COLUMNS = ["ts", "source", "pair"]
+for _column in RANK_COLUMNS.values():
+    COLUMNS += [f"{_column}_l", f"{_column}_r"]
+COLUMNS += list(VALUE_COLUMNS.values()) + ["extra"]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS signals (
+    ts TEXT NOT NULL,
+    source TEXT NOT NULL,
+    pair TEXT NOT NULL,
+    {", ".join(f"{column} INTEGER" for column in COLUMNS[3:11])},
+    rsi_breakout INTEGER,
+    confidence INTEGER,
+    signal TEXT,
+    trigger TEXT,
+    trigger_reason TEXT,
+    extra TEXT,
+    PRIMARY KEY (source, pair, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS signals_pair_ts ON signals (pair, ts);
+CREATE TABLE IF NOT EXISTS snapshots (
+    ts TEXT NOT NULL,
+    source TEXT NOT NULL,
+    content_hash TEXT,
+    pairs INTEGER,
+    PRIMARY KEY (source, ts)
+) WITHOUT ROWID;
+"""
+
+def day_path(day, history_dir=HISTORY_DIR):
+    """SQLite file holding one calendar day"""
+    return os.path.join(history_dir, f"{day.strftime('%Y-%m-%d')}.sqlite")
+
+def connect(path):
+    """Open (and create if needed) one day partition"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+def parse_timestamp(value):
+    """datetime from a datetime, 'YYYY-MM-DD' or ISO 'YYYY-MM-DDTHH:MM[:SS]' string"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+def snapshot_rows(data, source, timestamp):
+    """One tuple per pair in COLUMNS order"""
+    table = parse_forex_data(data)
+    ts = timestamp.strftime(TIMESTAMP_FORMAT)
+    rows = []
+    for pair in table.pairs:
+        row = [ts, source, pair]
+        for field in RANK_FIELDS:
+            left, right = table.rank(pair, field)
+            row += [None if left == MISSING else left, None if right == MISSING else right]
+        for field in VALUE_COLUMNS:
+            value = table.get(pair, field)
+            row.append(None if value == MISSING else value)
+        extra = {field: value for (extra_pair, field), value in table.extra.items() if extra_pair == pair}
+        row.append(json.dumps(extra, ensure_ascii=False) if extra else None)
+        rows.append(tuple(row))
+    return rows
+
+def append_snapshot(data, source, timestamp=None, content_hash=None, history_dir=HISTORY_DIR):
+    """Store every pair of one published payload; re-appending the same timestamp is a no-op"""
+    timestamp = parse_timestamp(timestamp) if timestamp else datetime.now().replace(microsecond=0)
+    rows = snapshot_rows(data, source, timestamp)
+    connection = connect(day_path(timestamp, history_dir))
+    try:
+        with connection:
+            connection.executemany(
+                f"INSERT OR IGNORE INTO signals ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))})", rows)
+            connection.execute("INSERT OR IGNORE INTO snapshots VALUES (?, ?, ?, ?)",
+                               (timestamp.strftime(TIMESTAMP_FORMAT), source, content_hash, len(rows)))
+    finally:
+        connection.close()
+    return len(rows)
+
+def append_snapshots(snapshots, history_dir=HISTORY_DIR):
+    """Bulk append_snapshot for [(timestamp, source, content_hash, rows)]: one transaction per day file"""
+    by_day = {}
+    for timestamp, source, content_hash, rows in snapshots:
+        by_day.setdefault(timestamp.date(), []).append((timestamp, source, content_hash, rows))
+    stored = 0
+    for day, entries in sorted(by_day.items()):
+        connection = connect(day_path(day, history_dir))
+        try:
+            with connection:
+                for timestamp, source, content_hash, rows in entries:
+                    connection.executemany(
+                        f"INSERT OR IGNORE INTO signals ({', '.join(COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * len(COLUMNS))})", rows)
+                    connection.execute("INSERT OR IGNORE INTO snapshots VALUES (?, ?, ?, ?)",
+                                       (timestamp.strftime(TIMESTAMP_FORMAT), source, content_hash, len(rows)))
+                    stored += len(rows)
+        finally:
+            connection.close()
+    return stored
+
+def list_snapshots(history_dir=HISTORY_DIR):
+    """{(source, ts string): content_hash} of every stored snapshot"""
+    snapshots = {}
+    for day in list_days(history_dir):
+        connection = connect(day_path(day, history_dir))
+        try:
+            for ts, source, content_hash in connection.execute("SELECT ts, source, content_hash FROM snapshots"):
+                snapshots[(source, ts)] = content_hash
+        finally:
+            connection.close()
+    return snapshots
+
+def list_days(history_dir=HISTORY_DIR):
+    """Dates that have a partition, oldest first"""
+    if not os.path.isdir(history_dir):
+        return []
+    days = []
+    for name in os.listdir(history_dir):
+        if name.endswith(".sqlite"):
+            try:
+                days.append(datetime.strptime(name[:-7], '%Y-%m-%d').date())
+            except ValueError:
+                continue
+    return sorted(days)
+
+def row_to_record(row):
+    """DB row -> dict using the EA's field names and '2/4' rank strings"""
+    values = dict(zip(COLUMNS, row))
+    record = {"timestamp": values["ts"], "source": values["source"], "pair": values["pair"]}
+    for field, column in RANK_COLUMNS.items():
+        left, right = values[f"{column}_l"], values[f"{column}_r"]
+        record[field] = None if left is None else f"{left}/{right}"
+    for field, column in VALUE_COLUMNS.items():
+        record[field] = values[column]
+    if values["extra"]:
+        record.update(json.loads(values["extra"]))
+    return record
+
+def iter_rows(start=None, end=None, pair=None, source=None, history_dir=HISTORY_DIR, newest_first=False):
+    """Raw rows (COLUMNS order) with start <= ts < end, scanning only the day files in range"""
+    start = parse_timestamp(start) if start else None
+    end = parse_timestamp(end) if end else None
+    days = [day for day in list_days(history_dir)
+            if (start is None or day >= start.date()) and (end is None or day <= end.date())]
+    if newest_first:
+        days.reverse()
+
+    conditions, params = [], []
+    if start:
+        conditions.append("ts >= ?")
+        params.append(start.strftime(TIMESTAMP_FORMAT))
+    if end:
+        conditions.append("ts < ?")
+        params.append(end.strftime(TIMESTAMP_FORMAT))
+    if pair:
+        conditions.append("pair = ?")
+        params.append(pair)
+    if source:
+        conditions.append("source = ?")
+        params.append(source)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    order = "DESC" if newest_first else "ASC"
+
+    for day in days:
+        connection = sqlite3.connect(day_path(day, history_dir))
+        try:
+            yield from connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM signals {where} ORDER BY ts {order}, pair", params)
+        finally:
+            connection.close()
+
+def query_range(pair=None, start=None, end=None, source=None, history_dir=HISTORY_DIR):
+    """Records between start (inclusive) and end (exclusive), oldest first"""
+    return [row_to_record(row) for row in iter_rows(start, end, pair, source, history_dir)]
+
+def query_latest(pair=None, n=1, source=None, history_dir=HISTORY_DIR):
+    """The n most recent records for a pair (or across all pairs), newest first"""
+    records = []
+    for row in iter_rows(pair=pair, source=source, history_dir=history_dir, newest_first=True):
+        records.append(row_to_record(row))
+        if len(records) >= n:
+            break
+    return records
+
+# === CLI: python history_store.py range EURJPY 2026-09-01 2026-10-01 --field Confidence ===
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the signal history store")
+    parser.add_argument("--dir", default=HISTORY_DIR, help="history folder")
+    parser.add_argument("--source", help="signal set, e.g. 28pair")
+    parser.add_argument("--field", action="append", help="only print these fields (repeatable)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    range_parser = commands.add_parser("range", help="records for a pair between two times")
+    range_parser.add_argument("pair")
+    range_parser.add_argument("start")
+    range_parser.add_argument("end", nargs="?")
+    latest_parser = commands.add_parser("latest", help="most recent records")
+    latest_parser.add_argument("pair", nargs="?")
+    latest_parser.add_argument("-n", type=int, default=1)
+    commands.add_parser("days", help="list stored days")
+    args = parser.parse_args(argv)
+
+    if args.command == "days":
+        for day in list_days(args.dir):
+            print(day)
+        return
+    if args.command == "range":
+        records = query_range(args.pair, args.start, args.end, args.source, args.dir)
+    else:
+        records = query_latest(args.pair, args.n, args.source, args.dir)
+
+    for record in records:
+        if args.field:
+            record = {key: record[key] for key in ("timestamp", "source", "pair", *args.field) if key in record}
+        print(json.dumps(record, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,218 @@
+import io
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from datetime import datetime, timedelta
+from safe_io import atomic_open, atomic_write_json, get_signature, SETTLE_SECONDS
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:  # Pillow not installed - the manifest is still kept, without variants
+    PIL_AVAILABLE = False
+
+# Chart images in the repo's images/ folder, e.g. [2025_08_28][0000].png or [2025_08_28][0000][Win].png
+IMAGE_PATTERN = re.compile(r"^\[(\d{4})_(\d{2})_(\d{2})\]\[(\d{2})(\d{2})\](?:\[(Win|Lose)\])?\.png$")
+MANIFEST_NAME = "manifest.json"
+# Variants next to the originals: small thumbnails for the results table and a
+# full-size WebP for the modal. Only new or changed charts are (re)encoded.
+THUMB_DIR = "thumbs"
+WEBP_DIR = "webp"
+THUMB_WIDTH = 160  # the table shows 60x45 CSS px; this stays sharp on 2x/3x screens
+THUMB_QUALITY = 70
+WEBP_QUALITY = 85
+# The dashboard shows the WebP and the thumbnail, so once a chart has them its PNG is
+# left out of the commit (it stays in images/ and in the manifest as "file"). Without
+# Pillow there are no variants and the PNG is committed as before. True commits both.
+COMMIT_ORIGINALS = False
+# Charts older than this many days (by the date in their name) are moved out of
+# images/ into ARCHIVE_DIR/<YYYY_MM>/ and their variants are deleted. Git history only
+# has the PNGs that were committed (see COMMIT_ORIGINALS), so ARCHIVE_DIR is usually
+# the only copy of an original - back it up. None keeps everything.
+KEEP_DAYS = None
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "image_archive")
+# file -> [mtime_ns, size, sha256], so unchanged charts are never read or hashed again
+STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "image_state.json")
+
+def parse_image_name(name):
+    """{"date", "time", "taken", "result"} for a chart file name, or None"""
+    match = IMAGE_PATTERN.match(name)
+    if not match:
+        return None
+    year, month, day, hour, minute, result = match.groups()
+    try:
+        taken = datetime(int(year), int(month), int(day), int(hour), int(minute))
+    except ValueError:
+        return None
+    return {"date": f"{year}_{month}_{day}", "time": f"{hour}{minute}",
+            "taken": taken.strftime('%Y-%m-%dT%H:%M'), "result": result}
+
+def variant_paths(images_dir, name):
+    """Repo-relative (to images/) and absolute paths of a chart's thumbnail and WebP"""
+    stem = os.path.splitext(name)[0]
+    relative = {"thumb": f"{THUMB_DIR}/{stem}.webp", "webp": f"{WEBP_DIR}/{stem}.webp"}
+    return relative, {kind: os.path.join(images_dir, *path.split("/")) for kind, path in relative.items()}
+
+def encode_variants(source_path, targets):
+    """Write the thumbnail and full-size WebP of one chart; returns (width, height)"""
+    with Image.open(source_path) as image:
+        image.load()
+        width, height = image.size
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        thumb = image.copy()
+        thumb.thumbnail((THUMB_WIDTH, max(1, round(height * THUMB_WIDTH / width))), Image.LANCZOS)
+        for kind, picture, quality in (("thumb", thumb, THUMB_QUALITY), ("webp", image, WEBP_QUALITY)):
+            buffer = io.BytesIO()
+            picture.save(buffer, format="WEBP", quality=quality)
+            with atomic_open(targets[kind], 'wb') as f:
+                f.write(buffer.getvalue())
+    return width, height
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def archive_image(images_dir, name, info, archive_dir):
+    """Move one chart into archive_dir/<YYYY_MM>/; returns the removed paths (original and variants)"""
+    folder = os.path.join(archive_dir, info["date"][:7])
+    os.makedirs(folder, exist_ok=True)
+    source = os.path.join(images_dir, name)
+    shutil.move(source, os.path.join(folder, name))
+    removed = [source]
+    for path in variant_paths(images_dir, name)[1].values():
+        if os.path.exists(path):
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+def update_images(images_dir, keep_days=None, archive_dir=ARCHIVE_DIR, state_file=STATE_FILE,
+                  variants=True, now=None, commit_originals=None):
+    """Bring images/manifest.json and the variants up to date with the charts in images_dir
+
+    Incremental: a chart whose size and mtime are unchanged is not read again, and
+    variants are only encoded for new or changed charts (or when one is missing).
+    Charts still being written (modified in the last SETTLE_SECONDS) wait for the
+    next run. Returns counts plus "paths": every file written or removed, for git
+    (a chart's PNG only if it has no variants or commit_originals is set).
+    keep_days and commit_originals default to KEEP_DAYS and COMMIT_ORIGINALS as
+    they are at call time, so changing the module settings takes effect.
+    """
+    now = now or datetime.now()
+    if keep_days is None:
+        keep_days = KEEP_DAYS
+    if commit_originals is None:
+        commit_originals = COMMIT_ORIGINALS
+    manifest_path = os.path.join(images_dir, MANIFEST_NAME)
+    previous = {entry["file"]: entry for entry in load_json(manifest_path, {}).get("images", [])}
+    stats = load_json(state_file, {})
+    make_variants = variants and PIL_AVAILABLE
+    cutoff = (now.date() - timedelta(days=keep_days)) if keep_days is not None else None
+    result = {"images": 0, "added": 0, "changed": 0, "encoded": 0, "archived": 0, "paths": []}
+
+    entries = {}
+    new_stats = {}
+    with os.scandir(images_dir) as scan:
+        names = sorted(entry.name for entry in scan if entry.is_file())
+    for name in names:
+        info = parse_image_name(name)
+        if info is None:
+            continue
+        path = os.path.join(images_dir, name)
+        if cutoff is not None and datetime.strptime(info["date"], "%Y_%m_%d").date() < cutoff:
+            result["paths"] += archive_image(images_dir, name, info, archive_dir)
+            result["archived"] += 1
+            continue
+        signature = list(get_signature(path))
+        old = previous.get(name)
+        cached = stats.get(name)
+        if old and cached and cached[:2] == signature:
+            sha256 = cached[2]
+        elif time.time() - signature[0] / 1e9 < SETTLE_SECONDS:
+            if old:
+                entries[name] = old  # mid-rewrite: keep the last good entry for now
+                new_stats[name] = cached
+            continue
+        else:
+            sha256 = hash_file(path)
+        new_stats[name] = signature + [sha256]
+
+        entry = {"file": name, **info, "size": signature[1], "sha256": sha256}
+        for key in ("width", "height"):
+            if old and key in old:
+                entry[key] = old[key]
+        relative, absolute = variant_paths(images_dir, name)
+        content_changed = not old or old.get("sha256") != sha256
+        if make_variants and (content_changed or not all(os.path.exists(p) for p in absolute.values())):
+            entry["width"], entry["height"] = encode_variants(path, absolute)
+            result["paths"] += absolute.values()
+            result["encoded"] += 1
+        has_variants = all(os.path.exists(p) for p in absolute.values())
+        if has_variants:
+            entry.update(relative)
+        if content_changed:
+            if commit_originals or not has_variants:
+                result["paths"].append(path)
+            result["added" if not old else "changed"] += 1
+        entries[name] = entry
+
+    # Variants whose chart is gone (deleted or archived by hand)
+    for folder in (THUMB_DIR, WEBP_DIR):
+        folder_path = os.path.join(images_dir, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for name in os.listdir(folder_path):
+            if name.endswith(".webp") and f"{name[:-len('.webp')]}.png" not in entries:
+                os.remove(os.path.join(folder_path, name))
+                result["paths"].append(os.path.join(folder_path, name))
+    result["paths"] += [os.path.join(images_dir, name) for name in previous
+                        if name not in entries and not os.path.exists(os.path.join(images_dir, name))
+                        and os.path.join(images_dir, name) not in result["paths"]]
+
+    images = [entries[name] for name in sorted(entries, key=lambda name: (entries[name]["taken"], name))]
+    result["images"] = len(images)
+    if images != list(previous.values()) or not os.path.exists(manifest_path):
+        # Rewritten only when an entry changed, so an idle run leaves git nothing to commit
+        atomic_write_json(manifest_path, {
+            "updated": now.strftime('%Y-%m-%d %H:%M:%S'),
+            "count": len(images),
+            "dates": sorted({image["date"] for image in images}),
+            "images": images
+        }, ensure_ascii=False, indent=1)
+        result["paths"].append(manifest_path)
+    if new_stats != stats:
+        atomic_write_json(state_file, new_stats)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update images/manifest.json, chart thumbnails/WebP and retention")
+    parser.add_argument("--dir", default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "images"))
+    parser.add_argument("--keep-days", type=int, default=KEEP_DAYS, help="archive charts older than this")
+    parser.add_argument("--no-variants", action="store_true", help="only update the manifest")
+    args = parser.parse_args(argv)
+
+    if not PIL_AVAILABLE and not args.no_variants:
+        print("⚠️ Pillow not installed - updating the manifest only (pip install pillow for thumbnails/WebP)")
+    started = time.perf_counter()
+    result = update_images(args.dir, args.keep_days, variants=not args.no_variants)
+    print(f"🖼️ {result['images']} chart(s): {result['added']} new, {result['changed']} changed, "
+          f"{result['encoded']} encoded, {result['archived']} archived, {len(result['paths'])} file(s) touched "
+          f"in {time.perf_counter() - started:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import os
+import json
+import codecs
+import fnmatch
+import hashlib
+from encoding_utils import detect_encoding, SNIFF_BYTES
+from safe_io import atomic_write_json
+
+# Bytes hashed at the start of the file to notice it was replaced by a new one
+FINGERPRINT_BYTES = 256
+# 8-bit fallbacks tried per line when the log is not UTF-16
+LINE_ENCODINGS = ('utf-8', 'cp932', 'iso-8859-1')
+
+def fingerprint(path, length=FINGERPRINT_BYTES):
+    """(hash, length) of the first bytes of a file"""
+    with open(path, 'rb') as f:
+        head = f.read(length)
+    return hashlib.sha1(head).hexdigest(), len(head)
+
+def get_stream_codec(path):
+    """Return (codec, bom_length) to decode any chunk of the file after its BOM"""
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    encoding = detect_encoding(head)
+    if encoding == 'utf-16':
+        return ('utf-16-le' if head.startswith(codecs.BOM_UTF16_LE) else 'utf-16-be'), 2
+    if encoding == 'utf-8-sig':
+        return 'utf-8', 3
+    if encoding in ('utf-16-le', 'utf-16-be'):
+        return encoding, 0
+    return None, 0  # 8-bit text: decode line by line with LINE_ENCODINGS
+
+def decode_lines(chunk, codec):
+    """Split a chunk that ends on a line boundary into decoded lines"""
+    if codec and codec.startswith('utf-16'):
+        return chunk.decode(codec, errors='replace').splitlines()
+    lines = []
+    for raw_line in chunk.splitlines():
+        for enc in LINE_ENCODINGS:
+            try:
+                lines.append(raw_line.decode(enc))
+                break
+            except UnicodeDecodeError:
+                continue
+    return lines
+
+def split_complete_lines(chunk, codec):
+    """(bytes up to and including the last newline, trailing partial line)"""
+    newline = '\n'.encode(codec) if codec and codec.startswith('utf-16') else b'\n'
+    end = chunk.rfind(newline)
+    while end > 0 and len(newline) == 2 and end % 2:
+        end = chunk.rfind(newline, 0, end)
+    complete = chunk[:end + len(newline)] if end >= 0 else b''
+    return complete, chunk[len(complete):]
+
+class LogTailer:
+    """Follow the newest log in a folder and read only the bytes appended since last time
+
+    While the current file keeps growing and the folder's own mtime is unchanged
+    (no log created, renamed or deleted) only that file is stat()ed. Once it
+    stops advancing the folder is rescanned, since appends to another log do not
+    touch the folder's mtime. Rotation to a new file, truncation and
+    replacement (different leading bytes) all restart reading from the
+    beginning. The file and offset survive restarts through a small JSON state
+    file, so a restarted process only reads what was appended since; the full
+    line list (all_lines) is rebuilt from disk only when a caller asks for it.
+    """
+
+    def __init__(self, folder, pattern="*.log", state_path=None):
+        self.folder = folder
+        self.pattern = pattern
+        self.state_path = state_path
+        self.state = self._load()
+        # Decoded lines of the current file; None until all_lines() rebuilds them after a restart
+        self.lines = None
+        self.partial_lines = 0
+
+    def _load(self):
+        if self.state_path:
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if isinstance(state, dict):
+                    return state
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    def _save(self):
+        if self.state_path:
+            atomic_write_json(self.state_path, self.state, indent=2)
+
+    def find_latest(self):
+        """Newest matching file, reusing the cached answer while the current file is still being written"""
+        try:
+            folder_mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            return None
+        current = self.state.get("current")
+        if folder_mtime == self.state.get("folder_mtime_ns") and current:
+            try:
+                current_mtime = os.stat(current).st_mtime_ns
+            except OSError:
+                current_mtime = None
+            if current_mtime is not None and current_mtime > self.state.get("latest_mtime_ns", 0):
+                self.state["latest_mtime_ns"] = current_mtime
+                return current
+
+        newest, newest_mtime = None, None
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or not fnmatch.fnmatch(entry.name, self.pattern):
+                    continue
+                mtime = entry.stat().st_mtime_ns
+                if newest_mtime is None or mtime > newest_mtime:
+                    newest, newest_mtime = entry.path, mtime
+        self.state["folder_mtime_ns"] = folder_mtime
+        self.state["latest_mtime_ns"] = newest_mtime or 0
+        return newest
+
+    def poll(self):
+        """Read whatever was appended to the newest log
+
+        Returns (path, new_lines, reset) where reset means new_lines start a new
+        file (rotation, truncation, replacement or first run), or None if there is no log.
+        """
+        path = self.find_latest()
+        if path is None:
+            return None
+
+        size = os.path.getsize(path)
+        offset = self.state.get("offset", 0)
+        # Compare the same number of leading bytes as last time, so a short
+        # file that is still growing does not look replaced
+        known_head = self.state.get("fingerprint_length", 0)
+        reset = (
+            path != self.state.get("current")
+            or size < offset
+            or fingerprint(path, known_head)[0] != self.state.get("fingerprint")
+        )
+        if reset:
+            codec, bom_length = get_stream_codec(path)
+            self.state.update({"current": path, "codec": codec, "start": bom_length, "offset": bom_length})
+            self.lines = []
+            self.partial_lines = 0
+            offset = bom_length
+        elif size == self.state.get("size"):
+            # Nothing appended since the last poll
+            return path, [], False
+        if reset or known_head < FINGERPRINT_BYTES:
+            self.state["fingerprint"], self.state["fingerprint_length"] = fingerprint(path)
+        codec = self.state.get("codec")
+
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            chunk = f.read(size - offset)
+
+        # The offset only advances past complete lines. A trailing partial line is
+        # still returned, but it is read again (and replaced) on the next poll
+        complete, partial = split_complete_lines(chunk, codec)
+        tail_lines = decode_lines(partial, codec)
+        new_lines = decode_lines(complete, codec) + tail_lines
+        if self.lines is not None:
+            if self.partial_lines:
+                del self.lines[-self.partial_lines:]
+            self.lines.extend(new_lines)
+            self.partial_lines = len(tail_lines)
+        self.state["offset"] = offset + len(complete)
+        self.state["size"] = size
+        self._save()
+        return path, new_lines, reset
+
+    def all_lines(self):
+        """Every line of the current log up to the last poll; read from disk once after a restart"""
+        if self.lines is None:
+            path = self.state.get("current")
+            if path is None:
+                return []
+            codec = self.state.get("codec")
+            start = self.state.get("start")
+            if start is None:  # state written before "start" was recorded
+                start = get_stream_codec(path)[1]
+            with open(path, 'rb') as f:
+                f.seek(start)
+                chunk = f.read(max(0, self.state.get("size", 0) - start))
+            complete, partial = split_complete_lines(chunk, codec)
+            tail_lines = decode_lines(partial, codec)
+            self.lines = decode_lines(complete, codec) + tail_lines
+            self.partial_lines = len(tail_lines)
+        return self.lines
@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+from safe_io import atomic_write_text
+
+# Seconds; wide enough for a 5 ms decode and a 15 minute push backlog
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)
+METRIC_PREFIX = "counter_trader_"
+
+MT5_DIR = os.path.dirname(os.path.abspath(__file__))
+METRICS_FILE = os.path.join(MT5_DIR, "metrics.prom")
+EVENT_LOG_FILE = os.path.join(MT5_DIR, "pipeline.log.jsonl")
+EVENT_LOG_MAX_BYTES = 5 * 1024 * 1024
+EVENT_LOG_BACKUPS = 3
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+class Registry:
+    """In-process counters, gauges and histograms rendered in Prometheus text format
+
+    Every update is a dict lookup and an addition under one lock, so the
+    pipeline can record every stage all the time at no noticeable cost.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.help = {}
+        self.types = {}
+        self.values = {}      # (name, labels) -> float for counters and gauges
+        self.histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+
+    def _declare(self, name, kind, help_text):
+        if name not in self.types:
+            self.types[name] = kind
+            self.help[name] = help_text or name.replace("_", " ")
+
+    def inc(self, name, amount=1, help_text=None, **labels):
+        """Add to a counter"""
+        with self.lock:
+            self._declare(name, "counter", help_text)
+            key = (name, label_key(labels))
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def set(self, name, value, help_text=None, **labels):
+        """Set a gauge"""
+        with self.lock:
+            self._declare(name, "gauge", help_text)
+            self.values[(name, label_key(labels))] = value
+
+    def observe(self, name, value, help_text=None, **labels):
+        """Record one observation in a histogram"""
+        with self.lock:
+            self._declare(name, "histogram", help_text)
+            key = (name, label_key(labels))
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[i] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def render(self):
+        """Prometheus text exposition format"""
+        with self.lock:
+            lines = []
+            for name in sorted(self.types):
+                full_name = METRIC_PREFIX + name
+                lines.append(f"# HELP {full_name} {self.help[name]}")
+                lines.append(f"# TYPE {full_name} {self.types[name]}")
+                if self.types[name] == "histogram":
+                    for (metric, key), histogram in sorted(self.histograms.items()):
+                        if metric != name:
+                            continue
+                        for bound, count in zip(self.buckets, histogram):
+                            lines.append(f"{full_name}_bucket{format_labels(key, [('le', bound)])} {count}")
+                        lines.append(f"{full_name}_bucket{format_labels(key, [('le', '+Inf')])} {histogram[-1]}")
+                        lines.append(f"{full_name}_sum{format_labels(key)} {round(histogram[-2], 6)}")
+                        lines.append(f"{full_name}_count{format_labels(key)} {histogram[-1]}")
+                else:
+                    for (metric, key), value in sorted(self.values.items()):
+                        if metric == name:
+                            lines.append(f"{full_name}{format_labels(key)} {value}")
+            return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+def inc(name, amount=1, help_text=None, **labels):
+    REGISTRY.inc(name, amount, help_text, **labels)
+
+def set_gauge(name, value, help_text=None, **labels):
+    REGISTRY.set(name, value, help_text, **labels)
+
+def observe(name, value, help_text=None, **labels):
+    REGISTRY.observe(name, value, help_text, **labels)
+
+@contextmanager
+def stage(name, **labels):
+    """Time a pipeline stage into stage_seconds{stage=name}; failures are counted separately"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        inc("stage_failures_total", help_text="Pipeline stages that raised", stage=name, **labels)
+        raise
+    finally:
+        observe("stage_seconds", time.perf_counter() - started,
+                help_text="Duration of each pipeline stage in seconds", stage=name, **labels)
+
+# === Structured event log (one JSON object per line) ===
+EVENT_LOGGER = logging.getLogger("counter_trader.pipeline")
+EVENT_LOGGER.propagate = False
+
+class JsonLineFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {"ts": datetime.fromtimestamp(record.created).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3],
+                 "level": record.levelname.lower(), "event": record.getMessage()}
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def configure_event_log(path=EVENT_LOG_FILE):
+    """Send log_event() output to a size-rotated JSON-lines file (None disables it)"""
+    for handler in list(EVENT_LOGGER.handlers):
+        EVENT_LOGGER.removeHandler(handler)
+        handler.close()
+    if not path:
+        EVENT_LOGGER.setLevel(logging.CRITICAL + 1)
+        return
+    handler = RotatingFileHandler(path, maxBytes=EVENT_LOG_MAX_BYTES, backupCount=EVENT_LOG_BACKUPS, encoding='utf-8')
+    handler.setFormatter(JsonLineFormatter())
+    EVENT_LOGGER.addHandler(handler)
+    EVENT_LOGGER.setLevel(logging.INFO)
+
+def log_event(event, level=logging.INFO, **fields):
+    """Write one structured event, e.g. log_event("file_published", file="28pair", lag=12.5)"""
+    if EVENT_LOGGER.handlers:
+        EVENT_LOGGER.log(level, event, extra={"fields": fields})
+
+# === Exposure: metrics file and/or a local /metrics endpoint ===
+def write_metrics_file(path=METRICS_FILE):
+    """Atomically write the current metrics (for node_exporter's textfile collector or a quick look)"""
+    if path:
+        atomic_write_text(path, REGISTRY.render())
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood the console
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """Serve /metrics from a daemon thread; returns the server"""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"📊 Metrics at http://{host}:{server.server_address[1]}/metrics")
+    return server
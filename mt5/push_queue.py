@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import threading
+import subprocess
+from datetime import datetime
+from safe_io import atomic_write_json
+from git_publisher import push, GIT_REMOTE, GIT_BRANCH, PUSH_TIMEOUT_SECONDS
+from pipeline_metrics import inc, observe
+
+# Retry schedule for failed pushes: 15s, 30s, 60s, ... capped at 15 minutes
+BACKOFF_BASE_SECONDS = 15
+BACKOFF_MAX_SECONDS = 900
+# Alert once a push has failed this many times in a row
+ALERT_AFTER_ATTEMPTS = 3
+
+def read_head_commit(repo_path):
+    """Return the commit id HEAD points at by reading .git directly (no subprocess)"""
+    git_dir = os.path.join(repo_path, ".git")
+    try:
+        with open(os.path.join(git_dir, "HEAD"), 'r', encoding='utf-8') as f:
+            head = f.read().strip()
+        if not head.startswith("ref: "):
+            return head
+        ref = head[5:]
+        ref_path = os.path.join(git_dir, *ref.split("/"))
+        if os.path.exists(ref_path):
+            with open(ref_path, 'r', encoding='utf-8') as f:
+                return f.read().strip()
+        with open(os.path.join(git_dir, "packed-refs"), 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[1] == ref:
+                    return parts[0]
+    except OSError:
+        pass
+    return None
+
+class PushQueue:
+    """Durable queue of local commits waiting to be pushed, drained by a background thread
+
+    Every commit is recorded in a small JSON file so a restart does not lose it.
+    One `git push` publishes all pending commits at once, so a backlog built up
+    during an outage is coalesced into a single push when the network returns.
+    """
+
+    def __init__(self, repo_path, queue_path, remote=GIT_REMOTE, branch=GIT_BRANCH,
+                 timeout=PUSH_TIMEOUT_SECONDS, on_failure=None):
+        self.repo_path = repo_path
+        self.queue_path = queue_path
+        self.remote = remote
+        self.branch = branch
+        self.timeout = timeout
+        self.on_failure = on_failure
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.state = self._load()
+
+    def _load(self):
+        try:
+            with open(self.queue_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if isinstance(state, dict) and isinstance(state.get("pending"), list):
+                return state
+        except (OSError, ValueError):
+            pass
+        return {"pending": [], "attempts": 0, "next_attempt": 0,
+                "last_error": None, "last_success": None}
+
+    def _save(self):
+        atomic_write_json(self.queue_path, self.state, indent=2)
+
+    def enqueue(self, message, commit=None):
+        """Record a local commit as pending and wake the worker"""
+        with self.lock:
+            self.state["pending"].append({
+                "commit": commit or read_head_commit(self.repo_path),
+                "message": message,
+                "queued_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            })
+            # A new commit is worth trying right away, even mid-backoff
+            self.state["next_attempt"] = 0
+            self._save()
+        self.wake.set()
+
+    def status(self):
+        """Snapshot of the queue for logs and the console"""
+        with self.lock:
+            pending = self.state["pending"]
+            return {
+                "pending": len(pending),
+                "oldest": pending[0]["queued_at"] if pending else None,
+                "attempts": self.state["attempts"],
+                "next_attempt_in": max(0, round(self.state["next_attempt"] - time.time())) if pending else 0,
+                "last_error": self.state["last_error"],
+                "last_success": self.state["last_success"]
+            }
+
+    def push_pending(self):
+        """Try one push of everything pending; returns True if the queue is empty afterwards"""
+        with self.lock:
+            batch = len(self.state["pending"])
+        if not batch:
+            return True
+
+        try:
+            push(self.repo_path, self.remote, self.branch, self.timeout)
+        except subprocess.TimeoutExpired:
+            self._record_failure(f"Git push timed out after {self.timeout} seconds - check internet connection")
+            return False
+        except subprocess.CalledProcessError as e:
+            error_msg = f"Git command failed: '{' '.join(e.cmd)}' (exit code: {e.returncode})"
+            if e.stderr:
+                error_msg += f"\nError output: {e.stderr}"
+            self._record_failure(error_msg)
+            return False
+        except Exception as e:
+            self._record_failure(f"Git error: {e}")
+            return False
+
+        with self.lock:
+            # Commits queued while we were pushing stay for the next round
+            pushed_at = datetime.now()
+            for item in self.state["pending"][:batch]:
+                queued_at = datetime.strptime(item["queued_at"], '%Y-%m-%d %H:%M:%S')
+                observe("push_latency_seconds", (pushed_at - queued_at).total_seconds(),
+                        help_text="Seconds from commit to successful push")
+            inc("push_attempts_total", help_text="Push attempts by outcome", result="ok")
+            del self.state["pending"][:batch]
+            self.state["attempts"] = 0
+            self.state["next_attempt"] = 0
+            self.state["last_error"] = None
+            self.state["last_success"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._save()
+            remaining = len(self.state["pending"])
+        print(f"✅ Pushed {batch} pending commit(s) to {self.remote}/{self.branch}")
+        return remaining == 0
+
+    def _record_failure(self, error_msg):
+        inc("push_attempts_total", result="failed")
+        with self.lock:
+            self.state["attempts"] += 1
+            attempts = self.state["attempts"]
+            delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+            self.state["next_attempt"] = time.time() + delay
+            self.state["last_error"] = error_msg
+            self._save()
+            pending = len(self.state["pending"])
+        print(f"❌ Push attempt {attempts} failed ({pending} commit(s) pending), retrying in {delay}s: {error_msg}")
+        if attempts == ALERT_AFTER_ATTEMPTS and self.on_failure:
+            self.on_failure(f"{error_msg}\n\n{pending} commit(s) waiting to be pushed, "
+                            f"{attempts} attempts so far")
+
+    def run(self):
+        """Worker loop: push whenever commits are pending and the backoff has expired"""
+        while not self.stop_event.is_set():
+            with self.lock:
+                has_pending = bool(self.state["pending"])
+                wait = max(0.0, self.state["next_attempt"] - time.time())
+            if has_pending and wait == 0:
+                self.push_pending()
+                continue
+            # Sleep until the retry is due or a new commit arrives
+            self.wake.wait(wait if has_pending else None)
+            self.wake.clear()
+
+    def start(self):
+        """Start the background push worker (pending commits from a previous run go first)"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="git-push-queue", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        """Ask the worker to finish and wait for it"""
+        self.stop_event.set()
+        self.wake.set()
+        if self.thread:
+            self.thread.join(timeout)
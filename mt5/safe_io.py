@@ -0,0 +1,109 @@
+import os
+import json
+import stat
+import time
+import tempfile
+from contextlib import contextmanager
+
+# A source file whose mtime is older than this is assumed to be fully written
+SETTLE_SECONDS = 1.0
+# How many times to re-check a source file that is still changing
+STABLE_READ_ATTEMPTS = 5
+# os.replace can fail on Windows while another process has the target open
+REPLACE_RETRIES = 10
+REPLACE_RETRY_DELAY = 0.1
+# mkstemp creates its file as 0600; a new target gets what open() would have given it.
+# os.umask can only be read by setting it, so do that once here rather than per write
+# (it is process-wide, and other threads may be creating files).
+UMASK = os.umask(0o022)
+os.umask(UMASK)
+
+@contextmanager
+def atomic_open(path, mode='wb', **open_kwargs):
+    """Open a temp file next to path; on success it is fsynced and moved over path
+
+    Readers (git, the Netlify deploy, the dashboard) see either the old file or
+    the new one, never a truncated half-written file. If the block raises, the
+    temp file is removed and path is left untouched.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, target_mode(path))
+        replace_file(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Make the rename itself durable (not supported for directories on Windows)
+    if os.name != 'nt':
+        dir_fd = os.open(folder, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def target_mode(path):
+    """Permission bits for a rewrite of path: the existing file's, or 0666 minus the umask"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+def replace_file(source_path, destination_path):
+    """os.replace with a few retries for Windows sharing violations"""
+    for attempt in range(REPLACE_RETRIES):
+        try:
+            os.replace(source_path, destination_path)
+            return
+        except PermissionError:
+            if attempt == REPLACE_RETRIES - 1:
+                raise
+            time.sleep(REPLACE_RETRY_DELAY)
+
+def atomic_write_bytes(path, data):
+    """Atomically replace path with data"""
+    with atomic_open(path, 'wb') as f:
+        f.write(data)
+
+def atomic_write_text(path, text, encoding='utf-8'):
+    """Atomically replace path with text"""
+    atomic_write_bytes(path, text.encode(encoding))
+
+def atomic_write_json(path, data, **dump_kwargs):
+    """Atomically replace path with data serialised as JSON"""
+    atomic_write_text(path, json.dumps(data, **dump_kwargs))
+
+def get_signature(path):
+    """(mtime_ns, size) of a file"""
+    info = os.stat(path)
+    return (info.st_mtime_ns, info.st_size)
+
+def read_stable_bytes(path, settle=SETTLE_SECONDS, attempts=STABLE_READ_ATTEMPTS):
+    """Read a file the EA may still be writing; returns None if it never settles
+
+    Files last modified more than `settle` seconds ago are read straight away.
+    Otherwise we wait until size and mtime stop changing. Either way the
+    signature is checked again after the read, so a write that lands during
+    the read is caught and the file is read again.
+    """
+    for _ in range(attempts):
+        before = get_signature(path)
+        age = time.time() - before[0] / 1e9
+        if age < settle:
+            time.sleep(settle - age)
+            if get_signature(path) != before:
+                continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        if get_signature(path) == before and len(data) == before[1]:
+            return data
+    return None
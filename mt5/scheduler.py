@@ -0,0 +1,368 @@
+import sys
+import time
+import asyncio
+import threading
+from datetime import datetime, timedelta
+import file_updater
+from pipeline_metrics import observe, inc, configure_event_log, start_metrics_server
+from feed_server import start_feed_server
+
+# signal_new needs openpyxl; without it the Excel export job is left out
+try:
+    import signal_new
+    EXCEL_EXPORT_AVAILABLE = True
+except ImportError:
+    EXCEL_EXPORT_AVAILABLE = False
+
+# Longest single sleep. Wall-clock time is re-read after every wake-up, so a
+# suspended PC or a clock change is noticed within this many seconds.
+MAX_SLEEP_SECONDS = 30
+# A run that starts later than this after its slot counts as missed
+MISSED_GRACE_SECONDS = 60
+
+# Catch-up policies for runs missed while the machine slept or the clock jumped
+CATCH_UP_ONCE = "once"  # run once as soon as possible, however many slots were missed
+CATCH_UP_SKIP = "skip"  # wait for the next slot
+
+class CronSchedule:
+    """Cron-style schedule: minute, hour and day-of-week fields
+
+    Each field accepts '*', 'N', 'a-b', 'a,b,c' and '*/N' (or 'a-b/N').
+    Day of week follows datetime.weekday(): 0 = Monday ... 6 = Sunday.
+    """
+
+    RANGES = {"minute": (0, 59), "hour": (0, 23), "weekday": (0, 6)}
+
+    def __init__(self, minute="*", hour="*", weekday="*"):
+        self.spec = f"{minute} {hour} {weekday}"
+        self.minutes = self.parse_field(minute, *self.RANGES["minute"])
+        self.hours = self.parse_field(hour, *self.RANGES["hour"])
+        self.weekdays = self.parse_field(weekday, *self.RANGES["weekday"])
+
+    @staticmethod
+    def parse_field(value, low, high):
+        values = set()
+        for part in str(value).split(","):
+            part, _, step = part.partition("/")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = (int(bound) for bound in part.split("-", 1))
+            else:
+                start = end = int(part)
+            if not low <= start <= end <= high:
+                raise ValueError(f"'{value}' is outside {low}-{high}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def matches(self, moment):
+        return (moment.minute in self.minutes and moment.hour in self.hours
+                and moment.weekday() in self.weekdays)
+
+    def next_after(self, moment):
+        """First matching minute strictly after moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # At most one week of minutes; whole hours/days are skipped when they cannot match
+        limit = candidate + timedelta(days=8)
+        while candidate < limit:
+            if candidate.weekday() not in self.weekdays:
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"schedule '{self.spec}' never fires")
+
+    def __str__(self):
+        return self.spec
+
+class Job:
+    """A function run on a schedule, with its own timing metrics
+
+    func runs in a worker thread so blocking file and git work never stalls the
+    event loop. A job never overlaps itself: a slot that comes due while the
+    previous run is still going is skipped and counted. Jobs that share a
+    resource name (e.g. "git") wait for each other instead of running together.
+    """
+
+    def __init__(self, name, schedule, func, resources=(), catch_up=CATCH_UP_ONCE, on_failure=None, quiet=False):
+        self.name = name
+        self.schedule = schedule
+        self.func = func
+        self.resources = tuple(sorted(resources))
+        self.catch_up = catch_up
+        self.on_failure = on_failure
+        self.quiet = quiet  # only report failures, e.g. for minutely housekeeping
+        self.running = False
+        self.next_run = None
+        self.metrics = {
+            "runs": 0,
+            "failures": 0,
+            "overlaps_skipped": 0,
+            "missed": 0,
+            "caught_up": 0,
+            "last_start": None,
+            "last_duration": None,
+            "max_duration": 0.0,
+            "total_duration": 0.0,
+            "last_error": None
+        }
+
+class Scheduler:
+    """Run every registered Job from one asyncio event loop
+
+    Each job sleeps until its next slot (no per-second polling). After every
+    wake-up the wall clock is compared with the planned slot, so runs missed
+    during sleep/hibernation or a forward clock jump are caught up according to
+    the job's policy, and a backward jump re-plans the next slot. clock returns
+    the current wall-clock time (datetime.now; replaceable for tests).
+    """
+
+    def __init__(self, clock=datetime.now):
+        self.clock = clock
+        self.jobs = {}
+        self.resource_locks = {}
+        self.stop_event = None
+        self.loop = None
+
+    def resource_lock(self, name, lock=None):
+        """threading.Lock for a resource; pass lock to share one that code outside the scheduler also takes"""
+        return self.resource_locks.setdefault(name, lock or threading.Lock())
+
+    def add_job(self, name, schedule, func, resources=(), catch_up=CATCH_UP_ONCE, on_failure=None, quiet=False):
+        if name in self.jobs:
+            raise ValueError(f"job '{name}' already registered")
+        for resource in resources:
+            self.resource_lock(resource)
+        self.jobs[name] = Job(name, schedule, func, resources, catch_up, on_failure, quiet)
+        return self.jobs[name]
+
+    def reschedule(self, name, schedule):
+        """Give a job a new schedule; a sleeping job picks it up within MAX_SLEEP_SECONDS"""
+        job = self.jobs[name]
+        job.schedule = schedule
+        job.next_run = schedule.next_after(self.clock())
+        print(f"🗓️ {name}: rescheduled to '{schedule}' - next run {job.next_run:%Y-%m-%d %H:%M}")
+
+    def run_locked(self, job):
+        """Run job.func holding its resource locks (in a worker thread)"""
+        locks = [self.resource_lock(resource) for resource in job.resources]
+        for lock in locks:
+            lock.acquire()
+        try:
+            return job.func()
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    async def execute(self, job, reason="scheduled"):
+        """One run of a job with overlap protection and timing"""
+        if job.running:
+            job.metrics["overlaps_skipped"] += 1
+            inc("job_overlaps_skipped_total", help_text="Slots skipped because the job was still running", job=job.name)
+            print(f"⏭️ {job.name}: previous run still going - skipping this slot")
+            return
+        job.running = True
+        started = time.perf_counter()
+        job.metrics["last_start"] = self.clock().strftime('%Y-%m-%d %H:%M:%S')
+        if not job.quiet:
+            print(f"▶️ {job.name} started ({reason}) at {job.metrics['last_start']}")
+        try:
+            await asyncio.to_thread(self.run_locked, job)
+            job.metrics["last_error"] = None
+        except Exception as e:
+            job.metrics["failures"] += 1
+            job.metrics["last_error"] = str(e)
+            print(f"❌ {job.name} failed: {e}")
+            if job.on_failure:
+                try:
+                    job.on_failure(job, e)
+                except Exception as alert_error:
+                    print(f"❌ {job.name} failure handler failed: {alert_error}")
+        finally:
+            duration = time.perf_counter() - started
+            job.running = False
+            job.metrics["runs"] += 1
+            job.metrics["last_duration"] = round(duration, 3)
+            job.metrics["total_duration"] += duration
+            job.metrics["max_duration"] = max(job.metrics["max_duration"], round(duration, 3))
+            observe("job_seconds", duration, help_text="Scheduled job run time", job=job.name)
+            inc("job_runs_total", help_text="Scheduled job runs by outcome", job=job.name,
+                result="failed" if job.metrics["last_error"] else "ok")
+            if not job.quiet:
+                print(f"⏱️ {job.name} finished in {duration:.2f}s")
+
+    async def run_job(self, job):
+        """Sleep until each slot of one job and fire it"""
+        job.next_run = job.schedule.next_after(self.clock())
+        tasks = set()
+        while not self.stop_event.is_set():
+            delay = (job.next_run - self.clock()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.stop_event.wait(), min(delay, MAX_SLEEP_SECONDS))
+                except asyncio.TimeoutError:
+                    pass
+                now = self.clock()
+                # Clock moved backwards: the planned slot is now further away than the real next one
+                replanned = job.schedule.next_after(now)
+                if replanned < job.next_run:
+                    print(f"🕒 {job.name}: clock moved back - next run {replanned:%Y-%m-%d %H:%M}")
+                    job.next_run = replanned
+                continue
+
+            now = self.clock()
+            reason = "scheduled"
+            if (now - job.next_run).total_seconds() > MISSED_GRACE_SECONDS:
+                missed = self.count_slots(job.schedule, job.next_run, now)
+                job.metrics["missed"] += missed
+                inc("job_missed_total", missed, help_text="Slots missed during sleep or clock jumps", job=job.name)
+                print(f"⚠️ {job.name}: {missed} run(s) missed since {job.next_run:%Y-%m-%d %H:%M} (sleep or clock jump)")
+                if job.catch_up == CATCH_UP_SKIP:
+                    job.next_run = job.schedule.next_after(now)
+                    continue
+                job.metrics["caught_up"] += 1
+                reason = "catch-up"
+
+            job.next_run = job.schedule.next_after(now)
+            # Fire without waiting so a long run is visible as an overlap on the next slot
+            task = asyncio.create_task(self.execute(job, reason))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    @staticmethod
+    def count_slots(schedule, since, until):
+        """Slots from since (inclusive) up to until"""
+        count = 0
+        slot = since
+        while slot <= until and count < 10000:
+            count += 1
+            slot = schedule.next_after(slot)
+        return count
+
+    def status(self):
+        """Per-job metrics, next run and state"""
+        status = {}
+        for name, job in self.jobs.items():
+            metrics = dict(job.metrics)
+            metrics["average_duration"] = round(metrics["total_duration"] / metrics["runs"], 3) if metrics["runs"] else None
+            metrics["total_duration"] = round(metrics["total_duration"], 3)
+            status[name] = {
+                "schedule": str(job.schedule),
+                "next_run": job.next_run.strftime('%Y-%m-%d %H:%M') if job.next_run else None,
+                "running": job.running,
+                **metrics
+            }
+        return status
+
+    async def run(self):
+        """Run all jobs until stop() is called"""
+        self.stop_event = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+        for job in self.jobs.values():
+            print(f"🗓️ {job.name}: '{job.schedule}' - next run {job.schedule.next_after(self.clock()):%Y-%m-%d %H:%M}")
+        await asyncio.gather(*(self.run_job(job) for job in self.jobs.values()))
+
+    def stop(self):
+        """Stop scheduling new runs (safe to call from any thread)"""
+        if self.stop_event is not None:
+            self.loop.call_soon_threadsafe(self.stop_event.set)
+
+# === Jobs: python scheduler.py replaces file_updater.main, backup.main and signal_new.run_at_minute ===
+def alert_job_failure(job, error):
+    """Send a deduplicated alert when a scheduled job raises"""
+    file_updater.get_alert_dispatcher().send(
+        f"❌ Scheduled job '{job.name}' failed",
+        f"Job: {job.name} ({job.schedule})\nTime: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        f"Error: {error}\nFailures so far: {job.metrics['failures']}",
+        key=("job", job.name, str(error)))
+
+def configured_schedules(watching):
+    """Schedules that come from terminals.toml, by job name"""
+    schedules = {"analytics": CronSchedule(minute=15, hour=file_updater.ANALYTICS_HOUR)}
+    if not watching:
+        schedules["copy"] = CronSchedule(minute=file_updater.SCHEDULE_MINUTE)
+    if EXCEL_EXPORT_AVAILABLE:
+        schedules["excel-export"] = CronSchedule(minute=signal_new.EXPORT_MINUTE)
+    return schedules
+
+def reload_configs(scheduler, watching):
+    """Pick up terminals.toml changes (the watcher reloads file_updater itself) and move changed slots"""
+    if not watching:
+        file_updater.reload_config()
+    if EXCEL_EXPORT_AVAILABLE:
+        signal_new.reload_config()
+    for name, schedule in configured_schedules(watching).items():
+        if name in scheduler.jobs and str(scheduler.jobs[name].schedule) != str(schedule):
+            scheduler.reschedule(name, schedule)
+
+def build_scheduler(watching):
+    """Register the copy, compaction, analytics, image, Excel-export, alert and config jobs (and git, if enabled)"""
+    scheduler = Scheduler()
+    # The watcher callback takes the same lock, so an event-driven copy and a
+    # scheduled git run never work on data/ at the same time
+    scheduler.resource_lock("publish", file_updater.PUBLISH_LOCK)
+    schedules = configured_schedules(watching)
+
+    if not watching:
+        scheduler.add_job("copy", schedules["copy"], file_updater.move_files,
+                          resources=("publish",), on_failure=alert_job_failure)
+    if file_updater.DAILY_GIT_COMMIT:
+        scheduler.add_job("git", CronSchedule(minute=0, hour=23), file_updater.run_git_commands_all,
+                          resources=("publish",), on_failure=alert_job_failure)
+    # Nightly, after the day's last publish; does nothing unless COMPACT_HISTORY is on
+    scheduler.add_job("compact", CronSchedule(minute=30, hour=23), file_updater.compact_git_history,
+                      resources=("publish",), catch_up=CATCH_UP_SKIP, on_failure=alert_job_failure, quiet=True)
+    # Daily: summarising ANALYTICS_DAYS of history is too heavy for every publish
+    scheduler.add_job("analytics", schedules["analytics"], file_updater.publish_analytics,
+                      resources=("publish",), on_failure=alert_job_failure, quiet=True)
+    # New charts get their manifest entry and variants within the hour (no-op when nothing changed)
+    scheduler.add_job("images", CronSchedule(minute=10), file_updater.publish_images,
+                      resources=("publish",), catch_up=CATCH_UP_SKIP, on_failure=alert_job_failure, quiet=True)
+    if EXCEL_EXPORT_AVAILABLE:
+        scheduler.add_job("excel-export", schedules["excel-export"], signal_new.export_all_logs,
+                          resources=("excel",), on_failure=alert_job_failure)
+    else:
+        print("⚠️ openpyxl not installed - Excel export job not registered")
+    scheduler.add_job("alerts", CronSchedule(minute="*/15"), file_updater.check_push_backlog,
+                      catch_up=CATCH_UP_SKIP, on_failure=alert_job_failure, quiet=True)
+    scheduler.add_job("config", CronSchedule(), lambda: reload_configs(scheduler, watching), catch_up=CATCH_UP_SKIP, quiet=True)
+    scheduler.add_job("metrics", CronSchedule(), file_updater.publish_metrics, catch_up=CATCH_UP_SKIP, quiet=True)
+    return scheduler
+
+def main(mode=None):
+    """One process for every job; mode "watch" also copies files as soon as the EA writes them"""
+    print("Counter Trader Scheduler Started")
+    configure_event_log(file_updater.EVENT_LOG_PATH)
+    if file_updater.METRICS_PORT:
+        start_metrics_server(file_updater.METRICS_PORT)
+    file_updater.reload_config(force=True)
+    if file_updater.FEED_SERVER_PORT:
+        start_feed_server(file_updater.GIT_REPO_PATH, file_updater.FEED_SERVER_PORT)
+    if EXCEL_EXPORT_AVAILABLE:
+        signal_new.reload_config(force=True)
+    watching = (mode or file_updater.TRIGGER_MODE) == "watch"
+    scheduler = build_scheduler(watching)
+
+    if file_updater.ASYNC_PUSH:
+        file_updater.get_push_queue().start()
+    if watching:
+        threading.Thread(target=file_updater.run_watch_loop, name="file-watcher", daemon=True).start()
+    print("-" * 50)
+    try:
+        asyncio.run(scheduler.run())
+    except KeyboardInterrupt:
+        print("\nStopping scheduler...")
+    finally:
+        for name, metrics in scheduler.status().items():
+            print(f"📊 {name}: {metrics['runs']} run(s), {metrics['failures']} failure(s), "
+                  f"avg {metrics['average_duration']}s, max {metrics['max_duration']}s")
+        if file_updater.ALERT_DISPATCHER is not None:
+            file_updater.ALERT_DISPATCHER.stop(timeout=30)
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
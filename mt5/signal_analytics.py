@@ -0,0 +1,197 @@
+import os
+import sys
+import argparse
+import warnings
+from datetime import datetime, timedelta
+import numpy as np
+from history_store import iter_rows, COLUMNS, HISTORY_DIR
+from safe_io import atomic_write_json
+
+# Numeric history columns loaded into the cube, in axis-2 order
+NUMERIC_COLUMNS = [column for column in COLUMNS[3:] if column not in ("signal", "trigger", "trigger_reason", "extra")]
+# Hourly snapshots: 24 = one day rolling window
+ROLLING_WINDOW = 24
+CONFIDENCE_BINS = np.arange(0, 110, 10)
+TOP_CORRELATIONS = 10
+ANALYTICS_DAYS = 30
+
+def load_cube(start=None, end=None, source=None, history_dir=HISTORY_DIR):
+    """Load stored snapshots into arrays
+
+    Returns (pairs, timestamps, cube, triggers, reasons): cube is float
+    pairs x time x NUMERIC_COLUMNS with NaN where a pair has no snapshot,
+    triggers/reasons are object arrays pairs x time.
+    """
+    rows = list(iter_rows(start, end, source=source, history_dir=history_dir))
+    pairs = sorted({row[2] for row in rows})
+    timestamps = sorted({row[0] for row in rows})
+    pair_index = {pair: i for i, pair in enumerate(pairs)}
+    time_index = {ts: j for j, ts in enumerate(timestamps)}
+
+    cube = np.full((len(pairs), len(timestamps), len(NUMERIC_COLUMNS)), np.nan)
+    triggers = np.full((len(pairs), len(timestamps)), None, dtype=object)
+    reasons = np.full((len(pairs), len(timestamps)), None, dtype=object)
+    if not rows:
+        return pairs, np.array(timestamps, dtype='datetime64[s]'), cube, triggers, reasons
+
+    column_index = {column: k for k, column in enumerate(COLUMNS)}
+    numeric_positions = [column_index[column] for column in NUMERIC_COLUMNS]
+    i = np.fromiter((pair_index[row[2]] for row in rows), dtype=np.intp, count=len(rows))
+    j = np.fromiter((time_index[row[0]] for row in rows), dtype=np.intp, count=len(rows))
+    values = np.array([[np.nan if row[k] is None else row[k] for k in numeric_positions] for row in rows],
+                      dtype=float)
+    cube[i, j] = values
+    triggers[i, j] = [row[column_index["trigger"]] for row in rows]
+    reasons[i, j] = [row[column_index["trigger_reason"]] for row in rows]
+    return pairs, np.array(timestamps, dtype='datetime64[s]'), cube, triggers, reasons
+
+def field(cube, column):
+    """pairs x time slice of one numeric column"""
+    return cube[:, :, NUMERIC_COLUMNS.index(column)]
+
+def rolling_stats(series, window=ROLLING_WINDOW):
+    """NaN-aware rolling mean and std along the time axis of a pairs x time array"""
+    valid = ~np.isnan(series)
+    filled = np.where(valid, series, 0.0)
+    pad = ((0, 0), (1, 0))
+    count = np.pad(np.cumsum(valid, axis=1), pad)
+    total = np.pad(np.cumsum(filled, axis=1), pad)
+    squares = np.pad(np.cumsum(filled ** 2, axis=1), pad)
+
+    upper = np.arange(1, series.shape[1] + 1)
+    lower = np.maximum(upper - window, 0)
+    n = count[:, upper] - count[:, lower]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (total[:, upper] - total[:, lower]) / n
+        variance = (squares[:, upper] - squares[:, lower]) / n - mean ** 2
+    return mean, np.sqrt(np.clip(variance, 0, None))
+
+def direction(left, right):
+    """+1 Buy (left > right), -1 Sell, 0 Hold, NaN if missing - as getEntrySignalFromRanking"""
+    return np.where(np.isnan(left) | np.isnan(right), np.nan, np.sign(left - right))
+
+def rank_transitions(cube):
+    """Overall_Ranking changes between consecutive snapshots and a Sell/Hold/Buy transition matrix"""
+    left, right = field(cube, "overall_rank_l"), field(cube, "overall_rank_r")
+    previous_left, current_left = left[:, :-1], left[:, 1:]
+    previous_right, current_right = right[:, :-1], right[:, 1:]
+    both = ~(np.isnan(previous_left) | np.isnan(current_left))
+    changed = both & ((previous_left != current_left) | (previous_right != current_right))
+
+    states = direction(left, right)
+    before, after = states[:, :-1], states[:, 1:]
+    usable = ~(np.isnan(before) | np.isnan(after))
+    matrix = np.zeros((3, 3), dtype=int)
+    np.add.at(matrix, (before[usable].astype(int) + 1, after[usable].astype(int) + 1), 1)
+    return changed.sum(axis=1), both.sum(axis=1), matrix
+
+def trigger_rates(triggers, reasons):
+    """Share of snapshots with TRIGGER == ON, overall and per TRIGGER_REASON"""
+    observed = triggers != None  # noqa: E711 - element-wise comparison on an object array
+    on = triggers == "ON"
+    total = int(observed.sum())
+    by_reason = {}
+    for reason in sorted({r for r in reasons[on] if r is not None}):
+        hits = on & (reasons == reason)
+        by_reason[reason] = {
+            "count": int(hits.sum()),
+            "rate": round(float(hits.sum()) / total, 4) if total else 0.0,
+            "share_of_triggers": round(float(hits.sum()) / on.sum(), 4),
+            "pairs": int(hits.any(axis=1).sum())
+        }
+    return {
+        "snapshots": total,
+        "on": int(on.sum()),
+        "rate": round(float(on.sum()) / total, 4) if total else 0.0,
+        "by_reason": by_reason,
+        "per_pair_rate": np.where(observed.sum(axis=1) > 0, on.sum(axis=1) / np.maximum(observed.sum(axis=1), 1), np.nan)
+    }
+
+def confidence_correlation(confidence, pairs, top=TOP_CORRELATIONS):
+    """Most correlated pair couples on Confidence, using snapshots where every pair is present"""
+    complete = ~np.isnan(confidence).any(axis=0)
+    series = confidence[:, complete]
+    if series.shape[1] < 3 or len(pairs) < 2:
+        return []
+    with np.errstate(invalid='ignore', divide='ignore'):
+        matrix = np.corrcoef(series)
+    upper_i, upper_j = np.triu_indices(len(pairs), k=1)
+    values = matrix[upper_i, upper_j]
+    order = np.argsort(-np.abs(np.nan_to_num(values)))[:top]
+    return [{"pairs": [pairs[upper_i[k]], pairs[upper_j[k]]], "correlation": round(float(values[k]), 4)}
+            for k in order if not np.isnan(values[k])]
+
+def rounded(value, digits=2):
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+def summarise(start=None, end=None, source=None, history_dir=HISTORY_DIR, window=ROLLING_WINDOW):
+    """Batch statistics over the stored history as a JSON-ready dict"""
+    pairs, timestamps, cube, triggers, reasons = load_cube(start, end, source, history_dir)
+    summary = {
+        "generated": datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+        "source": source,
+        "from": str(timestamps[0]) if len(timestamps) else None,
+        "to": str(timestamps[-1]) if len(timestamps) else None,
+        "snapshots": len(timestamps),
+        "pairs": {}
+    }
+    if not pairs or not len(timestamps):
+        return summary
+
+    confidence = field(cube, "confidence")
+    rsi = field(cube, "rsi_breakout")
+    confidence_mean, confidence_std = rolling_stats(confidence, window)
+    rsi_mean, rsi_std = rolling_stats(rsi, window)
+    changes, comparisons, matrix = rank_transitions(cube)
+    triggers_summary = trigger_rates(triggers, reasons)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # pairs with no Confidence at all
+        percentiles = np.nanpercentile(confidence, [10, 50, 90], axis=1)
+
+    for i, pair in enumerate(pairs):
+        summary["pairs"][pair] = {
+            "confidence_rolling_mean": rounded(confidence_mean[i, -1]),
+            "confidence_rolling_std": rounded(confidence_std[i, -1]),
+            "rsi_rolling_mean": rounded(rsi_mean[i, -1]),
+            "rsi_rolling_std": rounded(rsi_std[i, -1]),
+            "confidence_p10_p50_p90": [rounded(percentiles[k, i], 1) for k in range(3)],
+            "overall_rank_changes": int(changes[i]),
+            "overall_rank_change_rate": rounded(changes[i] / comparisons[i], 4) if comparisons[i] else None,
+            "trigger_rate": rounded(triggers_summary["per_pair_rate"][i], 4)
+        }
+
+    histogram, _ = np.histogram(confidence[~np.isnan(confidence)], bins=CONFIDENCE_BINS)
+    summary["rolling_window"] = window
+    summary["confidence_histogram"] = {
+        "bins": CONFIDENCE_BINS.tolist(),
+        "counts": histogram.tolist()
+    }
+    summary["overall_direction_transitions"] = {
+        "states": ["Sell", "Hold", "Buy"],
+        "matrix": matrix.tolist()
+    }
+    summary["triggers"] = {key: value for key, value in triggers_summary.items() if key != "per_pair_rate"}
+    summary["confidence_correlation"] = confidence_correlation(confidence, pairs)
+    return summary
+
+def write_analytics_summary(source, output_dir, days=ANALYTICS_DAYS, history_dir=HISTORY_DIR):
+    """Summarise the last `days` of history for one source into output_dir/signal_analytics_<source>.json"""
+    start = datetime.now() - timedelta(days=days)
+    summary = summarise(start=start, source=source, history_dir=history_dir)
+    path = os.path.join(output_dir, f"signal_analytics_{source}.json")
+    atomic_write_json(path, summary, ensure_ascii=False, indent=2)
+    return path
+
+# === CLI: python signal_analytics.py 28pair --days 30 --output ../data ===
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise stored signal history")
+    parser.add_argument("source", help="signal set, e.g. 28pair")
+    parser.add_argument("--days", type=int, default=ANALYTICS_DAYS)
+    parser.add_argument("--dir", default=HISTORY_DIR, help="history folder")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+    args = parser.parse_args(argv)
+    path = write_analytics_summary(args.source, args.output, args.days, args.dir)
+    print(f"📈 Analytics written to {os.path.abspath(path)}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,370 @@
+import os
+import csv
+import sys
+import json
+import glob
+import argparse
+from datetime import datetime
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from history_store import snapshot_rows, append_snapshots, HISTORY_DIR
+from safe_io import atomic_write_json
+
+# Offline re-implementation of the forexData fields the EAs write: all 28 pairs as in
+# ea/TradingSignal_RSI_Stay.mq5, and the 10 majors (5 currencies) as in ea/Trading_Signal_Trigger.mq5.
+# Currency order matters: the EA's bubble sorts keep this order on ties.
+CURRENCIES = ["USD", "EUR", "GBP", "AUD", "JPY", "CAD", "CHF", "NZD"]
+SYMBOLS_28 = [
+    "USDJPY", "EURJPY", "GBPJPY", "AUDJPY", "NZDJPY", "CADJPY", "CHFJPY",
+    "EURUSD", "AUDUSD", "GBPUSD", "NZDUSD", "USDCHF", "USDCAD",
+    "EURGBP", "EURAUD", "EURCAD", "EURCHF", "EURNZD",
+    "GBPAUD", "GBPCHF", "GBPCAD", "GBPNZD",
+    "AUDCAD", "AUDCHF", "AUDNZD", "CADCHF", "NZDCAD", "NZDCHF"
+]
+SYMBOLS_10 = ["USDJPY", "EURUSD", "GBPUSD", "AUDUSD", "EURJPY", "GBPJPY", "AUDJPY", "EURGBP", "EURAUD", "GBPAUD"]
+# fx_signals_<name>.json -> the pairs the EA ranks together
+PAIR_SETS = {"28pair": SYMBOLS_28, "10pair": SYMBOLS_10}
+# Indicator settings of the EA (all on H4 closes)
+TIMEFRAME = "H4"
+RSI_PERIOD = 14
+CCI_PERIOD = 14
+BB_PERIOD = 20
+BB_DEVIATIONS = 2.0
+BB_MIN_WIDTH = 0.0000001
+# Signal thresholds on the rounded RSI
+BUY_BELOW = 34.0
+SELL_ABOVE = 64.0
+
+RANK_FIELDS = ("Currency_Strength_Rank_all_pair", "CCI_Currency_Strength_Rank_all_pair",
+               "BB_percent_ranking", "Overall_Ranking")
+
+# === Indicators: arrays are pairs x bars, NaN where a bar is missing or warming up ===
+def rsi(close, period=RSI_PERIOD):
+    """MT5 iRSI: Wilder smoothing seeded with the simple average of the first `period` moves"""
+    pairs, bars = close.shape
+    result = np.full((pairs, bars), np.nan)
+    if bars <= period:
+        return result
+    diff = np.diff(close, axis=1)
+    gains = np.where(diff > 0, diff, 0.0)
+    losses = np.where(diff < 0, -diff, 0.0)
+    positive = gains[:, :period].mean(axis=1)
+    negative = losses[:, :period].mean(axis=1)
+    # The recursion runs over bars once, for every pair at the same time
+    for i in range(period, bars):
+        if i > period:
+            positive = (positive * (period - 1) + gains[:, i - 1]) / period
+            negative = (negative * (period - 1) + losses[:, i - 1]) / period
+        with np.errstate(divide='ignore', invalid='ignore'):
+            value = 100.0 - 100.0 / (1.0 + positive / negative)
+        result[:, i] = np.where(negative != 0, value, np.where(positive != 0, 100.0, 50.0))
+    return result
+
+def rolling_windows(values, period):
+    """pairs x bars x period view; the first period-1 bars have no full window"""
+    windows = sliding_window_view(values, period, axis=1)
+    pad = np.full((values.shape[0], period - 1, period), np.nan)
+    return np.concatenate([pad, windows], axis=1)
+
+def cci(close, period=CCI_PERIOD):
+    """MT5 iCCI on close: (price - SMA) / (0.015 * mean absolute deviation from that SMA)"""
+    windows = rolling_windows(close, period)
+    average = windows.mean(axis=2)
+    deviation = np.abs(windows - average[:, :, None]).mean(axis=2) * 0.015
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(deviation != 0, (close - average) / deviation, 0.0) * np.where(np.isnan(average), np.nan, 1.0)
+
+def bollinger_percent_b(close, period=BB_PERIOD, deviations=BB_DEVIATIONS):
+    """MT5 iBands %B: position of the close between bands of SMA +- deviations * population std"""
+    windows = rolling_windows(close, period)
+    middle = windows.mean(axis=2)
+    spread = np.sqrt(((windows - middle[:, :, None]) ** 2).mean(axis=2)) * deviations
+    width = 2 * spread
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent_b = (close - (middle - spread)) / width
+    return np.where(width < BB_MIN_WIDTH, np.nan, percent_b)
+
+# === Bars: OHLC CSV exports ===
+def read_ohlc_csv(path):
+    """(times as datetime64[s], closes) from an MT5 export or a plain time,open,high,low,close CSV"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        delimiter = "\t" if "\t" in sample else ";" if sample.count(";") > sample.count(",") else ","
+        rows = list(csv.reader(f, delimiter=delimiter))
+    header = [column.strip("<> ").lower() for column in rows[0]]
+    if "close" in header:
+        rows = rows[1:]
+    else:
+        header = ["date", "time", "open", "high", "low", "close"][:len(rows[0])]
+    close_index = header.index("close")
+    times = []
+    closes = []
+    for row in rows:
+        if len(row) <= close_index:
+            continue
+        if "date" in header and "time" in header:
+            stamp = f"{row[header.index('date')]} {row[header.index('time')]}"
+        else:
+            stamp = row[header.index("time") if "time" in header else 0]
+        times.append(np.datetime64(stamp.strip().replace(".", "-").replace("T", " ").replace(" ", "T"), 's'))
+        closes.append(float(row[close_index]))
+    order = np.argsort(np.array(times, dtype='datetime64[s]'), kind='stable')
+    return np.array(times, dtype='datetime64[s]')[order], np.array(closes)[order]
+
+def find_ohlc_file(ohlc_dir, symbol, timeframe=TIMEFRAME):
+    """USDJPY_H4.csv, USDJPYH4.csv, USDJPY.a_H4.csv or USDJPY.csv"""
+    for pattern in (f"{symbol}*{timeframe}*.csv", f"{symbol}.csv"):
+        matches = sorted(glob.glob(os.path.join(ohlc_dir, pattern)))
+        if matches:
+            return matches[0]
+    return None
+
+def load_bars(ohlc_dir, symbols=SYMBOLS_28, timeframe=TIMEFRAME):
+    """{symbol: (times, closes)} for every symbol that has a CSV"""
+    bars = {}
+    for symbol in symbols:
+        path = find_ohlc_file(ohlc_dir, symbol, timeframe)
+        if path:
+            bars[symbol] = read_ohlc_csv(path)
+    return bars
+
+def stack(bars, symbols):
+    """Left-aligned pairs x bars close matrix (NaN padded) so indicators run on each pair's own bars"""
+    length = max((len(bars[symbol][1]) for symbol in symbols if symbol in bars), default=0)
+    closes = np.full((len(symbols), length), np.nan)
+    for i, symbol in enumerate(symbols):
+        if symbol in bars:
+            closes[i, :len(bars[symbol][1])] = bars[symbol][1]
+    return closes
+
+def as_of(bars, symbols, values, timeline, shift=0):
+    """Sample pairs x own-bars values at each timeline time (the bar open at that time, minus shift bars)"""
+    result = np.full((len(symbols), len(timeline)), np.nan)
+    for i, symbol in enumerate(symbols):
+        if symbol not in bars:
+            continue
+        index = np.searchsorted(bars[symbol][0], timeline, side='right') - 1 - shift
+        valid = index >= 0
+        result[i, valid] = values[i, index[valid]]
+    return result
+
+# === Rankings and the derived fields ===
+def currency_matrices(symbols):
+    """currencies, base and quote incidence matrices (currencies x pairs)"""
+    present = {code for symbol in symbols for code in (symbol[:3], symbol[3:6])}
+    currencies = [code for code in CURRENCIES if code in present]
+    index = {code: i for i, code in enumerate(currencies)}
+    base = np.zeros((len(currencies), len(symbols)))
+    quote = np.zeros((len(currencies), len(symbols)))
+    for j, symbol in enumerate(symbols):
+        base[index[symbol[:3]], j] = 1
+        quote[index[symbol[3:6]], j] = 1
+    return currencies, base, quote
+
+def rank_descending(strength):
+    """currencies x time ranks, 1 = strongest; ties keep currency order like the EA's bubble sort"""
+    order = np.argsort(-strength, axis=0, kind='stable')
+    return np.argsort(order, axis=0, kind='stable') + 1
+
+def currency_ranks(rsi_values, cci_values, percent_b, base, quote):
+    """RSI, CCI, BB%B and overall currency ranks (currencies x time) from pairs x time indicator values"""
+    rsi_move = np.nan_to_num(rsi_values - 50.0)
+    cci_move = np.nan_to_num(cci_values)
+    rsi_strength = base @ rsi_move - quote @ rsi_move
+    cci_strength = base @ cci_move - quote @ cci_move
+    # BB%B: average of %B where the currency is the base, 1 - %B where it is the quote
+    valid = ~np.isnan(percent_b)
+    filled = np.where(valid, percent_b, 0.0)
+    count = base @ valid + quote @ valid
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bb_strength = np.where(count > 0, (base @ filled + quote @ (valid - filled)) / count, 0.0)
+
+    rsi_rank = rank_descending(rsi_strength)
+    cci_rank = rank_descending(cci_strength)
+    bb_rank = rank_descending(bb_strength)
+    # Lower average rank = better overall
+    overall_rank = rank_descending(-(rsi_rank + cci_rank + bb_rank) / 3.0)
+    return rsi_rank, cci_rank, bb_rank, overall_rank
+
+def ranking_score(strong, weak, currencies=8):
+    """CalculateRankingScore() of the EAs for integer arrays (5 currencies: CalculateMajorRankingScore())"""
+    if currencies == 5:
+        return np.select(
+            [(strong == 1) & (weak == 5), (strong == 1) & (weak == 4), (strong == 2) & (weak == 5),
+             (strong <= 2) & (weak >= 4), (strong <= 2) & (weak >= 3), (strong <= 3) & (weak >= 3), strong < weak],
+            [16.7, 15.0, 15.0, 13.0, 10.0, 6.0, 3.0], 0.0)
+    return np.select(
+        [(strong == 1) & (weak == 8), (strong == 1) & (weak == 7), (strong == 2) & (weak == 8),
+         (strong <= 2) & (weak >= 7), (strong <= 3) & (weak >= 6), (strong <= 4) & (weak >= 5), strong < weak],
+        [16.7, 15.0, 15.0, 13.0, 10.0, 6.0, 3.0], 0.0)
+
+def rsi_level_score(value):
+    """CalculateRSILevelScore() of the EA for integer arrays"""
+    distance = np.minimum(value, 100 - value)  # symmetric around 50 in integer steps
+    score = np.select([distance <= 20, distance <= 25, distance <= 30, distance <= 35, distance <= 40, distance <= 45],
+                      [50.0, 45.0, 40.0, 25.0, 15.0, 10.0], 5.0)
+    return np.where((value <= 0) | (value > 100), 0.0, score)
+
+def confidence(rank_pairs, rsi_int, currencies=8):
+    """Currency strength score (best direction, max 50) + RSI level score, rounded like MathRound"""
+    (rsi_b, rsi_q), (cci_b, cci_q), (bb_b, bb_q) = rank_pairs
+    buy = sum(ranking_score(b, q, currencies) for b, q in ((rsi_b, rsi_q), (cci_b, cci_q), (bb_b, bb_q)))
+    sell = sum(ranking_score(q, b, currencies) for b, q in ((rsi_b, rsi_q), (cci_b, cci_q), (bb_b, bb_q)))
+    total = np.minimum(np.maximum(buy, sell), 50.0) + rsi_level_score(rsi_int)
+    return np.floor(total + 0.5).astype(int)
+
+def signal(rsi_int):
+    return np.where(rsi_int < BUY_BELOW, "Buy", np.where(rsi_int > SELL_ABOVE, "Sell", "Stay"))
+
+def compute(bars, symbols=SYMBOLS_28, timeline=None):
+    """Recompute every forexData field for all pairs at every timeline time in one pass
+
+    timeline defaults to every bar time of any pair. Returns a dict of arrays
+    (pairs x time) plus "symbols", "times" and "currencies".
+    """
+    symbols = [symbol for symbol in symbols if symbol in bars]
+    if timeline is None:
+        timeline = np.unique(np.concatenate([bars[symbol][0] for symbol in symbols]))
+    closes = stack(bars, symbols)
+    # RSI and %B use the current bar (0), CCI the last closed one (1), as in the EA
+    rsi_values = as_of(bars, symbols, rsi(closes), timeline)
+    cci_values = as_of(bars, symbols, cci(closes), timeline, shift=1)
+    percent_b = as_of(bars, symbols, bollinger_percent_b(closes), timeline)
+
+    currencies, base, quote = currency_matrices(symbols)
+    ranks = currency_ranks(rsi_values, cci_values, percent_b, base, quote)
+    base_index = base.argmax(axis=0)
+    quote_index = quote.argmax(axis=0)
+    rank_pairs = [(rank[base_index], rank[quote_index]) for rank in ranks]
+
+    # RSI_breakout is MathRound(RSI); the EA writes 50 when it has no value
+    rsi_int = np.where(np.isnan(rsi_values), 50, np.floor(np.nan_to_num(rsi_values) + 0.5)).astype(int)
+    return {
+        "symbols": symbols,
+        "times": timeline,
+        "currencies": currencies,
+        "ranks": rank_pairs,
+        "RSI_breakout": rsi_int,
+        "Confidence": confidence(rank_pairs[:3], rsi_int, len(currencies)),
+        "Signal": signal(rsi_int),
+    }
+
+def to_forex_data(result, index=-1):
+    """forexData dict (EA field order) for one timeline position"""
+    forex_data = {}
+    for i, symbol in enumerate(result["symbols"]):
+        values = {}
+        for field, (base_rank, quote_rank) in zip(RANK_FIELDS, result["ranks"]):
+            values[field] = f"{base_rank[i, index]}/{quote_rank[i, index]}"
+        values["RSI_breakout"] = int(result["RSI_breakout"][i, index])
+        values["Confidence"] = int(result["Confidence"][i, index])
+        values["Signal"] = str(result["Signal"][i, index])
+        # EA order: the three ranks, RSI_breakout, Overall_Ranking, Confidence, Signal
+        forex_data[symbol] = {key: values[key] for key in
+                              (*RANK_FIELDS[:3], "RSI_breakout", RANK_FIELDS[3], "Confidence", "Signal")}
+    return forex_data
+
+# === Parity with the EA's own output ===
+def derive_from_payload(forex_data):
+    """Recompute Overall_Ranking, Confidence and Signal from an EA file's own ranks and RSI"""
+    symbols = [pair for pair in forex_data if pair[:3] in CURRENCIES and pair[3:6] in CURRENCIES]
+    currencies, base, quote = currency_matrices(symbols)
+    index = {code: i for i, code in enumerate(currencies)}
+    ranks = []
+    for field in RANK_FIELDS[:3]:
+        # Per-currency ranks back out of the "base/quote" strings
+        rank = np.zeros((len(currencies), 1), dtype=int)
+        for pair in symbols:
+            left, right = (int(part) for part in str(forex_data[pair][field]).split("/"))
+            rank[index[pair[:3]], 0], rank[index[pair[3:6]], 0] = left, right
+        ranks.append(rank)
+    overall = rank_descending(-(ranks[0] + ranks[1] + ranks[2]) / 3.0)
+    base_index, quote_index = base.argmax(axis=0), quote.argmax(axis=0)
+    rank_pairs = [(rank[base_index], rank[quote_index]) for rank in (*ranks, overall)]
+    rsi_int = np.array([[int(forex_data[pair]["RSI_breakout"])] for pair in symbols])
+    return to_forex_data({"symbols": symbols, "ranks": rank_pairs, "RSI_breakout": rsi_int,
+                          "Confidence": confidence(rank_pairs[:3], rsi_int, len(currencies)), "Signal": signal(rsi_int)})
+
+def compare(expected, actual, fields=None):
+    """[(pair, field, expected, actual)] for every differing value"""
+    mismatches = []
+    for pair, values in expected.items():
+        for field in fields or values:
+            if field not in values:
+                continue
+            got = (actual.get(pair) or {}).get(field)
+            if str(got) != str(values[field]):
+                mismatches.append((pair, field, values[field], got))
+    return mismatches
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute the EA's forexData fields from OHLC CSV exports")
+    commands = parser.add_subparsers(dest="command", required=True)
+    snapshot_parser = commands.add_parser("snapshot", help="forexData at one time (default: the last bar)")
+    snapshot_parser.add_argument("ohlc_dir")
+    snapshot_parser.add_argument("--pairs", choices=sorted(PAIR_SETS), default="28pair")
+    snapshot_parser.add_argument("--at", help="ISO time, e.g. 2025-03-04T12:00")
+    snapshot_parser.add_argument("--out", help="write fx_signals-style JSON here instead of printing it")
+    history_parser = commands.add_parser("history", help="every bar into the history store")
+    history_parser.add_argument("ohlc_dir")
+    history_parser.add_argument("--pairs", choices=sorted(PAIR_SETS), default="28pair")
+    history_parser.add_argument("--source", help="history source name (default: recomputed_<pairs>)")
+    history_parser.add_argument("--dir", default=HISTORY_DIR, help="history folder")
+    parity_parser = commands.add_parser("parity", help="compare with EA output files")
+    parity_parser.add_argument("files", nargs="+", help="fx_signals_*.json written by the EA")
+    parity_parser.add_argument("--ohlc-dir", help="also recompute everything from bars at --at")
+    parity_parser.add_argument("--at", help="bar time the EA files were written at")
+    args = parser.parse_args(argv)
+
+    if args.command == "parity":
+        failed = 0
+        for path in args.files:
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                expected = json.load(f)["forexData"]
+            derived = ["Overall_Ranking", "Confidence", "Signal"]
+            mismatches = compare(expected, derive_from_payload(expected), derived)
+            if args.ohlc_dir:
+                bars = load_bars(args.ohlc_dir, list(expected))
+                timeline = np.array([np.datetime64(args.at, 's')]) if args.at else None
+                result = compute(bars, list(expected), timeline)
+                mismatches += compare(expected, to_forex_data(result), ["RSI_breakout", *RANK_FIELDS[:3]])
+            failed += bool(mismatches)
+            print(f"{'❌' if mismatches else '✅'} {path}: {len(mismatches)} mismatch(es)")
+            for pair, field, want, got in mismatches[:20]:
+                print(f"   {pair} {field}: EA {want} / engine {got}")
+        return 1 if failed else 0
+
+    started = datetime.now()
+    symbols = PAIR_SETS[args.pairs]
+    bars = load_bars(args.ohlc_dir, symbols)
+    if not bars:
+        print(f"❌ No {TIMEFRAME} CSV files found in {args.ohlc_dir}")
+        return 1
+    timeline = np.array([np.datetime64(args.at, 's')]) if getattr(args, "at", None) else None
+    result = compute(bars, symbols, timeline)
+    seconds = (datetime.now() - started).total_seconds()
+
+    if args.command == "snapshot":
+        payload = {"forexData": to_forex_data(result)}
+        if not args.out:
+            print(json.dumps(payload, indent=2))  # stdout stays plain JSON
+            return 0
+        atomic_write_json(args.out, payload, indent=2)
+        print(f"✅ {len(result['symbols'])} pairs at {result['times'][-1]} written to {args.out} ({seconds:.2f}s)")
+        return 0
+
+    print(f"⚙️ {len(result['symbols'])} pairs x {len(result['times'])} bars computed in {seconds:.2f}s")
+
+    source = args.source or f"recomputed_{args.pairs}"
+    snapshots = []
+    for j, moment in enumerate(result["times"]):
+        timestamp = moment.astype(datetime)
+        payload = {"forexData": to_forex_data(result, j)}
+        snapshots.append((timestamp, source, None, snapshot_rows(payload, source, timestamp)))
+    rows = append_snapshots(snapshots, args.dir)
+    print(f"✅ {len(snapshots)} snapshots ({rows} rows) stored as '{source}'")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,49 @@
 import os
+import re
+import csv
 import time
 import glob
+import shutil
+import codecs
+import zipfile
+import tempfile
+import posixpath
+from xml.sax.saxutils import escape
 from openpyxl import load_workbook
+from openpyxl.utils import column_index_from_string
 from datetime import datetime
+from encoding_utils import read_bytes, iter_decodings, detect_encoding, SNIFF_BYTES
+from safe_io import atomic_open
+from log_tailer import LogTailer
+from terminal_config import ConfigReloader, CONFIG_FILE
+from pipeline_metrics import observe, inc, log_event
 
 # === CONFIGURATION ===
+# Built-in defaults; terminals.toml (see terminal_config.py) replaces them when present
 LOG_FOLDER = r"C:\Users\MT4ver2-e18-AZIzrF0D\AppData\Roaming\MetaQuotes\Terminal\7E59B46FD773C6FE7B889FC92951284D\MQL5\Files"
 EXCEL_FILE = r"G:\共有ドライブ\Trading_Signal\Hourly_Signal_28pair.xlsx"
 SHEET_NAME = "parameters"
 COLUMN = "A"
+# "excel" rewrites only the parameters sheet inside the .xlsx (the workbook is not
+# loaded), "csv" writes a sidecar CSV the sheet can link to, "both" does both
+EXPORT_MODE = "excel"
+CSV_FILE = os.path.splitext(EXCEL_FILE)[0] + f"_{SHEET_NAME}.csv"
+# Remembers the current log and byte offset so each run only reads appended bytes
+TAIL_STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "log_tail_state.json")
+LOG_TAILER = LogTailer(LOG_FOLDER, "*.log", TAIL_STATE_FILE)
+EXPORT_MINUTE = 4
+# One entry per terminal that has an Excel file: {"name", "excel_file", "csv_file", "tailer"}
+EXPORT_TARGETS = [{"name": "main", "excel_file": EXCEL_FILE, "csv_file": CSV_FILE, "tailer": LOG_TAILER}]
+CONFIG_RELOADER = ConfigReloader(CONFIG_FILE)
 
 # === FUNCTION: Read file with encoding fallback ===
 def read_file_with_fallback_encoding(path):
     encodings = ['utf-8', 'utf-16', 'cp932', 'shift_jis', 'iso-8859-1']
-    for enc in encodings:
-        try:
-            with open(path, 'r', encoding=enc) as f:
-                return f.read().strip()
-        except UnicodeDecodeError:
-            continue
-    raise ValueError("Unable to decode file with common encodings.")
+    raw = read_bytes(path)
+    decoded = next(iter_decodings(raw, encodings), None)
+    if decoded is None:
+        raise ValueError("Unable to decode file with common encodings.")
+    return decoded[1].lstrip('\ufeff').strip()
 
 # === FUNCTION: Get latest .log file ===
 def get_latest_log_file():
@@ -28,45 +52,276 @@ def get_latest_log_file():
         return None
     return max(log_files, key=os.path.getmtime)
 
-# === FUNCTION: Clear and write to Excel ===
-def append_log_to_excel(log_path):
-    content = read_file_with_fallback_encoding(log_path)
-    lines = content.splitlines()
-    
-    wb = load_workbook(EXCEL_FILE)
+# === FUNCTION: Decode a log file line by line ===
+def iter_decoded_lines(f, encoding):
+    if encoding in ('utf-8', 'utf-8-sig'):
+        # Byte-oriented: decode per line so a stray cp932 line does not spoil the rest
+        for raw_line in f:
+            for enc in ('utf-8', 'cp932', 'iso-8859-1'):
+                try:
+                    yield raw_line.decode(enc)
+                    break
+                except UnicodeDecodeError:
+                    continue
+    else:
+        yield from codecs.getreader(encoding)(f, errors='replace')
+
+# === FUNCTION: Stream log lines without loading the whole file ===
+def iter_log_lines(path):
+    with open(path, 'rb') as f:
+        encoding = detect_encoding(f.read(SNIFF_BYTES))
+        f.seek(0)
+        if encoding is None:
+            # Unusual encoding - fall back to the trial decode on the whole file
+            yield from read_file_with_fallback_encoding(path).splitlines()
+            return
+
+        # Same result as content.strip().splitlines(): no blank lines at either end
+        started = False
+        blank_lines = []
+        for line in iter_decoded_lines(f, encoding):
+            line = line.rstrip('\r\n').lstrip('\ufeff')
+            if not line.strip():
+                if started:
+                    blank_lines.append(line)
+                continue
+            if not started:
+                line = line.lstrip()
+                started = True
+            yield from blank_lines
+            blank_lines = []
+            yield line
+
+# === FUNCTION: Find the parameters sheet's XML part inside the .xlsx zip ===
+def find_sheet_part(archive, sheet_name):
+    workbook = archive.read("xl/workbook.xml").decode("utf-8")
+    for attributes in re.findall(r"<(?:\w+:)?sheet\b([^>]*)/?>", workbook):
+        name = re.search(r'\bname="([^"]*)"', attributes)
+        rel_id = re.search(r'\br:id="([^"]*)"', attributes) or re.search(r'\bid="([^"]*)"', attributes)
+        if name and rel_id and name.group(1) == escape(sheet_name, {'"': "&quot;"}):
+            break
+    else:
+        return None
+    rels = archive.read("xl/_rels/workbook.xml.rels").decode("utf-8")
+    for relationship in re.findall(r"<(?:\w+:)?Relationship\b([^>]*)/?>", rels):
+        if f'Id="{rel_id.group(1)}"' in relationship:
+            target = re.search(r'Target="([^"]*)"', relationship).group(1)
+            return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+    return None
+
+# XML 1.0 cannot hold these; openpyxl refuses them too
+ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+def sheet_row_xml(row, column, line):
+    """One <row> with an inline-string cell, so sharedStrings.xml never needs rewriting"""
+    text = escape(ILLEGAL_XML_CHARS.sub("", line))
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    return f'<row r="{row}"><c r="{column}{row}" t="inlineStr"><is><t{space}>{text}</t></is></c></row>'
+
+# === FUNCTION: Write lines to the parameters sheet, rewriting only that sheet ===
+def write_lines_to_excel(lines, excel_file=None):
+    """Stream the lines into the parameters sheet's XML and copy every other part unchanged
+
+    The workbook is never loaded: the other sheets, styles and charts are copied
+    byte for byte. A parameters sheet holding cells outside COLUMN goes through
+    openpyxl instead, so nothing in it is lost.
+    """
+    excel_file = excel_file or EXCEL_FILE
+    with zipfile.ZipFile(excel_file) as archive:
+        part = find_sheet_part(archive, SHEET_NAME)
+        if part is None:
+            print(f"❌ Sheet '{SHEET_NAME}' not found in Excel file!")
+            return None
+        sheet = archive.read(part).decode("utf-8")
+    data = re.search(r"<sheetData\s*/>|<sheetData\b[^>]*>.*?</sheetData>", sheet, re.S)
+    other_columns = {ref for ref in re.findall(r'<c\b[^>]*\br="([A-Z]+)\d+"', sheet) if ref != COLUMN}
+    if data is None or other_columns or "<f" in data.group(0) or "<mergeCell " in sheet:
+        return write_lines_to_workbook(lines, excel_file)
+
+    # Build the file locally, then copy it to the shared drive in one sequential write
+    fd, temp_path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(excel_file) as source, \
+                zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as target:
+            for item in source.infolist():
+                if item.filename == part:
+                    continue
+                content = source.read(item)
+                if item.filename == "xl/workbook.xml":
+                    # Formulas elsewhere that read the log lines recalculate on open
+                    content = re.sub(rb"<calcPr\b(?![^>]*fullCalcOnLoad)", b'<calcPr fullCalcOnLoad="1"', content)
+                target.writestr(item, content)
+            head = re.sub(r"<dimension\b[^>]*/>", "", sheet[:data.start()])
+            info = zipfile.ZipInfo(part, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with target.open(info, "w") as f:
+                f.write(head.encode("utf-8") + b"<sheetData>")
+                count = 0
+                for count, line in enumerate(lines, start=1):
+                    f.write(sheet_row_xml(count, COLUMN, line).encode("utf-8"))
+                f.write(b"</sheetData>" + sheet[data.end():].encode("utf-8"))
+        with open(temp_path, 'rb') as src, atomic_open(excel_file, 'wb') as dest:
+            shutil.copyfileobj(src, dest, 1024 * 1024)
+    finally:
+        os.remove(temp_path)
+    return count
+
+# === FUNCTION: Write lines through openpyxl (parameters sheet with other content) ===
+def write_lines_to_workbook(lines, excel_file):
+    wb = load_workbook(excel_file)
     if SHEET_NAME not in wb.sheetnames:
         print(f"❌ Sheet '{SHEET_NAME}' not found in Excel file!")
-        return
+        return None
     ws = wb[SHEET_NAME]
+    column = column_index_from_string(COLUMN)
+
+    # Overwrite column A in place, then clear only rows left over from a longer log
+    count = 0
+    for count, line in enumerate(lines, start=1):
+        ws.cell(row=count, column=column, value=ILLEGAL_XML_CHARS.sub("", line))
+    for (cell,) in ws.iter_rows(min_row=count + 1, max_row=ws.max_row, min_col=column, max_col=column):
+        cell.value = None
 
-    # Clear all data in column A
-    max_row = ws.max_row
-    for row in range(1, max_row + 1):
-        ws[f"{COLUMN}{row}"] = None
+    # Build the file locally, then copy it to the shared drive in one sequential write
+    fd, temp_path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        wb.save(temp_path)
+        with open(temp_path, 'rb') as src, atomic_open(excel_file, 'wb') as dest:
+            shutil.copyfileobj(src, dest, 1024 * 1024)
+    finally:
+        os.remove(temp_path)
+    return count
 
-    # Write each line to column A
-    row = 1
-    for line in lines:
-        ws[f"{COLUMN}{row}"] = line
-        row += 1
+# === FUNCTION: Write lines to the sidecar CSV ===
+def write_lines_to_csv(lines, csv_file=None):
+    count = 0
+    with atomic_open(csv_file or CSV_FILE, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        for line in lines:
+            writer.writerow([line])
+            count += 1
+    return count
+
+# === FUNCTION: Clear and write to Excel ===
+def append_log_to_excel(log_path):
+    export_lines(iter_log_lines(log_path))
+
+# === FUNCTION: Export only when the newest log has new lines ===
+def export_latest_log(target=None):
+    target = target or EXPORT_TARGETS[0]
+    tailer = target["tailer"]
+    start = time.perf_counter()
+    result = tailer.poll()
+    if result is None:
+        print("⚠️ No log file found.")
+        return
+    path, new_lines, reset = result
+    read_time = time.perf_counter() - start
+    observe("stage_seconds", read_time, stage="log_tail", file=target["name"])
+    if not new_lines and not reset:
+        print(f"⏭️ No new lines in {os.path.basename(path)} ({read_time * 1000:.0f} ms) - skipping export")
+        return
+
+    # Same trimming as content.strip().splitlines() on the whole file
+    lines = tailer.all_lines()
+    first = next((i for i, line in enumerate(lines) if line.strip()), len(lines))
+    last = next((i for i in range(len(lines) - 1, -1, -1) if lines[i].strip()), -1)
+    trimmed = [line.lstrip('\ufeff') for line in lines[first:last + 1]]
+    if trimmed:
+        trimmed[0] = trimmed[0].lstrip()
+        trimmed[-1] = trimmed[-1].rstrip()
+
+    source = "new file" if reset else f"{len(new_lines)} new lines"
+    print(f"📖 {os.path.basename(path)}: {source}, read in {read_time * 1000:.0f} ms")
+    export_lines(trimmed, target)
+
+# === FUNCTION: Export every configured terminal ===
+def export_all_logs():
+    for target in EXPORT_TARGETS:
+        if len(EXPORT_TARGETS) > 1:
+            print(f"🖥️ Terminal {target['name']}")
+        try:
+            export_latest_log(target)
+        except Exception as e:
+            # One terminal's locked workbook must not stop the others
+            print(f"❌ Export failed for {target['name']}: {e}")
+
+# === FUNCTION: Write lines to the configured targets with timings ===
+def export_lines(lines, target=None):
+    target = target or EXPORT_TARGETS[0]
+    timings = {}
+    start = time.perf_counter()
+    if EXPORT_MODE == "both":
+        lines = list(lines)
+        timings["read"] = time.perf_counter() - start
+
+    count = None
+    if EXPORT_MODE in ("csv", "both"):
+        step = time.perf_counter()
+        count = write_lines_to_csv(lines, target["csv_file"])
+        timings["csv"] = time.perf_counter() - step
+    if EXPORT_MODE in ("excel", "both"):
+        step = time.perf_counter()
+        count = write_lines_to_excel(lines, target["excel_file"])
+        timings["excel"] = time.perf_counter() - step
+        if count is None:
+            return
+
+    total = time.perf_counter() - start
+    detail = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items())
+    for name, seconds in timings.items():
+        observe("stage_seconds", seconds, stage=f"export_{name}", file=target["name"])
+    inc("log_lines_exported_total", count or 0, help_text="Lines written to the parameters sheet/CSV", file=target["name"])
+    log_event("log_exported", file=target["name"], lines=count, seconds=round(total, 3))
+    print(f"✅ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} — {count} lines saved "
+          f"in {total * 1000:.0f} ms ({detail})")
+
+# === FUNCTION: Switch to the terminals from a loaded config ===
+def apply_config(config):
+    global EXPORT_MODE, EXPORT_MINUTE, EXPORT_TARGETS
+    settings = config["signal_export"]
+    EXPORT_MODE = settings.get("export_mode", EXPORT_MODE)
+    EXPORT_MINUTE = settings.get("minute", EXPORT_MINUTE)
+
+    # Keep tailers whose folder is unchanged so they do not re-read the whole log
+    tailers = {(target["tailer"].folder, target["tailer"].pattern): target["tailer"] for target in EXPORT_TARGETS}
+    targets = []
+    for terminal in config["terminals"]:
+        if not terminal["excel_file"]:
+            continue
+        key = (terminal["logs_dir"], terminal["log_pattern"])
+        state_path = os.path.join(os.path.dirname(TAIL_STATE_FILE), f"log_tail_state_{terminal['name']}.json")
+        targets.append({
+            "name": terminal["name"],
+            "excel_file": terminal["excel_file"],
+            "csv_file": terminal["csv_file"] or os.path.splitext(terminal["excel_file"])[0] + f"_{SHEET_NAME}.csv",
+            "tailer": tailers.get(key) or LogTailer(*key, state_path)
+        })
+    if not targets:
+        print("⚠️ No terminal in the config has an excel_file - keeping previous targets")
+        return
+    EXPORT_TARGETS = targets
+    print(f"🔧 Exporting logs for: {', '.join(target['name'] for target in EXPORT_TARGETS)}")
 
-    wb.save(EXCEL_FILE)
-    print(f"✅ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} — {len(lines)} lines saved")
+def reload_config(force=False):
+    config = CONFIG_RELOADER.check(force)
+    if config is not None:
+        apply_config(config)
 
 # === MAIN LOOP: Run at 04 minute every hour ===
-def run_at_minute(minute=4):
-    print(f"🕒 Waiting for minute {minute:02d} of each hour to run...\n")
+def run_at_minute(minute=None):
+    reload_config(force=True)
+    print(f"🕒 Waiting for minute {(minute if minute is not None else EXPORT_MINUTE):02d} of each hour to run...\n")
     last_processed_hour = None
 
     while True:
+        reload_config()
         now = datetime.now()
-        if now.minute == minute and now.hour != last_processed_hour:
+        if now.minute == (minute if minute is not None else EXPORT_MINUTE) and now.hour != last_processed_hour:
             print(f"🔄 Processing log at {now.strftime('%Y-%m-%d %H:%M')}...")
-            latest_file = get_latest_log_file()
-            if latest_file:
-                append_log_to_excel(latest_file)
-            else:
-                print("⚠️ No log file found.")
+            export_all_logs()
             last_processed_hour = now.hour
             time.sleep(60)  # wait 1 minute to avoid double-run in same minute
 
@@ -74,4 +329,4 @@ def run_at_minute(minute=4):
 
 # === ENTRY POINT ===
 if __name__ == "__main__":
-    run_at_minute(minute=4)
+    run_at_minute()
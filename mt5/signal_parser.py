@@ -0,0 +1,205 @@
+import re
+from array import array
+
+# Fields the EA writes for every pair, in output order
+RANK_FIELDS = (
+    "Currency_Strength_Rank_all_pair",
+    "CCI_Currency_Strength_Rank_all_pair",
+    "BB_percent_ranking",
+    "Overall_Ranking",
+)
+INT_FIELDS = ("RSI_breakout", "Confidence")
+TEXT_FIELDS = ("Signal", "TRIGGER", "TRIGGER_REASON")
+FIELDS = (
+    "Currency_Strength_Rank_all_pair",
+    "CCI_Currency_Strength_Rank_all_pair",
+    "BB_percent_ranking",
+    "RSI_breakout",
+    "Overall_Ranking",
+    "Confidence",
+    "Signal",
+    "TRIGGER",
+    "TRIGGER_REASON",
+)
+
+# Stored in the int columns when a value is missing or unparseable
+MISSING = -1
+
+# [USDJPY][Overall_Ranking]=2/4
+LOG_LINE_PATTERN = re.compile(r"^\s*\[([^\]]+)\]\[([^\]]+)\]=(.*?)\s*$")
+
+def parse_rank(value):
+    """'2/4' -> (2, 4); anything else -> (MISSING, MISSING)"""
+    if isinstance(value, str):
+        left, sep, right = value.partition("/")
+        if sep:
+            try:
+                return int(left), int(right)
+            except ValueError:
+                pass
+    return MISSING, MISSING
+
+def parse_int(value):
+    """Int from an int, float or numeric string; MISSING otherwise"""
+    if isinstance(value, bool):
+        return MISSING
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return MISSING
+
+class PairSignal:
+    """One pair's signals with ranks already split into integers"""
+    __slots__ = ("pair",
+                 "currency_rank", "cci_rank", "bb_rank", "overall_rank",
+                 "rsi_breakout", "confidence",
+                 "signal", "trigger", "trigger_reason")
+
+    def __init__(self, pair, currency_rank, cci_rank, bb_rank, overall_rank,
+                 rsi_breakout, confidence, signal, trigger, trigger_reason):
+        self.pair = pair
+        self.currency_rank = currency_rank
+        self.cci_rank = cci_rank
+        self.bb_rank = bb_rank
+        self.overall_rank = overall_rank
+        self.rsi_breakout = rsi_breakout
+        self.confidence = confidence
+        self.signal = signal
+        self.trigger = trigger
+        self.trigger_reason = trigger_reason
+
+    def __repr__(self):
+        return (f"PairSignal({self.pair}, overall={self.overall_rank}, "
+                f"rsi={self.rsi_breakout}, confidence={self.confidence}, signal={self.signal})")
+
+class SignalTable:
+    """Column-oriented signals for many pairs, indexed by pair name
+
+    Ranks are held as two int arrays per field (left and right of the '/'),
+    RSI and Confidence as int arrays, and text fields as plain lists. Fields
+    the parser does not know about are kept in `extra` so nothing is lost.
+    """
+
+    def __init__(self):
+        self.pairs = []
+        self.index = {}
+        self.rank_left = {field: array('i') for field in RANK_FIELDS}
+        self.rank_right = {field: array('i') for field in RANK_FIELDS}
+        self.ints = {field: array('i') for field in INT_FIELDS}
+        self.texts = {field: [] for field in TEXT_FIELDS}
+        self.present = {}  # pair -> fields seen, so to_forex_data() reproduces the input
+        self.extra = {}    # (pair, field) -> raw value
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def __contains__(self, pair):
+        return pair in self.index
+
+    def _row_for(self, pair):
+        row = self.index.get(pair)
+        if row is None:
+            row = len(self.pairs)
+            self.index[pair] = row
+            self.pairs.append(pair)
+            for field in RANK_FIELDS:
+                self.rank_left[field].append(MISSING)
+                self.rank_right[field].append(MISSING)
+            for field in INT_FIELDS:
+                self.ints[field].append(MISSING)
+            for field in TEXT_FIELDS:
+                self.texts[field].append(None)
+            self.present[pair] = []
+        return row
+
+    def set(self, pair, field, value):
+        """Store one raw value (string from the log or JSON value), parsing it by field type"""
+        row = self._row_for(pair)
+        if field not in self.present[pair]:
+            self.present[pair].append(field)
+        if field in self.rank_left:
+            self.rank_left[field][row], self.rank_right[field][row] = parse_rank(value)
+        elif field in self.ints:
+            self.ints[field][row] = parse_int(value)
+        elif field in self.texts:
+            self.texts[field][row] = None if value is None else str(value)
+        else:
+            self.extra[(pair, field)] = value
+
+    def rank(self, pair, field):
+        """(left, right) for a rank field"""
+        row = self.index[pair]
+        return self.rank_left[field][row], self.rank_right[field][row]
+
+    def get(self, pair, field):
+        """Parsed value: a (left, right) tuple for ranks, int for RSI/Confidence, str otherwise"""
+        row = self.index[pair]
+        if field in self.rank_left:
+            return self.rank_left[field][row], self.rank_right[field][row]
+        if field in self.ints:
+            return self.ints[field][row]
+        if field in self.texts:
+            return self.texts[field][row]
+        return self.extra.get((pair, field))
+
+    def column(self, field):
+        """Whole column: an int array, a list of strings, or (left, right) arrays for ranks"""
+        if field in self.rank_left:
+            return self.rank_left[field], self.rank_right[field]
+        if field in self.ints:
+            return self.ints[field]
+        return self.texts[field]
+
+    def row(self, pair):
+        """PairSignal record for one pair"""
+        row = self.index[pair]
+        left, right = self.rank_left, self.rank_right
+        return PairSignal(
+            pair,
+            (left[RANK_FIELDS[0]][row], right[RANK_FIELDS[0]][row]),
+            (left[RANK_FIELDS[1]][row], right[RANK_FIELDS[1]][row]),
+            (left[RANK_FIELDS[2]][row], right[RANK_FIELDS[2]][row]),
+            (left[RANK_FIELDS[3]][row], right[RANK_FIELDS[3]][row]),
+            self.ints["RSI_breakout"][row],
+            self.ints["Confidence"][row],
+            self.texts["Signal"][row],
+            self.texts["TRIGGER"][row],
+            self.texts["TRIGGER_REASON"][row],
+        )
+
+    def __iter__(self):
+        return (self.row(pair) for pair in self.pairs)
+
+    def format_value(self, pair, field):
+        """Value in the EA's JSON form ('2/4' strings for ranks)"""
+        value = self.get(pair, field)
+        if field in self.rank_left:
+            return None if value[0] == MISSING else f"{value[0]}/{value[1]}"
+        if field in self.ints:
+            return None if value == MISSING else value
+        return value
+
+    def to_forex_data(self):
+        """Back to {pair: {field: value}} as in the published JSON"""
+        return {pair: {field: self.format_value(pair, field) for field in self.present[pair]}
+                for pair in self.pairs}
+
+def parse_log_lines(lines):
+    """Build a SignalTable from '[SYMBOL][field]=value' lines; other lines are ignored"""
+    table = SignalTable()
+    for line in lines:
+        match = LOG_LINE_PATTERN.match(line)
+        if match:
+            pair, field, value = match.groups()
+            table.set(pair, field, value)
+    return table
+
+def parse_forex_data(data):
+    """Build a SignalTable from a parsed fx_signals JSON payload"""
+    table = SignalTable()
+    for pair, values in (data.get('forexData') or {}).items():
+        for field, value in values.items():
+            table.set(pair, field, value)
+    return table
@@ -0,0 +1,230 @@
+import os
+import re
+import sys
+import json
+import time
+from datetime import datetime
+from change_detector import hash_payload
+from safe_io import atomic_write_json
+
+# Bad pairs are listed per file in mt5/quarantine/<name>.json with the reasons
+QUARANTINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quarantine")
+
+# The EA ranks every currency of the file 1 (strongest) .. N, written as
+# "<base rank>/<quote rank>"; N is the number of currencies in the file
+RANK_FIELDS = ("Currency_Strength_Rank_all_pair", "CCI_Currency_Strength_Rank_all_pair",
+               "BB_percent_ranking", "Overall_Ranking")
+# Fallback N when the symbols are not plain 6-letter pairs
+MAX_CURRENCIES = 8
+
+# field -> (kind, required, options)
+SCHEMA = {
+    "Currency_Strength_Rank_all_pair": ("rank", True, None),
+    "CCI_Currency_Strength_Rank_all_pair": ("rank", True, None),
+    "BB_percent_ranking": ("rank", True, None),
+    "Overall_Ranking": ("rank", True, None),
+    "RSI_breakout": ("int", True, (0, 100)),
+    "Confidence": ("int", True, (0, 100)),
+    "Signal": ("choice", False, ("Buy", "Sell", "Stay")),
+    "TRIGGER": ("choice", False, ("ON", "OFF")),
+    "TRIGGER_REASON": ("text", False, None),
+}
+
+RANK_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+INT_PATTERN = re.compile(r"^\s*[+-]?\d+(\.0*)?\s*$")
+SYMBOL_PATTERN = re.compile(r"^([A-Z]{3})([A-Z]{3})")
+
+class Invalid(ValueError):
+    """One field of a pair failed its check"""
+
+# === Field checks: each returns the normalised value or raises Invalid ===
+def compile_rank(options):
+    def check(value, max_rank):
+        match = RANK_PATTERN.match(value) if isinstance(value, str) else None
+        if not match:
+            raise Invalid(f"expected 'a/b', got {value!r}")
+        base, quote = int(match.group(1)), int(match.group(2))
+        if not (1 <= base <= max_rank and 1 <= quote <= max_rank):
+            raise Invalid(f"{value!r} outside 1..{max_rank}")
+        if base == quote:
+            raise Invalid(f"{value!r} gives both currencies the same rank")
+        return f"{base}/{quote}"
+    return check
+
+def compile_int(options):
+    low, high = options
+    def check(value, max_rank):
+        if isinstance(value, bool):
+            raise Invalid(f"expected an integer, got {value!r}")
+        if isinstance(value, str) and INT_PATTERN.match(value):
+            value = int(float(value))  # "60" from a hand-edited or older file
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if not isinstance(value, int):
+            raise Invalid(f"expected an integer, got {value!r}")
+        if not low <= value <= high:
+            raise Invalid(f"{value} outside {low}..{high}")
+        return value
+    return check
+
+def compile_choice(options):
+    canonical = {option.upper(): option for option in options}
+    def check(value, max_rank):
+        option = canonical.get(value.strip().upper()) if isinstance(value, str) else None
+        if option is None:
+            raise Invalid(f"expected one of {'/'.join(options)}, got {value!r}")
+        return option
+    return check
+
+def compile_text(options):
+    def check(value, max_rank):
+        if not isinstance(value, str):
+            raise Invalid(f"expected text, got {value!r}")
+        return value.strip()
+    return check
+
+COMPILERS = {"rank": compile_rank, "int": compile_int, "choice": compile_choice, "text": compile_text}
+
+def compile_schema(schema=SCHEMA):
+    """[(field, required, check)] built once, so validating a pair is a loop of plain calls"""
+    return [(field, required, COMPILERS[kind](options)) for field, (kind, required, options) in schema.items()]
+
+COMPILED_SCHEMA = compile_schema()
+
+def validate_pair(values, max_rank, compiled=COMPILED_SCHEMA):
+    """Return (normalised values, reasons); reasons is empty for a good pair"""
+    if not isinstance(values, dict):
+        return None, [f"expected an object, got {type(values).__name__}"]
+    normalised = dict(values)  # unknown fields pass through untouched
+    reasons = []
+    for field, required, check in compiled:
+        if field not in values:
+            if required:
+                reasons.append(f"{field}: missing")
+            continue
+        try:
+            normalised[field] = check(values[field], max_rank)
+        except Invalid as e:
+            reasons.append(f"{field}: {e}")
+    return normalised, reasons
+
+def split_symbol(pair):
+    """'EURUSD' -> ('EUR', 'USD'); None for symbols that are not plain pairs"""
+    match = SYMBOL_PATTERN.match(pair)
+    return match.groups() if match else None
+
+def count_currencies(pairs):
+    currencies = set()
+    for pair in pairs:
+        symbol = split_symbol(pair)
+        if symbol is None:
+            return MAX_CURRENCIES
+        currencies.update(symbol)
+    return len(currencies) or MAX_CURRENCIES
+
+def check_rank_consistency(pairs):
+    """Pairs whose ranks disagree with the other pairs sharing a currency
+
+    Every pair carries the rank of both its currencies, so USD's rank must be the
+    same in USDJPY, EURUSD, ... The value most pairs agree on is taken as right.
+    """
+    reasons = {}
+    for field in RANK_FIELDS:
+        votes = {}
+        for pair, values in pairs.items():
+            symbol = split_symbol(pair)
+            if symbol is None or field not in values:
+                continue
+            for currency, rank in zip(symbol, values[field].split("/")):
+                counts = votes.setdefault(currency, {})
+                counts[rank] = counts.get(rank, 0) + 1
+        majority = {currency: max(counts, key=counts.get) for currency, counts in votes.items()
+                    if len(counts) > 1}
+        if not majority:
+            continue
+        for pair, values in pairs.items():
+            symbol = split_symbol(pair)
+            if symbol is None or field not in values:
+                continue
+            for currency, rank in zip(symbol, values[field].split("/")):
+                if currency in majority and rank != majority[currency]:
+                    reasons.setdefault(pair, []).append(
+                        f"{field}: {currency} ranked {rank} here but {majority[currency]} in other pairs")
+    return reasons
+
+def validate_payload(data, known_good=None):
+    """Validate and normalise every pair of a parsed signal payload
+
+    known_good is {pair: digest} of pairs that already passed (the last published
+    digests); a pair with the same digest skips the field checks. Returns
+    (data with only good pairs, {pair: {"reasons", "values"}}, pair digests,
+    pairs fully checked). The digests cover good pairs published as received,
+    for compute_digests() to reuse; with no known_good nothing is hashed.
+    """
+    pairs = data.get('forexData')
+    if not isinstance(pairs, dict):
+        return None, {}, {}, 0
+    max_rank = count_currencies(pairs)
+    good = {}
+    quarantined = {}
+    digests = {}
+    checked = 0
+    for pair, values in pairs.items():
+        digest = None
+        if known_good and pair in known_good and isinstance(values, dict):
+            digest = hash_payload(values)
+            if digest == known_good[pair]:
+                good[pair] = values
+                digests[pair] = digest
+                continue
+        checked += 1
+        normalised, reasons = validate_pair(values, max_rank)
+        if reasons:
+            quarantined[pair] = {"reasons": reasons, "values": values}
+        else:
+            good[pair] = normalised
+            if digest is not None and normalised == values:
+                digests[pair] = digest
+
+    # Cross-pair check is a couple of dict passes - cheap enough to run on every pair every time
+    for pair, reasons in check_rank_consistency(good).items():
+        quarantined[pair] = {"reasons": reasons, "values": pairs[pair]}
+        del good[pair]
+        digests.pop(pair, None)
+
+    cleaned = dict(data)
+    cleaned['forexData'] = good
+    return cleaned, quarantined, digests, checked
+
+def quarantine_path(name):
+    return os.path.join(QUARANTINE_DIR, f"{name}.json")
+
+def write_quarantine(name, source, quarantined):
+    """Record the bad pairs of the latest cycle (and clear the file once they are fixed)"""
+    path = quarantine_path(name)
+    if not quarantined:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    os.makedirs(QUARANTINE_DIR, exist_ok=True)
+    atomic_write_json(path, {
+        "file": name,
+        "source": source,
+        "checked_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "pairs": quarantined
+    }, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            payload = json.load(f)
+        started = time.perf_counter()
+        cleaned, bad, _, checked = validate_payload(payload)
+        elapsed = (time.perf_counter() - started) * 1000
+        if cleaned is None:
+            print(f"❌ {path}: no forexData object")
+            continue
+        print(f"{'⚠️' if bad else '✅'} {path}: {len(cleaned['forexData'])} good, {len(bad)} quarantined "
+              f"({checked} checked in {elapsed:.1f} ms)")
+        for pair, entry in bad.items():
+            print(f"   {pair}: {'; '.join(entry['reasons'])}")
@@ -0,0 +1,210 @@
+import os
+import glob
+import time
+import tomllib
+import threading
+from file_watcher import watch_files, get_file_signature
+
+# PyYAML is optional - TOML is read with the standard library
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+# Shared by file_updater.py, backup.py and signal_new.py; override with COUNTER_TRADER_CONFIG
+CONFIG_FILE = os.environ.get("COUNTER_TRADER_CONFIG") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "terminals.toml")
+# Seconds between checks of the config file (and source globs) for changes
+RELOAD_INTERVAL_SECONDS = 10
+# Published files are named fx_signals_<name>.json like the EA's own output
+SIGNAL_PREFIX = "fx_signals_"
+
+DEFAULT_SOURCES = [f"{SIGNAL_PREFIX}*.json"]
+
+class ConfigError(ValueError):
+    """The config file is missing required settings or cannot be parsed"""
+
+def read_config_file(path):
+    """Raw dict from a .toml, .yaml or .yml file"""
+    if path.endswith((".yaml", ".yml")):
+        if not YAML_AVAILABLE:
+            raise ConfigError(f"{path}: pip install pyyaml to use a YAML config")
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                return yaml.safe_load(f) or {}
+            except yaml.YAMLError as e:
+                raise ConfigError(f"{path}: {e}") from e
+    with open(path, 'rb') as f:
+        try:
+            return tomllib.load(f)
+        except tomllib.TOMLDecodeError as e:
+            raise ConfigError(f"{path}: {e}") from e
+
+def resolve_path(value, base_dir):
+    """Expand ~ and $VARS; relative paths are taken from the config file's folder"""
+    if not value:
+        return None
+    path = os.path.expandvars(os.path.expanduser(str(value)))
+    # Windows drive paths are absolute even where os.path.isabs() does not think so
+    if os.path.isabs(path) or (len(path) > 2 and path[1] == ":" and path[2] in "\\/"):
+        return path
+    return os.path.normpath(os.path.join(base_dir, path))
+
+def load_config(path=CONFIG_FILE):
+    """Parse and normalise a terminals config
+
+    Returns {"path", "repo_path", "destination", "updater", "backup",
+    "signal_export", "terminals": [...]} with every path resolved.
+    """
+    raw = read_config_file(path)
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    repo_path = resolve_path(raw.get("repo_path"), base_dir)
+    if not repo_path:
+        raise ConfigError(f"{path}: repo_path is required")
+    config = {
+        "path": path,
+        "repo_path": repo_path,
+        "destination": resolve_path(raw.get("destination", os.path.join(repo_path, "data")), base_dir),
+        "updater": dict(raw.get("updater") or {}),
+        "backup": dict(raw.get("backup") or {}),
+        "signal_export": dict(raw.get("signal_export") or {}),
+        "terminals": []
+    }
+
+    names = set()
+    for terminal in raw.get("terminals") or []:
+        name = terminal.get("name")
+        files_dir = resolve_path(terminal.get("files_dir"), base_dir)
+        if not name or not files_dir:
+            raise ConfigError(f"{path}: every terminal needs a name and files_dir")
+        if name in names:
+            raise ConfigError(f"{path}: duplicate terminal name '{name}'")
+        names.add(name)
+        config["terminals"].append({
+            "name": name,
+            "files_dir": files_dir,
+            "sources": list(terminal.get("sources") or DEFAULT_SOURCES),
+            "name_prefix": terminal.get("name_prefix", ""),
+            "logs_dir": resolve_path(terminal.get("logs_dir"), base_dir) or files_dir,
+            "log_pattern": terminal.get("log_pattern", "*.log"),
+            "excel_file": resolve_path(terminal.get("excel_file"), base_dir),
+            "csv_file": resolve_path(terminal.get("csv_file"), base_dir),
+        })
+    if not config["terminals"]:
+        raise ConfigError(f"{path}: no [[terminals]] configured")
+    return config
+
+def signal_name(path, prefix=""):
+    """fx_signals_28pair.json -> '28pair' (with the terminal's name_prefix in front)"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if stem.startswith(SIGNAL_PREFIX):
+        stem = stem[len(SIGNAL_PREFIX):]
+    return f"{prefix}{stem}"
+
+def expand_files(config):
+    """FILES_CONFIG-style entries for every source of every terminal
+
+    Plain file names are always listed (the EA may not have written them yet);
+    glob patterns list only the files that currently match.
+    """
+    files = []
+    names = {}
+    for terminal in config["terminals"]:
+        for pattern in terminal["sources"]:
+            full_pattern = os.path.join(terminal["files_dir"], pattern)
+            matches = sorted(glob.glob(full_pattern)) if glob.has_magic(pattern) else [full_pattern]
+            for source in matches:
+                name = signal_name(source, terminal["name_prefix"])
+                if name in names:
+                    print(f"⚠️ {source} would also publish as '{name}' (already used by {names[name]}) "
+                          f"- set name_prefix on one terminal; skipping")
+                    continue
+                names[name] = source
+                files.append({
+                    "source": source,
+                    "destination": os.path.join(config["destination"], f"{SIGNAL_PREFIX}{name}.json"),
+                    "name": name,
+                    "terminal": terminal["name"]
+                })
+    return files
+
+class ConfigReloader:
+    """Load the config file and notice when it (or what its globs match) changes
+
+    check() is cheap enough to call every second: it only stats the file once
+    per RELOAD_INTERVAL_SECONDS. A broken edit is reported and the previous
+    config stays in force.
+    """
+
+    def __init__(self, path=CONFIG_FILE, interval=RELOAD_INTERVAL_SECONDS):
+        self.path = path
+        self.interval = interval
+        self.config = None
+        self.files = None
+        self.signature = None
+        self.last_check = None
+        self.missing_reported = False
+
+    def check(self, force=False):
+        """Return the new config if it changed since the last call, else None"""
+        now = time.monotonic()
+        if not force and self.last_check is not None and now - self.last_check < self.interval:
+            return None
+        self.last_check = now
+
+        signature = get_file_signature(self.path)
+        if signature is None:
+            if not self.missing_reported:
+                print(f"ℹ️ No config file at {self.path} - using built-in settings")
+                self.missing_reported = True
+            return None
+        self.missing_reported = False
+
+        config = self.config
+        if signature != self.signature:
+            self.signature = signature
+            try:
+                config = load_config(self.path)
+            except (OSError, ConfigError) as e:
+                print(f"❌ Config not reloaded, keeping previous settings: {e}")
+                return None
+            print(f"🔧 Loaded {len(config['terminals'])} terminal(s) from {self.path}")
+
+        if config is None:
+            return None
+        # Re-expand globs too, so a new fx_signals_*.json is picked up without an edit
+        files = expand_files(config)
+        if config is self.config and files == self.files:
+            return None
+        self.config, self.files = config, files
+        return config
+
+def watch_with_reload(reloader, apply_config, get_sources, callback):
+    """watch_files() that restarts on the new source list whenever the config changes
+
+    apply_config(config) is called in this thread; callback runs in the watcher thread.
+    """
+    while True:
+        sources = get_sources()
+        stop_event = threading.Event()
+        watcher = threading.Thread(target=watch_files, args=(sources, callback),
+                                   kwargs={"stop_event": stop_event}, daemon=True)
+        watcher.start()
+        restart = False
+        try:
+            while watcher.is_alive():
+                watcher.join(reloader.interval)
+                config = reloader.check()
+                if config is not None:
+                    apply_config(config)
+                    if get_sources() != sources:
+                        print("🔧 Source files changed - restarting watcher")
+                        restart = True
+                        break
+        finally:
+            stop_event.set()
+            watcher.join()
+        if not restart:
+            return
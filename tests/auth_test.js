@@ -0,0 +1,164 @@
+// tests/auth_test.js - kept out of netlify/edge-functions/ so it is not bundled as a function
+// deno test --allow-net --allow-env tests/auth_test.js
+
+import { assert, assertEquals, assertNotEquals } from 'jsr:@std/assert';
+
+const SITE = 'https://counter-trader.test';
+const context = { next: () => new Response('dashboard') };
+
+function base64UrlEncode(text) {
+  return btoa(text).replace(/\+/g, '-').replace(/\//g, '_').replace(/=+$/, '');
+}
+
+// What anyone reading the source could sign with if the key were derived from it
+async function signWith(secret, payload) {
+  const key = await crypto.subtle.importKey(
+    'raw', new TextEncoder().encode(secret), { name: 'HMAC', hash: 'SHA-256' }, false, ['sign']
+  );
+  const mac = new Uint8Array(await crypto.subtle.sign('HMAC', key, new TextEncoder().encode(payload)));
+  return `${payload}.${base64UrlEncode(String.fromCharCode(...mac))}`;
+}
+
+Deno.test('auth edge function', async (t) => {
+  // Stub of the Supabase REST endpoint holding the auth_settings row
+  const database = { password: 'first-pass', reads: 0, writes: [], failing: false };
+  const server = Deno.serve({ hostname: '127.0.0.1', port: 0, onListen() {} }, async (request) => {
+    if (database.failing) {
+      return new Response('unavailable', { status: 503 });
+    }
+    if (request.method === 'PATCH') {
+      const { setting_value } = await request.json();
+      database.writes.push(setting_value);
+      database.password = setting_value;
+      return new Response(null, { status: 204 });
+    }
+    database.reads++;
+    return Response.json([{ setting_value: database.password }]);
+  });
+
+  // auth.js reads the environment and the clock, so both are set up before it is imported
+  const realNow = Date.now;
+  let clock = realNow();
+  Date.now = () => clock;
+  Deno.env.set('SUPABASE_URL', `http://127.0.0.1:${server.addr.port}`);
+  Deno.env.set('SUPABASE_SERVICE_KEY', 'test-service-key');
+  Deno.env.delete('AUTH_TOKEN_SECRET');
+  const { default: handler } = await import('../netlify/edge-functions/auth.js');
+
+  async function post(path, body) {
+    const response = await handler(new Request(`${SITE}${path}`, { method: 'POST', body: JSON.stringify(body) }), context);
+    return { status: response.status, body: await response.json(), cookie: response.headers.get('Set-Cookie') };
+  }
+
+  const login = (password) => post('/api/auth', { password });
+
+  async function openDashboard(token) {
+    const headers = token ? { cookie: `theme=dark; auth_token=${token}` } : {};
+    const response = await handler(new Request(`${SITE}/`, { headers }), context);
+    await response.body?.cancel();
+    return response.status === 302 ? response.headers.get('Location') : response.status;
+  }
+
+  try {
+    await t.step('login password is cached for the TTL', async () => {
+      assertEquals((await login('first-pass')).status, 200);
+      assertEquals(database.reads, 1);
+      assertEquals((await login('wrong')).status, 401);
+      clock += 29 * 1000;
+      assertEquals((await login('first-pass')).status, 200);
+      assertEquals(database.reads, 1);
+
+      clock += 2 * 1000;
+      assertEquals((await login('first-pass')).status, 200);
+      assertEquals(database.reads, 2);
+    });
+
+    await t.step('concurrent logins share one database read', async () => {
+      clock += 31 * 1000;
+      const results = await Promise.all([1, 2, 3, 4, 5].map(() => login('first-pass')));
+      assertEquals(results.map(result => result.status), [200, 200, 200, 200, 200]);
+      assertEquals(database.reads, 3);
+    });
+
+    await t.step('change-password rejects a blank or missing new password', async () => {
+      for (const newPassword of ['', '   ', undefined, null, 12345]) {
+        const result = await post('/api/admin/change-password',
+          { adminPassword: 'increase123', oldPassword: 'first-pass', newPassword });
+        assertEquals(result.status, 400);
+        assertEquals(result.body.success, false);
+      }
+      assertEquals(database.writes, []);
+      assertEquals((await login('first-pass')).status, 200);
+    });
+
+    await t.step('change-password checks both passwords', async () => {
+      const wrongAdmin = await post('/api/admin/change-password',
+        { adminPassword: 'nope', oldPassword: 'first-pass', newPassword: 'second-pass' });
+      assertEquals(wrongAdmin.status, 401);
+      const wrongOld = await post('/api/admin/change-password',
+        { adminPassword: 'increase123', oldPassword: 'nope', newPassword: 'second-pass' });
+      assertEquals(wrongOld.status, 401);
+      assertEquals(database.writes, []);
+    });
+
+    await t.step('change-password invalidates the cache at once', async () => {
+      const changed = await post('/api/admin/change-password',
+        { adminPassword: 'increase123', oldPassword: 'first-pass', newPassword: 'second-pass' });
+      assertEquals(changed.status, 200);
+      assertEquals(database.writes, ['second-pass']);
+
+      const reads = database.reads;
+      assertEquals((await login('first-pass')).status, 401);
+      assertEquals((await login('second-pass')).status, 200);
+      assertEquals(database.reads, reads);
+    });
+
+    await t.step('a database outage keeps the last known password', async () => {
+      database.failing = true;
+      clock += 31 * 1000;
+      assertEquals((await login('second-pass')).status, 200);
+      database.failing = false;
+    });
+
+    await t.step('signed session tokens verify, expire and reject tampering', async () => {
+      const { body: { token }, cookie } = await login('second-pass');
+      assert(cookie.startsWith(`auth_token=${token};`));
+      assertEquals(await openDashboard(token), 200);
+      assertNotEquals(token, (await login('second-pass')).body.token);
+
+      const [payload, signature] = token.split('.');
+      const forged = base64UrlEncode(JSON.stringify({ exp: Math.floor(clock / 1000) + 10 * 365 * 86400, nonce: 'x' }));
+      const flipped = signature.slice(0, -2) + (signature.at(-2) === 'A' ? 'B' : 'A') + signature.at(-1);
+      assertEquals(await openDashboard(`${forged}.${signature}`), '/login.html');
+      assertEquals(await openDashboard(`${payload}.${flipped}`), '/login.html');
+      assertEquals(await openDashboard(payload), '/login.html');
+      assertEquals(await openDashboard(await signWith('session:test-service-key', forged)), '/login.html');
+      assertEquals(await openDashboard('not-a-token'), '/login.html');
+      assertEquals(await openDashboard(null), '/login.html');
+
+      clock += 35999 * 1000;
+      assertEquals(await openDashboard(token), 200);
+      clock += 2 * 1000;
+      assertEquals(await openDashboard(token), '/login.html');
+    });
+
+    await t.step('a password change revokes existing sessions', async () => {
+      const { body: { token } } = await login('second-pass');
+      assertEquals(await openDashboard(token), 200);
+      const changed = await post('/api/admin/change-password',
+        { adminPassword: 'increase123', oldPassword: 'second-pass', newPassword: 'third-pass' });
+      assertEquals(changed.status, 200);
+      assertEquals(await openDashboard(token), '/login.html');
+
+      const { body: { token: fresh } } = await login('third-pass');
+      assertEquals(await openDashboard(fresh), 200);
+      // Another isolate's change reaches this one through the cache TTL
+      database.password = 'fourth-pass';
+      clock += 31 * 1000;
+      assertEquals(await openDashboard(fresh), '/login.html');
+    });
+  } finally {
+    Date.now = realNow;
+    await server.shutdown();
+  }
+});
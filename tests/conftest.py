@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The mt5 scripts import each other as top-level modules (python mt5/<script>.py)
+MT5_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mt5")
+if MT5_DIR not in sys.path:
+    sys.path.insert(0, MT5_DIR)
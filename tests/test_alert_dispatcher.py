@@ -0,0 +1,149 @@
+import time
+import socket
+import threading
+import socketserver
+import pytest
+from email import message_from_string
+from alert_dispatcher import AlertDispatcher, SmtpSink, FileSink
+
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: greeting, EHLO, MAIL, RCPT, DATA, QUIT"""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 localhost stub")
+        while True:
+            line = self.rfile.readline().decode().rstrip("\r\n")
+            if not line:
+                return
+            verb = line.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                for raw in iter(self.rfile.readline, b""):
+                    if raw in (b".\r\n", b".\n"):
+                        break
+                    lines.append(raw.decode())
+                self.server.messages.append(message_from_string("".join(lines)))
+                self.reply("250 OK queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Not implemented")
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SmtpHandler)
+    server.daemon_threads = True
+    server.messages = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def smtp_sink(port):
+    return SmtpSink("127.0.0.1", port, "pipeline@example.com", "trader@example.com", starttls=False, timeout=5)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+
+class HangingSink:
+    def __init__(self):
+        self.release = threading.Event()
+        self.closed = False
+
+    def send(self, subject, body):
+        self.release.wait()
+
+    def close(self):
+        self.closed = True
+
+
+class FailingSink:
+    def send(self, subject, body):
+        raise RuntimeError("webhook down")
+
+    def close(self):
+        pass
+
+
+def test_delivers_to_smtp_and_file(smtp_server, tmp_path):
+    log = tmp_path / "alerts" / "alerts.log"
+    dispatcher = AlertDispatcher([smtp_sink(smtp_server.server_address[1]), FileSink(str(log))])
+    dispatcher.send("Push failed", "origin unreachable")
+    dispatcher.send("Disk full", "no space left")
+    dispatcher.stop(timeout=5)
+
+    assert [m["Subject"] for m in smtp_server.messages] == ["Push failed", "Disk full"]
+    assert smtp_server.messages[0]["To"] == "trader@example.com"
+    text = log.read_text()
+    assert "Push failed\norigin unreachable" in text and "Disk full\nno space left" in text
+
+
+def test_duplicates_are_suppressed_then_summarised(smtp_server, tmp_path):
+    log = tmp_path / "alerts.log"
+    dispatcher = AlertDispatcher([smtp_sink(smtp_server.server_address[1]), FileSink(str(log))],
+                                 dedup_window=0.5)
+    for _ in range(4):
+        dispatcher.send("Push failed 12:00:01", "origin unreachable", key="push")
+    dispatcher.send("Other alert", "different key")
+    assert wait_for(lambda: len(smtp_server.messages) == 3)
+    dispatcher.stop(timeout=5)
+
+    subjects = [m["Subject"] for m in smtp_server.messages]
+    assert subjects == ["Push failed 12:00:01", "Other alert", "[x3 repeats] Push failed 12:00:01"]
+    assert log.read_text().count("=== ") == 3
+
+    # After the window an identical alert goes out again
+    dispatcher = AlertDispatcher([FileSink(str(log))], dedup_window=0.2)
+    dispatcher.send("Push failed", "again", key="push")
+    time.sleep(0.3)
+    dispatcher.send("Push failed", "again", key="push")
+    dispatcher.stop(timeout=5)
+    assert log.read_text().count("=== ") == 5
+
+
+def test_failing_channels_do_not_block_others(tmp_path):
+    log = tmp_path / "alerts.log"
+    hanging = HangingSink()
+    # Nothing listens on this port: every SMTP attempt fails
+    dispatcher = AlertDispatcher([smtp_sink(free_port()), hanging, FailingSink(), FileSink(str(log))])
+    dispatcher.send("First", "one")
+    dispatcher.send("Second", "two")
+    assert wait_for(lambda: log.exists() and log.read_text().count("=== ") == 2)
+
+    dispatcher.stop(timeout=0.2)
+    assert not hanging.closed  # still stuck in send, left to its daemon thread
+    hanging.release.set()
+
+
+def test_send_returns_without_waiting_for_sinks(tmp_path):
+    hanging = HangingSink()
+    dispatcher = AlertDispatcher([hanging])
+    started = time.perf_counter()
+    for i in range(10):
+        assert dispatcher.send(f"Alert {i}", "body")
+    assert time.perf_counter() - started < 0.5
+    hanging.release.set()
+    dispatcher.stop(timeout=5)
+    assert hanging.closed
@@ -0,0 +1,124 @@
+import threading
+from datetime import datetime
+import pytest
+import file_updater
+
+
+@pytest.fixture
+def slow_worker(monkeypatch):
+    """process_file stand-in that blocks on `release` for the "slow" file"""
+    release = threading.Event()
+    calls = []
+
+    def process_file(config, file_state):
+        calls.append(config["name"])
+        if config["name"] == "slow":
+            release.wait(10)
+        file_state["files"][config["name"]] = {"file": f"hash-{len(calls)}"}
+        return [config["name"]], file_state, 0.0
+
+    monkeypatch.setattr(file_updater, "process_file", process_file)
+    monkeypatch.setattr(file_updater, "FILE_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(file_updater, "IN_FLIGHT", {})
+    monkeypatch.setattr(file_updater, "WORKER_POOL", "thread")
+    monkeypatch.setattr(file_updater, "WORKER_EXECUTOR", None)
+    yield release, calls
+    release.set()
+    file_updater.WORKER_EXECUTOR.shutdown(wait=True)
+
+
+def test_timed_out_file_is_skipped_until_its_worker_finishes(slow_worker):
+    release, calls = slow_worker
+    configs = [{"name": "slow"}, {"name": "fast"}]
+    state = {}
+
+    assert file_updater.process_files(configs, state) == {"slow": None, "fast": ["fast"]}
+    assert list(file_updater.IN_FLIGHT) == ["slow"]
+
+    # The first worker is still writing: no second worker for the same file
+    assert file_updater.process_files(configs, state) == {"slow": None, "fast": ["fast"]}
+    assert calls.count("slow") == 1
+    assert "slow" not in state["files"]
+
+    release.set()
+    file_updater.IN_FLIGHT["slow"].result(timeout=5)
+    results = file_updater.process_files(configs, state)
+    assert results["slow"] == ["slow"]
+    assert calls.count("slow") == 2
+    assert file_updater.IN_FLIGHT == {}
+    assert state["files"]["slow"]["file"].startswith("hash-")
+
+
+def test_analytics_run_once_a_day_from_analytics_hour(monkeypatch):
+    runs = []
+
+    def publish_analytics():
+        runs.append(True)
+        file_updater.LAST_ANALYTICS_DATE = now.date()
+        return True
+
+    monkeypatch.setattr(file_updater, "publish_analytics", publish_analytics)
+    monkeypatch.setattr(file_updater, "ANALYTICS_HOUR", 23)
+    monkeypatch.setattr(file_updater, "LAST_ANALYTICS_DATE", None)
+    for hour, minute in ((9, 4), (22, 59), (23, 4), (23, 30)):
+        now = datetime(2025, 8, 28, hour, minute)
+        file_updater.publish_analytics_if_due(now)
+    assert len(runs) == 1
+    now = datetime(2025, 8, 29, 23, 4)
+    file_updater.publish_analytics_if_due(now)
+    assert len(runs) == 2
+
+
+def test_unchanged_payload_skips_the_state_write_and_git(monkeypatch, tmp_path):
+    payload = {"EURUSD": "1"}
+    state_path = tmp_path / "publish_state.json"
+    saves, commits = [], []
+
+    def process_file(config, file_state):
+        digest = ",".join(f"{pair}={value}" for pair, value in payload.items())
+        previous = file_state["files"].get(config["name"], {}).get("file")
+        file_state["files"][config["name"]] = {"file": digest}
+        return ([] if previous == digest else list(payload)), file_state, 0.0
+
+    def save_state(state, path):
+        saves.append(dict(state))
+        file_updater.atomic_write_json(path, state)
+
+    def run_git_commands(changed_files=None):
+        commits.append(changed_files)
+        return git_ok
+
+    monkeypatch.setattr(file_updater, "process_file", process_file)
+    monkeypatch.setattr(file_updater, "save_state", save_state)
+    monkeypatch.setattr(file_updater, "run_git_commands", run_git_commands)
+    monkeypatch.setattr(file_updater, "notify_published", lambda *args: None)
+    monkeypatch.setattr(file_updater, "FILES_CONFIG", [{"name": "10pair", "source": "src", "destination": "dst"}])
+    monkeypatch.setattr(file_updater, "PUBLISH_STATE_FILE", str(state_path))
+    monkeypatch.setattr(file_updater, "IN_FLIGHT", {})
+    monkeypatch.setattr(file_updater, "WORKER_POOL", "thread")
+    monkeypatch.setattr(file_updater, "WORKER_EXECUTOR", None)
+    try:
+        git_ok = True
+        file_updater.move_files()
+        assert len(saves) == 2 and commits == [{"10pair": ["EURUSD"]}]
+        assert saves[-1]["pending_commit"] is False
+        written = state_path.stat().st_mtime_ns
+
+        # Same payload again: no fsync'd rewrite and no git
+        file_updater.move_files()
+        file_updater.move_files()
+        assert len(saves) == 2 and len(commits) == 1
+        assert state_path.stat().st_mtime_ns == written
+
+        # A failed commit stays owed and is retried on an unchanged cycle
+        payload["EURUSD"] = "2"
+        git_ok = False
+        file_updater.move_files()
+        assert len(saves) == 3 and saves[-1]["pending_commit"] is True and len(commits) == 2
+        git_ok = True
+        file_updater.move_files()
+        assert commits[-1] == {} and len(saves) == 4 and saves[-1]["pending_commit"] is False
+        file_updater.move_files()
+        assert len(saves) == 4 and len(commits) == 3
+    finally:
+        file_updater.WORKER_EXECUTOR.shutdown(wait=True)
@@ -0,0 +1,173 @@
+import os
+import subprocess
+from datetime import datetime, timedelta
+import pytest
+import git_compactor
+from git_publisher import run_git
+from git_compactor import compact_history, plan_compaction, read_first_parent_log
+
+SIGNALS = "data/fx_signals_10pair.json"
+
+
+def git(cwd, *args):
+    return run_git(str(cwd), list(args)).stdout.strip()
+
+
+@pytest.fixture
+def repos(tmp_path):
+    """A working repo on branch main with a bare `origin` in the same tmpdir"""
+    remote = tmp_path / "remote.git"
+    work = tmp_path / "work"
+    subprocess.run(["git", "init", "-q", "--bare", str(remote)], check=True)
+    subprocess.run(["git", "init", "-q", str(work)], check=True)
+    git(work, "checkout", "-q", "-b", "main")
+    git(work, "config", "user.name", "Pipeline Test")
+    git(work, "config", "user.email", "pipeline@example.com")
+    git(work, "config", "commit.gpgsign", "false")
+    git(work, "remote", "add", "origin", str(remote))
+    return work, remote
+
+
+def days_ago(days, hour):
+    return datetime.combine(datetime.now().date() - timedelta(days=days), datetime.min.time()) + timedelta(hours=hour)
+
+
+def commit_at(work, moment, files, message=None, merge=None):
+    """Commit files ({path: text}) - or merge branch `merge` - with author and committer date `moment`"""
+    for name, text in files.items():
+        path = work / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        git(work, "add", name)
+    date = f"{int(moment.timestamp())} +0000"
+    env = dict(os.environ, GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+    command = ["merge", "-q", "--no-ff", merge, "-m", message] if merge else \
+        ["commit", "-q", "-m", message or f"Update {', '.join(files)}"]
+    subprocess.run(["git", *command], cwd=work, env=env, check=True, capture_output=True)
+    return git(work, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def history(repos):
+    """Hourly signal commits on two old days, split by a code commit and a merge, plus recent ones"""
+    work, _ = repos
+    commits = {"code": commit_at(work, days_ago(20, 9), {"mt5/app.py": "v1", SIGNALS: "0"}, "Add app")}
+    for hour in (10, 11, 12):
+        commits[f"day1-{hour}"] = commit_at(work, days_ago(20, hour), {SIGNALS: f"20-{hour}"})
+    commits["mixed"] = commit_at(work, days_ago(20, 13), {"mt5/app.py": "v2", SIGNALS: "20-13"}, "Fix app")
+    for hour in (14, 15):
+        commits[f"day1-{hour}"] = commit_at(work, days_ago(20, hour), {SIGNALS: f"20-{hour}"})
+
+    git(work, "checkout", "-q", "-b", "side")
+    commits["side"] = commit_at(work, days_ago(19, 8), {"data/signal_analytics_daily.json": "side"})
+    git(work, "checkout", "-q", "main")
+    commits["merge"] = commit_at(work, days_ago(19, 9), {}, "Merge side", merge="side")
+    for hour in (10, 11):
+        commits[f"day2-{hour}"] = commit_at(work, days_ago(19, hour), {SIGNALS: f"19-{hour}"})
+    for hour in (10, 11):
+        commits[f"recent-{hour}"] = commit_at(work, days_ago(1, hour), {SIGNALS: f"1-{hour}"})
+    git(work, "push", "-q", "origin", "main")
+    return commits
+
+
+def first_parent_ids(work):
+    return git(work, "rev-list", "--first-parent", "--reverse", "main").split()
+
+
+def test_plan_squashes_only_old_signal_only_commits(repos, history):
+    work, _ = repos
+    cutoff = days_ago(7, 0)
+    plan = plan_compaction(read_first_parent_log(str(work), "main"), "data", cutoff)
+    groups = [[commit["commit"] for commit in group] for group in plan]
+    assert [history[f"day1-{hour}"] for hour in (10, 11, 12)] in groups
+    assert [history["day1-14"], history["day1-15"]] in groups
+    assert [history["day2-10"], history["day2-11"]] in groups
+    for kept in ("code", "mixed", "merge", "recent-10", "recent-11"):
+        assert [history[kept]] in groups
+
+
+def test_compaction_keeps_code_merges_and_the_final_tree(repos, history, tmp_path):
+    work, remote = repos
+    old_head = git(work, "rev-parse", "main")
+    old_tree = git(work, "rev-parse", "main^{tree}")
+
+    result = compact_history(str(work), "data", keep_days=7, history_dir=str(tmp_path / "history"),
+                             archive_dir=str(tmp_path / "archive"))
+    assert result["compacted"] and result["old_head"] == old_head
+    # Two groups on the first day (split by "Fix app"), one on the second
+    assert result["squashed"] == 4 and result["days"] == 2
+    assert result["missing_history_days"] == [str(days_ago(20, 0).date()), str(days_ago(19, 0).date())]
+
+    new_head = git(work, "rev-parse", "main")
+    assert new_head == result["new_head"] == git(remote, "rev-parse", "main")
+    assert git(work, "rev-parse", "main^{tree}") == old_tree
+    assert git(work, "status", "--porcelain") == ""
+
+    ids = first_parent_ids(work)
+    assert len(ids) == 12 - 4
+    # Commits before the first squashed group keep their ids
+    assert ids[0] == history["code"]
+    subjects = git(work, "log", "--first-parent", "--reverse", "--format=%s", "main").splitlines()
+    assert subjects[1].endswith("(daily, 3 commits squashed)")
+    assert subjects[2] == "Fix app"
+    assert subjects[4] == "Merge side"
+    assert subjects[-2:] == [f"Update {SIGNALS}"] * 2
+    # The merge is still a merge of the untouched side branch, with its original date
+    merge = ids[4]
+    assert git(work, "rev-parse", f"{merge}^2") == history["side"]
+    assert git(work, "log", "-1", "--format=%ct", merge) == git(work, "log", "-1", "--format=%ct", history["merge"])
+
+    # The archive bundle holds the old history and applies on top of the kept base
+    archive = result["archive"]
+    assert os.path.dirname(archive) == str(tmp_path / "archive") and os.path.isfile(archive)
+    git(work, "bundle", "verify", archive)
+    assert old_head in git(work, "bundle", "list-heads", archive)
+
+    again = compact_history(str(work), "data", keep_days=7, history_dir=str(tmp_path / "history"),
+                            archive_dir=str(tmp_path / "archive"))
+    assert again == {"compacted": False, "reason": "nothing to squash"}
+
+
+def test_dry_run_changes_nothing(repos, history, tmp_path):
+    work, remote = repos
+    old_head = git(work, "rev-parse", "main")
+    result = compact_history(str(work), "data", keep_days=7, dry_run=True, history_dir=str(tmp_path / "history"),
+                             archive_dir=str(tmp_path / "archive"))
+    assert result["reason"] == "dry run" and result["squashed"] == 4 and result["days"] == 2
+    assert git(work, "rev-parse", "main") == old_head == git(remote, "rev-parse", "main")
+    assert not (tmp_path / "archive").exists()
+
+
+def test_rejected_force_push_restores_the_old_head(repos, history, tmp_path, monkeypatch):
+    work, remote = repos
+    old_head = git(work, "rev-parse", "main")
+    other = tmp_path / "other"
+    subprocess.run(["git", "clone", "-q", "-b", "main", str(remote), str(other)], check=True)
+    git(other, "config", "user.name", "Someone Else")
+    git(other, "config", "user.email", "else@example.com")
+    real_run_git = git_compactor.run_git
+
+    def run_git_with_race(repo_path, args, **kwargs):
+        if args[0] == "push":
+            # Another machine publishes after the fetch, so the lease no longer holds
+            commit_at(other, datetime.now(), {SIGNALS: "from elsewhere"})
+            git(other, "push", "-q", "origin", "main")
+        return real_run_git(repo_path, args, **kwargs)
+    monkeypatch.setattr(git_compactor, "run_git", run_git_with_race)
+
+    with pytest.raises(subprocess.CalledProcessError):
+        compact_history(str(work), "data", keep_days=7, history_dir=str(tmp_path / "history"),
+                        archive_dir=str(tmp_path / "archive"))
+    assert git(work, "rev-parse", "main") == old_head
+    assert git(remote, "rev-parse", "main") == git(other, "rev-parse", "main")
+    assert git(remote, "rev-parse", "main~1") == old_head
+    # The bundle was still written before the push was tried
+    assert len(os.listdir(tmp_path / "archive")) == 1
+
+
+def test_refuses_when_the_remote_differs(repos, history, tmp_path):
+    work, remote = repos
+    commit_at(work, datetime.now(), {SIGNALS: "unpushed"})
+    result = compact_history(str(work), "data", keep_days=7, history_dir=str(tmp_path / "history"),
+                             archive_dir=str(tmp_path / "archive"))
+    assert result["compacted"] is False and "differ" in result["reason"]
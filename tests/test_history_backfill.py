@@ -0,0 +1,110 @@
+import os
+import json
+import subprocess
+from datetime import datetime, timedelta
+import pytest
+from change_detector import hash_payload
+from git_publisher import run_git
+from history_backfill import backfill, BlobReader, LIVE_MATCH_SECONDS
+from history_store import append_snapshot, list_snapshots, TIMESTAMP_FORMAT
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+START = datetime(2025, 8, 28, 9, 0)
+
+
+def git(cwd, *args):
+    return run_git(str(cwd), list(args)).stdout.strip()
+
+
+def load(name):
+    with open(os.path.join(DATA_DIR, name), 'r', encoding='utf-8-sig') as f:
+        return json.load(f)
+
+
+def payload(confidence):
+    """The committed 10-pair file with every Confidence set, so each version differs"""
+    data = load("fx_signals_10pair.json")
+    for values in data["forexData"].values():
+        values["Confidence"] = confidence
+    return data
+
+
+@pytest.fixture
+def repo(tmp_path):
+    work = tmp_path / "work"
+    subprocess.run(["git", "init", "-q", str(work)], check=True)
+    git(work, "config", "user.name", "Pipeline Test")
+    git(work, "config", "user.email", "pipeline@example.com")
+    git(work, "config", "commit.gpgsign", "false")
+    (work / "data").mkdir()
+    return work
+
+
+def commit_at(work, moment, files):
+    """Commit {path: text} with author and committer date `moment`"""
+    for name, text in files.items():
+        (work / name).write_text(text, encoding='utf-8')
+        git(work, "add", name)
+    date = f"{int(moment.timestamp())} +0000"
+    env = dict(os.environ, GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+    subprocess.run(["git", "commit", "-q", "-m", f"Update forex signals - {moment}"], cwd=work, env=env,
+                   check=True, capture_output=True)
+    return git(work, "rev-parse", "HEAD")
+
+
+def test_backfill_loads_every_version_once(repo, tmp_path):
+    history_dir = str(tmp_path / "history")
+    for hour in range(3):
+        moment = START + timedelta(hours=hour)
+        commit_at(repo, moment, {"data/fx_signals_10pair.json": json.dumps(payload(50 + hour)),
+                                 # feed files next to the signal file are not versions of it
+                                 "data/fx_signals_10pair.compact.json": json.dumps({"v": hour})})
+    commit_at(repo, START + timedelta(hours=3),
+              {"data/fx_signals_28pair.json": json.dumps(load("fx_signals_28pair.json"))})
+
+    counts = backfill(str(repo), history_dir=history_dir, workers=2)
+    assert counts == {"versions": 4, "already_stored": 0, "duplicates": 0, "unreadable": 0,
+                      "snapshots": 4, "rows": 3 * 10 + 28}
+    stored = list_snapshots(history_dir)
+    times = [(START + timedelta(hours=hour)).strftime(TIMESTAMP_FORMAT) for hour in range(4)]
+    assert set(stored) == {("10pair", times[0]), ("10pair", times[1]), ("10pair", times[2]), ("28pair", times[3])}
+    assert stored[("10pair", START.strftime(TIMESTAMP_FORMAT))] == hash_payload(payload(50))
+
+    again = backfill(str(repo), history_dir=history_dir, workers=2)
+    assert again["already_stored"] == 4 and again["snapshots"] == 0 and again["rows"] == 0
+
+
+def test_unreadable_blobs_and_live_duplicates_are_skipped(repo, tmp_path):
+    history_dir = str(tmp_path / "history")
+    live = payload(60)
+    commit_at(repo, START, {"data/fx_signals_10pair.json": json.dumps(payload(50))})
+    commit_at(repo, START + timedelta(hours=1), {"data/fx_signals_10pair.json": "{not json"})
+    commit_at(repo, START + timedelta(hours=2), {"data/fx_signals_10pair.json": json.dumps(live)})
+    commit_at(repo, START + timedelta(hours=3), {"data/fx_signals_10pair.json": json.dumps(payload(50))})
+    commit_at(repo, START + timedelta(hours=4), {"data/fx_signals_10pair.json": json.dumps(live)})
+    # The updater stored the 11:00 version live a few minutes before git committed it
+    append_snapshot(live, "10pair", START + timedelta(hours=2, seconds=-LIVE_MATCH_SECONDS + 60),
+                    content_hash=hash_payload(live), history_dir=history_dir)
+
+    counts = backfill(str(repo), history_dir=history_dir, workers=1, batch_commits=2)
+    # 13:00 repeats the live content too, but hours later: a version of its own
+    assert counts == {"versions": 5, "already_stored": 0, "duplicates": 1, "unreadable": 1,
+                      "snapshots": 3, "rows": 30}
+    assert ("10pair", (START + timedelta(hours=4)).strftime(TIMESTAMP_FORMAT)) in list_snapshots(history_dir)
+
+
+def test_blob_reader_reports_missing_blobs(repo):
+    commit_at(repo, START, {"data/fx_signals_10pair.json": "first"})
+    blob = git(repo, "rev-parse", "HEAD:data/fx_signals_10pair.json")
+    reader = BlobReader(str(repo))
+    try:
+        assert list(reader.read_many([blob, "0" * 40, blob])) == [(blob, b"first"), ("0" * 40, None), (blob, b"first")]
+    finally:
+        reader.close()
+
+
+def test_dry_run_only_counts(repo, tmp_path):
+    commit_at(repo, START, {"data/fx_signals_10pair.json": json.dumps(payload(50))})
+    counts = backfill(str(repo), history_dir=str(tmp_path / "history"), dry_run=True)
+    assert counts["versions"] == 1 and counts["snapshots"] == 0
+    assert not os.path.exists(tmp_path / "history")
@@ -0,0 +1,63 @@
+import os
+import json
+from datetime import datetime
+import pytest
+import image_manifest
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def make_chart(images_dir, name, color=(200, 30, 30)):
+    path = images_dir / name
+    Image.new("RGB", (640, 480), color).save(path)
+    old = os.path.getmtime(path) - 60  # settled, not mid-write
+    os.utime(path, (old, old))
+    return path
+
+
+@pytest.fixture
+def images_dir(tmp_path):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    return folder
+
+
+def run(images_dir, tmp_path, **kwargs):
+    return image_manifest.update_images(str(images_dir), archive_dir=str(tmp_path / "archive"),
+                                        state_file=str(tmp_path / "state.json"), **kwargs)
+
+
+def test_commits_variants_instead_of_png(images_dir, tmp_path):
+    png = make_chart(images_dir, "[2025_08_28][0000].png")
+    result = run(images_dir, tmp_path)
+
+    paths = {os.path.relpath(path, images_dir).replace(os.sep, "/") for path in result["paths"]}
+    assert paths == {"thumbs/[2025_08_28][0000].webp", "webp/[2025_08_28][0000].webp", "manifest.json"}
+    assert png.exists()
+    entry = json.loads((images_dir / "manifest.json").read_text())["images"][0]
+    assert entry["file"] == png.name
+    assert (entry["width"], entry["height"]) == (640, 480)
+
+    # Unchanged chart: nothing to commit
+    assert run(images_dir, tmp_path)["paths"] == []
+
+
+def test_png_committed_without_variants_or_when_asked(images_dir, tmp_path):
+    png = make_chart(images_dir, "[2025_08_28][0100].png")
+    assert str(png) in run(images_dir, tmp_path, variants=False)["paths"]
+
+    other = make_chart(images_dir, "[2025_08_28][0200].png")
+    assert str(other) in run(images_dir, tmp_path, commit_originals=True)["paths"]
+
+
+def test_module_settings_apply_when_changed_after_import(images_dir, tmp_path, monkeypatch):
+    old = make_chart(images_dir, "[2025_07_01][0000].png")
+    new = make_chart(images_dir, "[2025_08_28][0300].png")
+    monkeypatch.setattr(image_manifest, "COMMIT_ORIGINALS", True)
+    monkeypatch.setattr(image_manifest, "KEEP_DAYS", 30)
+
+    result = run(images_dir, tmp_path, now=datetime(2025, 8, 29))
+    assert result["archived"] == 1 and str(new) in result["paths"]
+    assert not old.exists() and (tmp_path / "archive" / "2025_07" / old.name).exists()
+    # An explicit argument still wins
+    assert run(images_dir, tmp_path, keep_days=0, now=datetime(2025, 8, 29))["archived"] == 1
@@ -0,0 +1,89 @@
+import os
+from log_tailer import LogTailer
+
+
+def write(path, text, mtime):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(text)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_follows_appends_to_another_existing_log(tmp_path):
+    base = 1_700_000_000 * 10**9
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    first, second = logs / "a.log", logs / "b.log"
+    write(second, "b1\n", base)
+    write(first, "a1\n", base + 10**9)
+    folder_mtime = os.stat(logs).st_mtime_ns
+
+    tailer = LogTailer(str(logs), "*.log", str(tmp_path / "tail.json"))
+    assert tailer.poll() == (str(first), ["a1"], True)
+
+    # The current log keeps growing: no rescan needed
+    write(first, "a2\n", base + 2 * 10**9)
+    assert tailer.poll() == (str(first), ["a2"], False)
+
+    # Appends to the other log leave the folder mtime alone, but the current one went quiet
+    write(second, "b2\n", base + 3 * 10**9)
+    assert os.stat(logs).st_mtime_ns == folder_mtime
+    assert tailer.poll() == (str(second), ["b1", "b2"], True)
+    assert tailer.poll() == (str(second), [], False)
+
+
+def test_new_log_is_picked_up_and_state_survives_restart(tmp_path):
+    base = 1_700_000_000 * 10**9
+    state = str(tmp_path / "state" / "tail.json")
+    write(tmp_path / "a.log", "a1\n", base)
+    assert LogTailer(str(tmp_path), "*.log", state).poll()[1] == ["a1"]
+
+    write(tmp_path / "c.log", "c1\npartial", base + 10**9)
+    tailer = LogTailer(str(tmp_path), "*.log", state)
+    path, lines, reset = tailer.poll()
+    assert (os.path.basename(path), lines, reset) == ("c.log", ["c1", "partial"], True)
+    write(tmp_path / "c.log", " line\n", base + 2 * 10**9)
+    assert tailer.poll()[1] == ["partial line"]
+
+
+def test_restart_resumes_a_partly_read_log(tmp_path):
+    base = 1_700_000_000 * 10**9
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    log = logs / "a.log"
+    state = str(tmp_path / "tail.json")
+    write(log, "one\ntwo\nthr", base)
+    first = LogTailer(str(logs), "*.log", state)
+    assert first.poll() == (str(log), ["one", "two", "thr"], True)
+
+    # Restart with nothing appended: no re-read, nothing new
+    restarted = LogTailer(str(logs), "*.log", state)
+    assert restarted.poll() == (str(log), [], False)
+
+    # Restart after appends: only the new bytes (plus the unfinished line) come back
+    write(log, "ee\nfour\n", base + 10**9)
+    restarted = LogTailer(str(logs), "*.log", state)
+    assert restarted.poll() == (str(log), ["three", "four"], False)
+    assert restarted.lines is None
+    assert restarted.all_lines() == ["one", "two", "three", "four"]
+
+    write(log, "five\n", base + 2 * 10**9)
+    assert restarted.poll() == (str(log), ["five"], False)
+    assert restarted.all_lines() == ["one", "two", "three", "four", "five"]
+
+
+def test_restart_rebuilds_lines_of_a_utf16_log(tmp_path):
+    base = 1_700_000_000 * 10**9
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    log = logs / "a.log"
+    state = str(tmp_path / "tail.json")
+    log.write_bytes("﻿一\r\n二\r\n".encode("utf-16-le"))
+    os.utime(log, ns=(base, base))
+    assert LogTailer(str(logs), "*.log", state).poll()[1] == ["一", "二"]
+
+    with open(log, 'ab') as f:
+        f.write("三\r\n".encode("utf-16-le"))
+    os.utime(log, ns=(base + 10**9, base + 10**9))
+    restarted = LogTailer(str(logs), "*.log", state)
+    assert restarted.poll()[1:] == (["三"], False)
+    assert restarted.all_lines() == ["一", "二", "三"]
@@ -0,0 +1,98 @@
+import os
+import time
+import subprocess
+import pytest
+import push_queue
+from git_publisher import run_git, commit_paths
+from push_queue import PushQueue, read_head_commit
+
+
+def git(cwd, *args):
+    return run_git(str(cwd), list(args)).stdout.strip()
+
+
+@pytest.fixture
+def repos(tmp_path):
+    """A working repo on branch main with a bare `origin` in the same tmpdir"""
+    remote = tmp_path / "remote.git"
+    work = tmp_path / "work"
+    subprocess.run(["git", "init", "-q", "--bare", str(remote)], check=True)
+    subprocess.run(["git", "init", "-q", str(work)], check=True)
+    git(work, "checkout", "-q", "-b", "main")
+    git(work, "config", "user.name", "Pipeline Test")
+    git(work, "config", "user.email", "pipeline@example.com")
+    git(work, "config", "commit.gpgsign", "false")
+    git(work, "remote", "add", "origin", str(remote))
+    return work, remote
+
+
+def commit_file(work, name, text):
+    path = work / name
+    path.write_text(text)
+    assert commit_paths(str(work), [str(path)], f"Update {name}")
+    return read_head_commit(str(work))
+
+
+def test_commit_paths_stages_only_given_files(repos):
+    work, _ = repos
+    (work / "other.txt").write_text("not published")
+    commit_file(work, "data.json", "{}")
+    assert git(work, "show", "--name-only", "--format=", "HEAD") == "data.json"
+    assert not commit_paths(str(work), [str(work / "data.json")], "No-op")
+
+
+def test_failed_push_backs_off_then_retries(repos, tmp_path, monkeypatch):
+    work, remote = repos
+    monkeypatch.setattr(push_queue, "BACKOFF_BASE_SECONDS", 0.2)
+    alerts = []
+    queue = PushQueue(str(work), str(tmp_path / "queue.json"), timeout=30, on_failure=alerts.append)
+
+    # Remote unreachable: the push fails and the next attempt is pushed back
+    git(work, "remote", "set-url", "origin", str(tmp_path / "missing.git"))
+    first = commit_file(work, "a.txt", "1")
+    queue.enqueue("Update a.txt")
+    assert queue.state["pending"][0]["commit"] == first
+    assert not queue.push_pending()
+    status = queue.status()
+    assert status["pending"] == 1 and status["attempts"] == 1
+    assert "missing.git" in status["last_error"]
+    assert queue.state["next_attempt"] > time.time()
+
+    # The queue survives a restart
+    queue = PushQueue(str(work), str(tmp_path / "queue.json"), timeout=30, on_failure=alerts.append)
+    assert queue.status()["pending"] == 1
+
+    # Remote back: the worker retries after the backoff and pushes both commits in one go
+    git(work, "remote", "set-url", "origin", str(remote))
+    second = commit_file(work, "b.txt", "2")
+    queue.enqueue("Update b.txt")
+    queue.start()
+    try:
+        deadline = time.time() + 20
+        while queue.status()["pending"] and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        queue.stop(timeout=5)
+
+    status = queue.status()
+    assert status["pending"] == 0 and status["attempts"] == 0 and status["last_error"] is None
+    assert git(remote, "rev-parse", "main") == second
+    assert first in git(remote, "rev-list", "main").split()
+    assert alerts == []
+
+
+def test_alert_after_repeated_failures(repos, tmp_path, monkeypatch):
+    work, _ = repos
+    monkeypatch.setattr(push_queue, "ALERT_AFTER_ATTEMPTS", 2)
+    git(work, "remote", "set-url", "origin", str(tmp_path / "missing.git"))
+    alerts = []
+    queue = PushQueue(str(work), str(tmp_path / "queue.json"), on_failure=alerts.append)
+    commit_file(work, "a.txt", "1")
+    queue.enqueue("Update a.txt")
+    queue.push_pending()
+    first_delay = queue.state["next_attempt"] - time.time()
+    assert alerts == []
+    queue.push_pending()
+    assert queue.state["next_attempt"] - time.time() > first_delay  # exponential backoff
+    assert len(alerts) == 1 and "1 commit(s) waiting" in alerts[0]
+    assert os.path.exists(tmp_path / "queue.json")
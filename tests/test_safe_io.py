@@ -0,0 +1,36 @@
+import os
+import stat
+import pytest
+import safe_io
+
+pytestmark = pytest.mark.skipif(os.name == 'nt', reason="POSIX permission bits")
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_file_gets_default_mode(tmp_path):
+    path = tmp_path / "new.json"
+    safe_io.atomic_write_json(path, {"a": 1})
+    assert mode(path) == 0o666 & ~safe_io.UMASK
+
+
+def test_rewrite_keeps_existing_mode(tmp_path):
+    path = tmp_path / "shared.txt"
+    path.write_text("old")
+    os.chmod(path, 0o664)
+    safe_io.atomic_write_text(path, "new")
+    assert path.read_text() == "new"
+    assert mode(path) == 0o664
+
+
+def test_failed_write_leaves_target_and_no_temp(tmp_path):
+    path = tmp_path / "keep.txt"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with safe_io.atomic_open(path, 'w') as f:
+            f.write("partial")
+            raise RuntimeError("boom")
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["keep.txt"]
@@ -0,0 +1,181 @@
+import time
+import asyncio
+import threading
+from datetime import datetime
+import pytest
+import file_updater
+import scheduler
+from scheduler import Scheduler, CronSchedule, CATCH_UP_ONCE, CATCH_UP_SKIP
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def fast_wakeups(monkeypatch):
+    # Jobs re-read the (fake) clock after every short real sleep
+    monkeypatch.setattr(scheduler, "MAX_SLEEP_SECONDS", 0.01)
+
+
+async def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+def run_scenario(jobs_scheduler, scenario):
+    """Run the scheduler and scenario(scheduler) together, then stop it"""
+    async def main():
+        task = asyncio.create_task(jobs_scheduler.run())
+        await wait_until(lambda: jobs_scheduler.loop is not None
+                         and all(job.next_run for job in jobs_scheduler.jobs.values()))
+        try:
+            await scenario()
+        finally:
+            jobs_scheduler.stop()
+            await asyncio.wait_for(task, 5)
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("spec, moment, expected", [
+    ({"minute": "*/15"}, datetime(2025, 8, 28, 10, 7), datetime(2025, 8, 28, 10, 15)),
+    ({"minute": "*/15"}, datetime(2025, 8, 28, 10, 15), datetime(2025, 8, 28, 10, 30)),
+    ({"minute": "*/15"}, datetime(2025, 8, 28, 23, 50), datetime(2025, 8, 29, 0, 0)),
+    ({"minute": 4}, datetime(2025, 8, 28, 10, 4, 30), datetime(2025, 8, 28, 11, 4)),
+    ({"minute": 0, "hour": 23}, datetime(2025, 8, 28, 23, 0), datetime(2025, 8, 29, 23, 0)),
+    ({"minute": 30, "hour": "9-17/4", "weekday": "0-4"}, datetime(2025, 8, 29, 18, 0),
+     datetime(2025, 9, 1, 9, 30)),  # Friday evening -> Monday 09:30
+    ({"minute": "5,35"}, datetime(2025, 8, 28, 10, 5, 59), datetime(2025, 8, 28, 10, 35)),
+])
+def test_cron_next_fire_times(spec, moment, expected):
+    schedule = CronSchedule(**spec)
+    assert schedule.next_after(moment) == expected
+    assert schedule.matches(expected)
+
+
+def test_cron_rejects_bad_fields():
+    with pytest.raises(ValueError):
+        CronSchedule(minute=60)
+    with pytest.raises(ValueError):
+        CronSchedule(hour="20-25")
+    assert Scheduler.count_slots(CronSchedule(minute="*/15"), datetime(2025, 8, 28, 10, 0),
+                                 datetime(2025, 8, 28, 11, 0)) == 5
+
+
+def test_missed_runs_follow_the_catch_up_policy():
+    clock = FakeClock(datetime(2025, 8, 28, 10, 0, 30))
+    jobs_scheduler = Scheduler(clock=clock)
+    runs = {"once": 0, "skip": 0}
+    once = jobs_scheduler.add_job("once", CronSchedule(minute=0), lambda: runs.__setitem__("once", runs["once"] + 1),
+                                  catch_up=CATCH_UP_ONCE)
+    skip = jobs_scheduler.add_job("skip", CronSchedule(minute=0), lambda: runs.__setitem__("skip", runs["skip"] + 1),
+                                  catch_up=CATCH_UP_SKIP)
+
+    async def scenario():
+        assert once.next_run == datetime(2025, 8, 28, 11, 0)
+        # The PC slept through 11:00, 12:00 and 13:00
+        clock.now = datetime(2025, 8, 28, 13, 30)
+        await wait_until(lambda: once.metrics["runs"] == 1 and skip.metrics["missed"] == 3)
+        assert once.metrics["missed"] == 3 and once.metrics["caught_up"] == 1
+        assert skip.next_run == datetime(2025, 8, 28, 14, 0)
+
+        # An on-time slot runs normally for both
+        clock.now = datetime(2025, 8, 28, 14, 0, 10)
+        await wait_until(lambda: runs == {"once": 2, "skip": 1})
+        assert once.next_run == skip.next_run == datetime(2025, 8, 28, 15, 0)
+
+        # Clock moved back an hour: the next slot is re-planned, not waited for
+        clock.now = datetime(2025, 8, 28, 13, 5)
+        await wait_until(lambda: once.next_run == datetime(2025, 8, 28, 14, 0))
+    run_scenario(jobs_scheduler, scenario)
+    assert runs == {"once": 2, "skip": 1}
+
+
+def test_jobs_sharing_a_resource_never_overlap():
+    clock = FakeClock(datetime(2025, 8, 28, 10, 0, 30))
+    jobs_scheduler = Scheduler(clock=clock)
+    # Shared with code outside the scheduler, like file_updater.PUBLISH_LOCK and the watcher
+    publish_lock = jobs_scheduler.resource_lock("publish", threading.Lock())
+    state = {"active": 0, "max_active": 0, "order": []}
+    guard = threading.Lock()
+
+    def work(name):
+        def run():
+            with guard:
+                state["active"] += 1
+                state["max_active"] = max(state["max_active"], state["active"])
+            time.sleep(0.05)
+            with guard:
+                state["active"] -= 1
+                state["order"].append(name)
+        return run
+
+    for name in ("copy", "images", "compact"):
+        jobs_scheduler.add_job(name, CronSchedule(), work(name), resources=("publish",), quiet=True)
+    independent = jobs_scheduler.add_job("excel", CronSchedule(), lambda: None, resources=("excel",), quiet=True)
+
+    async def scenario():
+        publish_lock.acquire()  # the watcher is mid-publish
+        clock.now = datetime(2025, 8, 28, 10, 1, 0)
+        await wait_until(lambda: independent.metrics["runs"] == 1)
+        await asyncio.sleep(0.1)
+        assert state["order"] == []  # all waiting for the lock
+        publish_lock.release()
+        await wait_until(lambda: len(state["order"]) == 3)
+    run_scenario(jobs_scheduler, scenario)
+    assert state["max_active"] == 1
+    assert sorted(state["order"]) == ["compact", "copy", "images"]
+
+
+def test_a_job_never_overlaps_itself():
+    clock = FakeClock(datetime(2025, 8, 28, 10, 0, 30))
+    jobs_scheduler = Scheduler(clock=clock)
+    release = threading.Event()
+    job = jobs_scheduler.add_job("slow", CronSchedule(), lambda: release.wait(5), quiet=True)
+
+    async def scenario():
+        clock.now = datetime(2025, 8, 28, 10, 1, 0)
+        await wait_until(lambda: job.running)
+        clock.now = datetime(2025, 8, 28, 10, 2, 0)
+        await wait_until(lambda: job.metrics["overlaps_skipped"] == 1)
+        release.set()
+        await wait_until(lambda: job.metrics["runs"] == 1)
+    run_scenario(jobs_scheduler, scenario)
+    assert job.metrics["runs"] == 1
+
+
+def test_config_reload_moves_configured_slots(monkeypatch):
+    monkeypatch.setattr(file_updater, "SCHEDULE_MINUTE", 4)
+    monkeypatch.setattr(file_updater, "ANALYTICS_HOUR", 23)
+    jobs = scheduler.build_scheduler(watching=False)
+    jobs.clock = lambda: datetime(2025, 8, 28, 10, 0)
+    compact = str(jobs.jobs["compact"].schedule)
+
+    def reload_config(force=False):
+        file_updater.SCHEDULE_MINUTE = 20
+        file_updater.ANALYTICS_HOUR = 6
+    monkeypatch.setattr(file_updater, "reload_config", reload_config)
+    if scheduler.EXCEL_EXPORT_AVAILABLE:
+        monkeypatch.setattr(scheduler.signal_new, "reload_config", lambda force=False: None)
+    scheduler.reload_configs(jobs, watching=False)
+
+    assert jobs.jobs["copy"].schedule.minutes == {20}
+    assert jobs.jobs["copy"].next_run == datetime(2025, 8, 28, 10, 20)
+    assert jobs.jobs["analytics"].next_run == datetime(2025, 8, 29, 6, 15)
+    assert str(jobs.jobs["compact"].schedule) == compact
+
+
+def test_daily_git_commit_is_off_by_default(monkeypatch):
+    assert file_updater.DAILY_GIT_COMMIT is False
+    assert "git" not in scheduler.build_scheduler(watching=True).jobs
+    assert "git" not in scheduler.build_scheduler(watching=False).jobs
+
+    monkeypatch.setattr(file_updater, "DAILY_GIT_COMMIT", True)
+    jobs = scheduler.build_scheduler(watching=True).jobs
+    assert jobs["git"].func is file_updater.run_git_commands_all
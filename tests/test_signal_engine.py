@@ -0,0 +1,95 @@
+import os
+import json
+import numpy as np
+import pytest
+import signal_engine
+from signal_validator import validate_payload
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+EA_FILES = ["fx_signals_28pair.json", "fx_signals_10pair.json"]
+
+
+def load_forex_data(name):
+    with open(os.path.join(DATA_DIR, name), 'r', encoding='utf-8-sig') as f:
+        return json.load(f)["forexData"]
+
+
+@pytest.mark.parametrize("name", EA_FILES)
+def test_parity_with_ea_output(name):
+    expected = load_forex_data(name)
+    derived = signal_engine.derive_from_payload(expected)
+    assert signal_engine.compare(expected, derived, ["Overall_Ranking", "Confidence", "Signal"]) == []
+    assert set(derived) == set(expected)
+
+
+def test_parity_cli_reports_no_mismatches(capsys):
+    paths = [os.path.join(DATA_DIR, name) for name in EA_FILES]
+    assert signal_engine.main(["parity", *paths]) == 0
+    assert "0 mismatch(es)" in capsys.readouterr().out
+
+
+def test_parity_detects_a_wrong_confidence():
+    forex_data = load_forex_data("fx_signals_28pair.json")
+    pair = next(iter(forex_data))
+    forex_data[pair]["Confidence"] += 1
+    derived = signal_engine.derive_from_payload(forex_data)
+    mismatches = signal_engine.compare(forex_data, derived, ["Overall_Ranking", "Confidence"])
+    assert [(found, field) for found, field, _, _ in mismatches] == [(pair, "Confidence")]
+
+
+def rsi_reference(close, period=14):
+    diff = np.diff(close)
+    gains, losses = np.maximum(diff, 0), np.maximum(-diff, 0)
+    positive, negative = gains[:period].mean(), losses[:period].mean()
+    values = [100 - 100 / (1 + positive / negative)]
+    for i in range(period, len(diff)):
+        positive = (positive * (period - 1) + gains[i]) / period
+        negative = (negative * (period - 1) + losses[i]) / period
+        values.append(100 - 100 / (1 + positive / negative))
+    return np.array(values)
+
+
+def test_indicators_match_scalar_formulas():
+    close = 100 + np.cumsum(np.random.default_rng(7).normal(0, 1, 80))
+    assert np.allclose(signal_engine.rsi(close[None])[0, 14:], rsi_reference(close))
+
+    window = close[-14:]
+    mean = window.mean()
+    expected_cci = (close[-1] - mean) / (0.015 * np.abs(window - mean).mean())
+    assert np.isclose(signal_engine.cci(close[None])[0, -1], expected_cci)
+
+    window = close[-20:]
+    lower, width = window.mean() - 2 * window.std(), 4 * window.std()
+    assert np.isclose(signal_engine.bollinger_percent_b(close[None])[0, -1], (close[-1] - lower) / width)
+
+
+def synthetic_bars(symbols, bars=300, seed=3):
+    rng = np.random.default_rng(seed)
+    times = np.datetime64('2024-01-01T00:00', 's') + np.arange(bars) * np.timedelta64(4, 'h')
+    return {symbol: (times, 100 * np.exp(np.cumsum(rng.normal(0, 0.003, bars)))) for symbol in symbols}
+
+
+@pytest.mark.parametrize("pairs", ["28pair", "10pair"])
+def test_computed_snapshots_are_consistent_and_valid(pairs):
+    symbols = signal_engine.PAIR_SETS[pairs]
+    result = signal_engine.compute(synthetic_bars(symbols), symbols)
+    assert result["Confidence"].shape == (len(symbols), 300)
+    for index in (-1, -50, -200):
+        forex_data = signal_engine.to_forex_data(result, index)
+        # The engine's own output re-derives to itself, like the EA files above
+        assert signal_engine.compare(forex_data, signal_engine.derive_from_payload(forex_data)) == []
+        _, quarantined, _, _ = validate_payload({"forexData": forex_data})
+        assert quarantined == {}
+
+
+def test_snapshot_cli_writes_json(tmp_path):
+    ohlc_dir = tmp_path / "ohlc"
+    ohlc_dir.mkdir()
+    for symbol, (times, closes) in synthetic_bars(signal_engine.SYMBOLS_10).items():
+        rows = [f"{str(t).replace('T', ' ')},{c},{c},{c},{c:.5f}" for t, c in zip(times, closes)]
+        (ohlc_dir / f"{symbol}_H4.csv").write_text("time,open,high,low,close\n" + "\n".join(rows))
+    out = tmp_path / "snapshot.json"
+    assert signal_engine.main(["snapshot", str(ohlc_dir), "--pairs", "10pair", "--out", str(out)]) == 0
+    forex_data = json.loads(out.read_text())["forexData"]
+    assert list(forex_data) == signal_engine.SYMBOLS_10
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
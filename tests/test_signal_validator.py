@@ -0,0 +1,79 @@
+import os
+import copy
+import json
+import pytest
+import signal_validator
+from change_detector import compute_digests
+from signal_validator import validate_payload, write_quarantine
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def load(name):
+    with open(os.path.join(DATA_DIR, name), 'r', encoding='utf-8-sig') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("name", ["fx_signals_10pair.json", "fx_signals_28pair.json"])
+def test_published_files_pass_untouched(name):
+    data = load(name)
+    cleaned, quarantined, digests, checked = validate_payload(copy.deepcopy(data))
+    assert quarantined == {}
+    assert cleaned == data
+    assert checked == len(data["forexData"])
+    assert digests == {}  # nothing hashed without known_good
+
+
+@pytest.mark.parametrize("rank", ["0/0", "X/X", "3/3", "1/29", "", None])
+def test_malformed_rank_is_quarantined_and_removed(rank, tmp_path, monkeypatch):
+    monkeypatch.setattr(signal_validator, "QUARANTINE_DIR", str(tmp_path / "quarantine"))
+    data = load("fx_signals_28pair.json")
+    pair = next(iter(data["forexData"]))
+    data["forexData"][pair]["Overall_Ranking"] = rank
+
+    cleaned, quarantined, _, _ = validate_payload(data)
+    assert list(quarantined) == [pair]
+    assert quarantined[pair]["reasons"][0].startswith("Overall_Ranking: ")
+    assert quarantined[pair]["values"]["Overall_Ranking"] == rank
+    assert pair not in cleaned["forexData"] and len(cleaned["forexData"]) == 27
+
+    write_quarantine("28pair", "source.json", quarantined)
+    with open(signal_validator.quarantine_path("28pair"), 'r', encoding='utf-8') as f:
+        written = json.load(f)
+    assert written["source"] == "source.json" and list(written["pairs"]) == [pair]
+    # Fixed on the next cycle: the list goes away
+    write_quarantine("28pair", "source.json", {})
+    assert not os.path.exists(signal_validator.quarantine_path("28pair"))
+
+
+def test_rank_disagreeing_with_the_other_pairs_is_quarantined():
+    data = load("fx_signals_10pair.json")
+    pair = next(iter(data["forexData"]))
+    base, quote = data["forexData"][pair]["BB_percent_ranking"].split("/")
+    data["forexData"][pair]["BB_percent_ranking"] = f"{quote}/{base}"
+    cleaned, quarantined, _, _ = validate_payload(data)
+    assert list(quarantined) == [pair]
+    assert "in other pairs" in quarantined[pair]["reasons"][0]
+    assert pair not in cleaned["forexData"]
+
+
+def test_known_good_fast_path_matches_full_validation():
+    data = load("fx_signals_28pair.json")
+    known_good = compute_digests(data)["pairs"]
+    pairs = list(data["forexData"])
+
+    cleaned, quarantined, digests, checked = validate_payload(copy.deepcopy(data), known_good)
+    assert checked == 0 and quarantined == {}
+    assert cleaned == data and digests == known_good
+
+    # Next cycle: one pair broken, one needing normalisation, the rest unchanged
+    data["forexData"][pairs[0]]["Currency_Strength_Rank_all_pair"] = "X/X"
+    data["forexData"][pairs[1]]["Confidence"] = str(data["forexData"][pairs[1]]["Confidence"])
+    fast = validate_payload(copy.deepcopy(data), known_good)
+    full = validate_payload(copy.deepcopy(data))
+    assert fast[0] == full[0] and fast[1] == full[1]
+    assert list(fast[1]) == [pairs[0]]
+    assert fast[3] == 2 and full[3] == 28
+    # Only pairs published exactly as received keep a reusable digest
+    assert set(fast[2]) == set(pairs[2:])
+    assert all(fast[2][pair] == known_good[pair] for pair in pairs[2:])